@@ -1,46 +1,163 @@
-import subprocess
-import json
+from array import array
 from datetime import datetime
+import fnmatch
+from itertools import islice
+import math
 import os
+import signal
+import socket
 import sys
+import threading
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.load_env import load_env
+from src.mq_codec import encode_message, get_codec_name, message_file_extension
+from scripts.dt_008_report_spool import ReportSpool
+from src.mq_segment_log import SegmentLog
+from src.report_schema import PUBLISHER_METRICS_VALIDATOR, SCHEMA_VERSION
 import redis
 
 # Load environment variables (AT-002)
 load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
-# Initialize Redis client (will fail if Redis is not running, but we handle that)
-try:
-    REDIS_CLIENT = redis.Redis(
-        host=os.environ.get("REDIS_HOST"),
-        port=int(os.environ.get("REDIS_PORT")),
-        decode_responses=True
-    )
-    REDIS_CLIENT.ping()
-    REDIS_AVAILABLE = True
-except Exception:
-    REDIS_AVAILABLE = False
+REDIS_CLIENT = None
+REDIS_AVAILABLE = False
+
+def connect_redis():
+    """
+    DT-008: (Re)connects the Redis client and checks it with PING.
+    Used at start-up and by the spool forwarder to detect that Redis has recovered.
+    Returns True if Redis is available.
+    """
+    global REDIS_CLIENT, REDIS_AVAILABLE
+    
+    # Initialize Redis client (will fail if Redis is not running, but we handle that)
+    try:
+        if REDIS_CLIENT is None:
+            REDIS_CLIENT = redis.Redis(
+                host=os.environ.get("REDIS_HOST"),
+                port=int(os.environ.get("REDIS_PORT")),
+                decode_responses=True
+            )
+        REDIS_CLIENT.ping()
+        REDIS_AVAILABLE = True
+    except Exception:
+        REDIS_AVAILABLE = False
+    return REDIS_AVAILABLE
+
+connect_redis()
+
+# DT-004: Kernel interfaces read directly instead of forking top/free/df
+PROC_STAT_PATH = "/proc/stat"
+PROC_MEMINFO_PATH = "/proc/meminfo"
+PROC_MOUNTS_PATH = "/proc/mounts"
+PROC_DISKSTATS_PATH = "/proc/diskstats"
+SYS_BLOCK_PATH = "/sys/block"
+BYTES_PER_GB = 1024 ** 3
+SECTOR_BYTES = 512
+
+# Previous /proc/stat counters and the usage computed from them, per CPU line ('cpu', 'cpu0', ...)
+_LAST_CPU_TIMES = None
+_LAST_CPU_USAGE = {}
+
+# DT-006: Previous /proc/diskstats counters and when they were read
+_LAST_DISKSTATS = None
+_LAST_DISKSTATS_TIME = None
+
+# Mount point -> device, resolved once from /proc/mounts
+_MOUNT_SOURCES = {}
+
+# DT-006: Pseudo and virtual filesystem types skipped when enumerating mounts
+DEFAULT_FS_EXCLUDE_TYPES = (
+    "autofs,binfmt_misc,bpf,cgroup,cgroup2,configfs,debugfs,devpts,devtmpfs,efivarfs,fusectl,"
+    "hugetlbfs,mqueue,nsfs,proc,pstore,ramfs,rpc_pipefs,securityfs,squashfs,sysfs,tmpfs,tracefs"
+)
+
+# DT-006: Device name patterns skipped by the disk I/O collector
+DEFAULT_DISK_EXCLUDE = "loop*,ram*,zram*"
+
+# DT-005: Set by SIGTERM/SIGINT to stop the resident sampler
+SHUTDOWN_EVENT = threading.Event()
+
+# DT-008: Store-and-forward spool, created on first use
+_REPORT_SPOOL = None
+
+def _read_cpu_times():
+    """
+    Reads the aggregate and per-core CPU counters from /proc/stat.
+    Returns a dictionary mapping 'cpu', 'cpu0', 'cpu1', ... to (idle_ticks, total_ticks).
+    """
+    cpu_times = {}
+    with open(PROC_STAT_PATH, 'r') as f:
+        for line in f:
+            # Example: cpu0 4705 356 584 3699176 23060 0 277 0 0 0
+            if not line.startswith('cpu'):
+                break
+            fields = line.split()
+            # user, nice, system, idle, iowait, irq, softirq, steal (guest time is already included in user)
+            ticks = [int(value) for value in fields[1:9]]
+            cpu_times[fields[0]] = (ticks[3] + ticks[4], sum(ticks))
+    return cpu_times
+
+def _read_diskstats():
+    """
+    Reads the cumulative I/O counters of whole block devices from /proc/diskstats.
+    Returns a dictionary mapping device name to (reads, sectors_read, writes, sectors_written).
+    """
+    diskstats = {}
+    with open(PROC_DISKSTATS_PATH, 'r') as f:
+        for line in f:
+            # Example: 254 0 vda 6988 3917 1591258 7483 1814 1650 86856 1016 0 2296 8653
+            fields = line.split()
+            diskstats[fields[2]] = (int(fields[3]), int(fields[5]), int(fields[7]), int(fields[9]))
+    return diskstats
+
+def _prime_rate_counters():
+    """
+    DT-006: Takes the first CPU and disk I/O counter readings and waits one short
+    window (DT_CPU_SAMPLE_WINDOW_SECONDS, default 0.1) so the first collection has
+    deltas to work with. Later collections use the interval since the previous call.
+    """
+    global _LAST_CPU_TIMES, _LAST_DISKSTATS, _LAST_DISKSTATS_TIME
+    
+    _LAST_CPU_TIMES = _read_cpu_times()
+    try:
+        _LAST_DISKSTATS = _read_diskstats()
+        _LAST_DISKSTATS_TIME = time.monotonic()
+    except OSError:
+        pass
+    time.sleep(float(os.environ.get("DT_CPU_SAMPLE_WINDOW_SECONDS", "0.1")))
 
 def get_cpu_usage():
     """
-    Executes 'top -bn1' and parses the output to extract CPU usage metrics.
+    DT-004: Computes CPU usage from /proc/stat counter deltas since the previous call.
+    DT-006: The same read also yields per-core usage ('cpu_per_core_percent'):
+    one value per core listed in /proc/stat, ordered by core number. Offline
+    cores are not listed, so the list can be shorter than os.cpu_count().
     """
+    global _LAST_CPU_TIMES
+    
     try:
-        # Execute top -bn1 and capture output
-        result = subprocess.run(['top', '-bn1'], capture_output=True, text=True, check=True)
-        lines = result.stdout.strip().split('\n')
-        
-        # The line starting with '%Cpu(s)' contains the data
-        cpu_line = [line for line in lines if line.startswith('%Cpu(s)')][0]
-        
-        # Example: %Cpu(s):  0.0 us,  0.0 sy,  0.0 ni, 99.9 id,  0.0 wa,  0.0 hi,  0.0 si,  0.0 st
-        # We want the 'id' (idle) value to calculate usage (100 - idle)
-        idle_str = cpu_line.split(',')[3].strip().split(' ')[0]
-        idle_percent = float(idle_str)
-        usage_percent = round(100.0 - idle_percent, 1)
+        if _LAST_CPU_TIMES is None:
+            _prime_rate_counters()
+            
+        cpu_times = _read_cpu_times()
+        for name, (idle_ticks, total_ticks) in cpu_times.items():
+            last_idle_ticks, last_total_ticks = _LAST_CPU_TIMES.get(name, (idle_ticks, total_ticks))
+            total_delta = total_ticks - last_total_ticks
+            if total_delta > 0:
+                idle_delta = idle_ticks - last_idle_ticks
+                _LAST_CPU_USAGE[name] = round(100.0 * (total_delta - idle_delta) / total_delta, 1)
+            else:
+                # Keep the previous baseline until the counters have ticked
+                cpu_times[name] = _LAST_CPU_TIMES.get(name, (idle_ticks, total_ticks))
+        _LAST_CPU_TIMES = cpu_times
         
-        return {"cpu_usage_percent": usage_percent}
+        cores = sorted(int(name[3:]) for name in cpu_times if name != "cpu")
+        return {
+            "cpu_usage_percent": _LAST_CPU_USAGE.get("cpu", 0.0),
+            "cpu_per_core_percent": [_LAST_CPU_USAGE.get(f"cpu{core}", 0.0) for core in cores]
+        }
 
     except Exception as e:
         print(f"Error collecting CPU usage: {e}")
@@ -48,25 +165,26 @@ def get_cpu_usage():
 
 def get_memory_usage():
     """
-    Executes 'free -m' and parses the output to extract memory usage metrics in MB.
+    DT-004: Reads /proc/meminfo to extract memory usage metrics in MB.
+    Used memory is total minus available memory (reclaimable caches count as available).
     """
     try:
-        # Execute free -m and capture output
-        result = subprocess.run(['free', '-m'], capture_output=True, text=True, check=True)
-        lines = result.stdout.strip().split('\n')
-        
-        # The second line contains the memory data (Mem:)
-        mem_line = lines[1].split()
-        
-        total_mb = int(mem_line[1])
-        used_mb = int(mem_line[2])
-        free_mb = int(mem_line[3])
+        meminfo = {}
+        with open(PROC_MEMINFO_PATH, 'r') as f:
+            for line in f:
+                # Example: MemTotal:       16310036 kB
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])
+                
+        total_kb = meminfo["MemTotal"]
+        available_kb = meminfo.get("MemAvailable", meminfo["MemFree"] + meminfo.get("Buffers", 0) + meminfo.get("Cached", 0))
+        used_kb = total_kb - available_kb
         
-        usage_percent = round((used_mb / total_mb) * 100.0, 1) if total_mb > 0 else 0.0
+        usage_percent = round((used_kb / total_kb) * 100.0, 1) if total_kb > 0 else 0.0
         
         return {
-            "mem_total_mb": total_mb,
-            "mem_used_mb": used_mb,
+            "mem_total_mb": total_kb // 1024,
+            "mem_used_mb": used_kb // 1024,
             "mem_usage_percent": usage_percent
         }
 
@@ -74,105 +192,211 @@ def get_memory_usage():
         print(f"Error collecting Memory usage: {e}")
         return None
 
-def get_disk_usage():
+def _read_mounts():
     """
-    Executes 'df -h /' and parses the output to extract disk usage metrics.
+    Returns the mount table from /proc/mounts as a list of (device, mount_point, fstype).
+    """
+    mounts = []
+    with open(PROC_MOUNTS_PATH, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) > 2:
+                # Mount points with spaces are octal-escaped in /proc/mounts
+                mounts.append((fields[0], fields[1].replace('\\040', ' '), fields[2]))
+    return mounts
+
+def _find_mount_source(mount_point):
+    """
+    Returns the device mounted at `mount_point` according to /proc/mounts.
+    """
+    if mount_point not in _MOUNT_SOURCES:
+        source = "unknown"
+        try:
+            for device, mounted_at, fstype in _read_mounts():
+                # Later entries shadow earlier mounts on the same point
+                if mounted_at == mount_point:
+                    source = device
+        except OSError:
+            pass
+        _MOUNT_SOURCES[mount_point] = source
+    return _MOUNT_SOURCES[mount_point]
+
+def _statvfs_usage(mount_point):
+    """
+    Returns (size_bytes, used_bytes, available_bytes, usage_percent) for a mount point.
+    The usage percentage follows df: used / (used + available to unprivileged users), rounded up.
+    """
+    stats = os.statvfs(mount_point)
+    size_bytes = stats.f_blocks * stats.f_frsize
+    used_bytes = (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+    available_bytes = stats.f_bavail * stats.f_frsize
+    
+    usable_bytes = used_bytes + available_bytes
+    usage_percent = math.ceil(used_bytes * 100 / usable_bytes) if usable_bytes > 0 else 0
+    return size_bytes, used_bytes, available_bytes, usage_percent
+
+def get_disk_usage(mount_point="/"):
+    """
+    DT-004: Uses os.statvfs to extract exact disk usage metrics for a mount point.
     """
     try:
-        # Execute df -h / and capture output
-        result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True, check=True)
-        lines = result.stdout.strip().split('\n')
-        
-        # The second line contains the data
-        if len(lines) < 2:
-            raise ValueError("df output is shorter than expected.")
-            
-        # Split the data line by whitespace
-        data_line = lines[1].split()
-        
-        # Extract raw values
-        size_str = data_line[1]
-        used_str = data_line[2]
-        avail_str = data_line[3]
-        use_percent_str = data_line[4].replace('%', '')
+        size_bytes, used_bytes, available_bytes, usage_percent = _statvfs_usage(mount_point)
         
-        # Helper to convert human-readable size (e.g., 40G, 8.2G) to float in GB
-        def parse_size_to_gb(size_h):
-            size_h = size_h.upper()
-            if size_h.endswith('G'):
-                return float(size_h.replace('G', ''))
-            elif size_h.endswith('T'):
-                return float(size_h.replace('T', '')) * 1024
-            # Assume MB or less, convert to GB (rough estimate for sandbox)
-            elif size_h.endswith('M'):
-                return float(size_h.replace('M', '')) / 1024
-            return float(size_h) / (1024**3) # Assume bytes if no unit
-            
         # Format the data according to the Artifact Contract
         metrics = {
-            "disk_filesystem": data_line[0],
-            "disk_size_gb": round(parse_size_to_gb(size_str), 1),
-            "disk_used_gb": round(parse_size_to_gb(used_str), 1),
-            "disk_available_gb": round(parse_size_to_gb(avail_str), 1),
-            "disk_usage_percent": int(use_percent_str)
+            "disk_filesystem": _find_mount_source(mount_point),
+            "disk_size_gb": round(size_bytes / BYTES_PER_GB, 1),
+            "disk_used_gb": round(used_bytes / BYTES_PER_GB, 1),
+            "disk_available_gb": round(available_bytes / BYTES_PER_GB, 1),
+            "disk_usage_percent": usage_percent
         }
         
         return metrics
 
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing 'df': {e}")
+    except Exception as e:
+        print(f"Error collecting Disk usage: {e}")
+        return None
+
+def _split_patterns(value):
+    """
+    Splits a comma-separated list of glob patterns from the environment.
+    """
+    return [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+
+def get_filesystem_usage():
+    """
+    DT-006: Reports usage for every mounted filesystem.
+
+    Pseudo filesystem types (DT_FS_EXCLUDE_TYPES) are skipped, as are repeated
+    mounts of the same device. Mount points can be filtered with comma-separated
+    glob patterns in DT_FS_INCLUDE and DT_FS_EXCLUDE.
+    Returns {"filesystems": {mount_point: {...}}}.
+    """
+    exclude_types = set(_split_patterns(os.environ.get("DT_FS_EXCLUDE_TYPES", DEFAULT_FS_EXCLUDE_TYPES)))
+    include_patterns = _split_patterns(os.environ.get("DT_FS_INCLUDE", ""))
+    exclude_patterns = _split_patterns(os.environ.get("DT_FS_EXCLUDE", ""))
+    
+    try:
+        filesystems = {}
+        seen_devices = set()
+        for device, mount_point, fstype in _read_mounts():
+            if fstype in exclude_types or device in seen_devices:
+                continue
+            if include_patterns and not any(fnmatch.fnmatch(mount_point, pattern) for pattern in include_patterns):
+                continue
+            if any(fnmatch.fnmatch(mount_point, pattern) for pattern in exclude_patterns):
+                continue
+            try:
+                size_bytes, used_bytes, available_bytes, usage_percent = _statvfs_usage(mount_point)
+            except OSError:
+                # Unreachable network mounts or mounts we lack permission for
+                continue
+            if size_bytes <= 0:
+                continue
+                
+            seen_devices.add(device)
+            filesystems[mount_point] = {
+                "device": device,
+                "size_gb": round(size_bytes / BYTES_PER_GB, 1),
+                "used_gb": round(used_bytes / BYTES_PER_GB, 1),
+                "available_gb": round(available_bytes / BYTES_PER_GB, 1),
+                "usage_percent": usage_percent
+            }
+            
+        return {"filesystems": filesystems}
+
+    except Exception as e:
+        print(f"Error collecting Filesystem usage: {e}")
         return None
+
+def get_disk_io_usage():
+    """
+    DT-006: Computes disk I/O throughput from /proc/diskstats deltas since the previous call.
+
+    Only whole block devices are reported; partitions and the device name
+    patterns in DT_DISK_EXCLUDE (default 'loop*,ram*,zram*') are skipped.
+    Returns {"disk_io": {device: {"read_bytes_per_sec", "write_bytes_per_sec",
+    "reads_per_sec", "writes_per_sec"}}}.
+    """
+    global _LAST_DISKSTATS, _LAST_DISKSTATS_TIME
+    
+    exclude_patterns = _split_patterns(os.environ.get("DT_DISK_EXCLUDE", DEFAULT_DISK_EXCLUDE))
+    
+    try:
+        if _LAST_DISKSTATS is None:
+            _prime_rate_counters()
+            
+        diskstats = _read_diskstats()
+        now = time.monotonic()
+        elapsed = max(now - _LAST_DISKSTATS_TIME, 1e-6)
+        
+        disk_io = {}
+        for device, (reads, sectors_read, writes, sectors_written) in diskstats.items():
+            if device not in _LAST_DISKSTATS or not os.path.exists(os.path.join(SYS_BLOCK_PATH, device)):
+                continue
+            if any(fnmatch.fnmatch(device, pattern) for pattern in exclude_patterns):
+                continue
+            last_reads, last_sectors_read, last_writes, last_sectors_written = _LAST_DISKSTATS[device]
+            disk_io[device] = {
+                "read_bytes_per_sec": round((sectors_read - last_sectors_read) * SECTOR_BYTES / elapsed, 1),
+                "write_bytes_per_sec": round((sectors_written - last_sectors_written) * SECTOR_BYTES / elapsed, 1),
+                "reads_per_sec": round((reads - last_reads) / elapsed, 1),
+                "writes_per_sec": round((writes - last_writes) / elapsed, 1)
+            }
+            
+        _LAST_DISKSTATS = diskstats
+        _LAST_DISKSTATS_TIME = now
+        return {"disk_io": disk_io}
+
     except Exception as e:
-        print(f"Error parsing 'df' output: {e}")
+        print(f"Error collecting Disk I/O usage: {e}")
         return None
 
 def validate_metrics(metrics):
     """
     DT-003: Implements data validation and quality checks.
+    AT-010: Checks the metrics against the Artifact Contract schema shared with
+    CT-002, plus the non-zero resource sizes, and reports every violation.
     Returns True if valid, False otherwise.
     """
-    # Disk Usage Check
-    disk_percent = metrics.get("disk_usage_percent")
-    if disk_percent is not None and not (0 <= disk_percent <= 100):
-        print(f"Validation Error: Disk usage percent ({disk_percent}) is out of range.")
-        return False
-
-    # CPU Usage Check
-    cpu_percent = metrics.get("cpu_usage_percent")
-    if cpu_percent is not None and not (0.0 <= cpu_percent <= 100.0):
-        print(f"Validation Error: CPU usage percent ({cpu_percent}) is out of range.")
-        return False
+    violations = PUBLISHER_METRICS_VALIDATOR.violations(metrics)
+    for violation in violations:
+        print(f"Validation Error: {violation}")
+    return not violations
 
-    # Memory Usage Check
-    mem_percent = metrics.get("mem_usage_percent")
-    if mem_percent is not None and not (0.0 <= mem_percent <= 100.0):
-        print(f"Validation Error: Memory usage percent ({mem_percent}) is out of range.")
-        return False
+def collect_metrics():
+    """
+    Collects the Disk, CPU and Memory metrics (DT-002) into a single dictionary.
+    DT-006: Also includes every mounted filesystem, per-core CPU and disk I/O throughput.
+    """
+    collected = [
+        get_disk_usage(),
+        get_cpu_usage(),
+        get_memory_usage(),
+        get_filesystem_usage(),
+        get_disk_io_usage()
+    ]
+    
+    # Combine all metrics
+    all_metrics = {}
+    for metrics in collected:
+        if metrics:
+            all_metrics.update(metrics)
         
-    # Check for non-zero total size (basic sanity check)
-    if metrics.get("disk_size_gb", 0) <= 0 or metrics.get("mem_total_mb", 0) <= 0:
-        print("Validation Error: Total resource size is zero or negative.")
-        return False
+    return all_metrics
 
-    return True
+def get_host_name():
+    """
+    CR-009: Returns the host name reports are attributed to (DT_HOST_NAME, default the system host name).
+    """
+    return os.environ.get("DT_HOST_NAME") or socket.gethostname()
 
 def generate_report():
     """
     Generates the final JSON report as per the Artifact Contract,
     now including CPU and Memory metrics (DT-002).
     """
-    disk_metrics = get_disk_usage()
-    cpu_metrics = get_cpu_usage()
-    mem_metrics = get_memory_usage()
-    
-    # Combine all metrics
-    all_metrics = {}
-    if disk_metrics:
-        all_metrics.update(disk_metrics)
-    if cpu_metrics:
-        all_metrics.update(cpu_metrics)
-    if mem_metrics:
-        all_metrics.update(mem_metrics)
+    all_metrics = collect_metrics()
         
     # DT-003: Perform Data Validation
     if not validate_metrics(all_metrics):
@@ -195,7 +419,9 @@ def generate_report():
     report = {
         "timestamp": datetime.now().isoformat(),
         "team_id": "Data Team",
+        "schema_version": SCHEMA_VERSION,
         "resource_type": "System Resources",
+        "host": get_host_name(),
         "metrics": all_metrics
     }
     
@@ -204,6 +430,7 @@ def generate_report():
 def publish_to_file_system(report_data):
     """
     Fallback: Publishes the report to the file system MQ.
+    AT-004: The payload is encoded with the MQ_CODEC codec (compact JSON by default).
     """
     mq_dir = os.environ.get("MQ_NEW_DIR")
     if not mq_dir:
@@ -211,17 +438,43 @@ def publish_to_file_system(report_data):
         return
 
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
-    output_path = os.path.join(mq_dir, f"resource_report_{timestamp}.json")
+    output_path = os.path.join(mq_dir, f"resource_report_{timestamp}{message_file_extension()}")
     
     # Ensure atomic write: write to a temp file first, then rename
     temp_path = output_path + ".tmp"
-    with open(temp_path, 'w') as f:
-        json.dump(report_data, f, indent=2)
+    with open(temp_path, 'wb') as f:
+        f.write(encode_message(report_data))
         
     os.rename(temp_path, output_path)
         
     print(f"Data Team (DT-001) published message to File System MQ: {output_path}")
 
+def publish_to_segment_log(report_data):
+    """
+    AT-005: Appends the report to the MQ_TOPIC_DISK_USAGE topic of the segmented log MQ.
+    """
+    topic = os.environ.get("MQ_TOPIC_DISK_USAGE", "disk_usage")
+    offset, = SegmentLog(topic).append(encode_message(report_data))
+    print(f"Data Team (DT-001) published message to Segment Log MQ: {topic}@{offset}")
+
+def encode_stream_fields(report_data):
+    """
+    AT-004: Builds the Redis Stream entry fields for a report.
+    JSON reports keep the original {'data': <json string>} layout; other codecs
+    add a 'codec' field and carry the framed binary payload.
+    """
+    codec = get_codec_name()
+    payload = encode_message(report_data, codec)
+    if codec == "json":
+        return {'data': payload.decode('utf-8')}
+    return {'codec': codec, 'data': payload}
+
+def get_stream_maxlen():
+    """
+    Returns the approximate Redis Stream length cap (REDIS_STREAM_MAXLEN, default 1000).
+    """
+    return int(os.environ.get("REDIS_STREAM_MAXLEN", "1000"))
+
 def publish_to_redis(report_data):
     """
     Primary: Publishes the report to the Redis Stream MQ.
@@ -236,11 +489,11 @@ def publish_to_redis(report_data):
         return False
 
     try:
-        # Publish the report data as a JSON string
+        # Publish the report data encoded with the MQ_CODEC codec (AT-004)
         message_id = REDIS_CLIENT.xadd(
             stream_name,
-            {'data': json.dumps(report_data)},
-            maxlen=1000, # Keep stream size manageable
+            encode_stream_fields(report_data),
+            maxlen=get_stream_maxlen(), # Keep stream size manageable
             approximate=True
         )
         print(f"Data Team (DT-001) published message to Redis Stream: {stream_name} with ID {message_id}")
@@ -249,11 +502,291 @@ def publish_to_redis(report_data):
         print(f"CRITICAL ERROR publishing to Redis Stream: {e}")
         return False
 
+def _chunked(items, chunk_size):
+    """
+    Yields lists of up to `chunk_size` items from any iterable.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def publish_batch_to_redis(reports, chunk_size=None):
+    """
+    DT-007: Publishes many reports to the Redis Stream with pipelined XADDs.
+
+    `reports` may be any iterable (a list, a generator replaying buffered
+    reports, ...). It is consumed in chunks of `chunk_size` reports
+    (DT_PUBLISH_CHUNK_SIZE, default 500), and each chunk is sent as one
+    non-transactional pipeline, i.e. one round trip on a pooled connection.
+    Returns one (message_id, error) tuple per report, in input order, where
+    `error` is None on success and `message_id` is None on failure.
+    """
+    if chunk_size is None:
+        chunk_size = int(os.environ.get("DT_PUBLISH_CHUNK_SIZE", "500"))
+    chunk_size = max(1, chunk_size)
+    stream_name = os.environ.get("REDIS_STREAM_NAME")
+    
+    results = []
+    for chunk in _chunked(reports, chunk_size):
+        if not REDIS_AVAILABLE or not stream_name:
+            results.extend((None, "Redis not available or REDIS_STREAM_NAME not set") for _ in chunk)
+            continue
+            
+        chunk_results = [None] * len(chunk)
+        pipelined_positions = []
+        pipeline = REDIS_CLIENT.pipeline(transaction=False)
+        for position, report_data in enumerate(chunk):
+            try:
+                fields = encode_stream_fields(report_data)
+            except Exception as e:
+                chunk_results[position] = (None, f"Encoding failed: {e}")
+                continue
+            pipeline.xadd(stream_name, fields, maxlen=get_stream_maxlen(), approximate=True)
+            pipelined_positions.append(position)
+            
+        try:
+            replies = pipeline.execute(raise_on_error=False) if pipelined_positions else []
+        except Exception as e:
+            # Connection-level failure: nothing in this chunk is known to be published
+            replies = [e] * len(pipelined_positions)
+            
+        for position, reply in zip(pipelined_positions, replies):
+            if isinstance(reply, Exception):
+                chunk_results[position] = (None, str(reply))
+            else:
+                message_id = reply.decode('utf-8') if isinstance(reply, bytes) else reply
+                chunk_results[position] = (message_id, None)
+        results.extend(chunk_results)
+        
+    failed_count = sum(1 for message_id, error in results if error is not None)
+    print(f"Data Team (DT-001) published {len(results) - failed_count} messages to Redis Stream: {stream_name} ({failed_count} failed)")
+    return results
+
+def get_report_spool():
+    """
+    DT-008: Returns the process-wide store-and-forward spool.
+    """
+    global _REPORT_SPOOL
+    if _REPORT_SPOOL is None:
+        _REPORT_SPOOL = ReportSpool()
+    return _REPORT_SPOOL
+
+def forward_spooled_reports():
+    """
+    DT-008: Replays spooled reports to the Redis Stream, in order and in batches.
+    Returns the number of reports forwarded.
+    """
+    spool = get_report_spool()
+    if not spool.has_pending():
+        return 0
+    if not REDIS_AVAILABLE and not connect_redis():
+        return 0
+    return spool.forward(publish_batch_to_redis)
+
+def _run_spool_forwarder(interval):
+    while not SHUTDOWN_EVENT.wait(interval):
+        try:
+            forward_spooled_reports()
+        except Exception as e:
+            print(f"Data Team (DT-001) Spool: Forwarder error: {e}")
+
+def start_spool_forwarder():
+    """
+    DT-008: Starts a background thread that forwards spooled reports every
+    DT_SPOOL_FORWARD_INTERVAL_SECONDS (default 5) until shutdown.
+    """
+    interval = float(os.environ.get("DT_SPOOL_FORWARD_INTERVAL_SECONDS", "5"))
+    forwarder = threading.Thread(target=_run_spool_forwarder, args=(interval,), name="dt001-spool-forwarder", daemon=True)
+    forwarder.start()
+    return forwarder
+
+def publish_report(final_report):
+    """
+    Publishes a report to the MQ using Redis-first logic.
+    DT-008: When Redis publishing fails, or earlier reports are still spooled,
+    the report goes to the local spool instead, so delivery order is kept and
+    everything ends up in the stream once Redis recovers.
+    """
+    mq_type = os.environ.get("MQ_TYPE", "FILE_SYSTEM")
+    
+    if mq_type == "REDIS_STREAMS":
+        spool = get_report_spool()
+        if spool.has_pending():
+            forward_spooled_reports()
+        if not spool.has_pending() and publish_to_redis(final_report):
+            return
+        print("CRITICAL: Redis publish failed or spooled reports are pending. Spooling report for later delivery.")
+        spool.append(final_report)
+            
+    elif mq_type == "SEGMENT_LOG":
+        publish_to_segment_log(final_report)
+            
+    else: # Default to FILE_SYSTEM
+        publish_to_file_system(final_report)
+
+class MetricRingBuffer:
+    """
+    DT-005: Fixed-capacity ring buffer of samples for a single metric.
+    Once full, each new sample overwrites the oldest one.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, capacity)
+        self.samples = array('d', bytes(8 * self.capacity))
+        self.count = 0
+        self.position = 0
+
+    def append(self, value):
+        self.samples[self.position] = value
+        self.position = (self.position + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self):
+        """
+        Returns the buffered samples, oldest first.
+        """
+        if self.count < self.capacity:
+            return self.samples[:self.count].tolist()
+        return (self.samples[self.position:] + self.samples[:self.position]).tolist()
+
+    def summary(self):
+        """
+        Returns min/max/mean/p95 (nearest-rank) over the buffered samples.
+        """
+        ordered = sorted(self.values())
+        p95_index = max(0, math.ceil(0.95 * len(ordered)) - 1)
+        return {
+            "min": ordered[0],
+            "max": ordered[-1],
+            "mean": round(sum(ordered) / len(ordered), 2),
+            "p95": ordered[p95_index]
+        }
+
+def flatten_numeric_metrics(metrics, prefix=""):
+    """
+    DT-006: Yields (dotted_key, value) for every numeric value in a nested metrics dictionary.
+    List entries are keyed by index, e.g. 'cpu_per_core_percent.3'.
+    """
+    items = metrics.items() if isinstance(metrics, dict) else enumerate(metrics)
+    for key, value in items:
+        dotted_key = f"{prefix}{key}"
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            yield dotted_key, value
+        elif isinstance(value, (dict, list)):
+            yield from flatten_numeric_metrics(value, dotted_key + ".")
+
+def build_window_report(latest_metrics, buffers, window_start, sample_count):
+    """
+    DT-005: Builds one report for a sampling window.
+
+    `metrics` carries the latest sample, so existing consumers keep working;
+    `metrics_summary` carries min/max/mean/p95 per numeric metric over the window,
+    with nested metrics keyed by dotted path (e.g. 'filesystems./data.usage_percent').
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "team_id": "Data Team",
+        "schema_version": SCHEMA_VERSION,
+        "resource_type": "System Resources",
+        "host": get_host_name(),
+        "metrics": latest_metrics,
+        "metrics_summary": {key: buffer.summary() for key, buffer in buffers.items() if buffer.count},
+        "sample_count": sample_count,
+        "window_start": window_start
+    }
+
+def _request_shutdown(signum, frame):
+    """
+    Signal handler for graceful shutdown of the resource sampler.
+    """
+    print(f"Data Team (DT-001) Sampler: Received signal {signum}. Publishing the final window and shutting down.")
+    SHUTDOWN_EVENT.set()
+
+def run_resource_sampler(sample_interval=None, publish_interval=None, max_reports=None):
+    """
+    DT-005: Runs the reporter as a resident high-frequency sampler.
+
+    Metrics are collected every DT_SAMPLE_INTERVAL_SECONDS (default 1) into
+    per-metric ring buffers holding DT_SAMPLE_BUFFER_SIZE samples (default:
+    one publish window). Every DT_PUBLISH_INTERVAL_SECONDS (default 60) a single
+    report summarizing the window is published, so the MQ receives one message
+    per window instead of one per sample. Stops on SIGTERM/SIGINT (publishing
+    the partial window) or after `max_reports` reports.
+    Returns the number of reports published.
+    """
+    if sample_interval is None:
+        sample_interval = float(os.environ.get("DT_SAMPLE_INTERVAL_SECONDS", "1"))
+    if publish_interval is None:
+        publish_interval = float(os.environ.get("DT_PUBLISH_INTERVAL_SECONDS", "60"))
+    capacity = int(os.environ.get("DT_SAMPLE_BUFFER_SIZE", "0")) or math.ceil(publish_interval / sample_interval)
+    
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _request_shutdown)
+        signal.signal(signal.SIGINT, _request_shutdown)
+        
+    print(f"Data Team (DT-001) Sampler: Sampling every {sample_interval}s, publishing every {publish_interval}s.")
+    
+    if os.environ.get("MQ_TYPE", "FILE_SYSTEM") == "REDIS_STREAMS":
+        start_spool_forwarder()
+    
+    buffers = {}
+    latest_metrics = None
+    sample_count = 0
+    window_start = datetime.now().isoformat()
+    published_count = 0
+    
+    next_sample = time.monotonic()
+    next_publish = next_sample + publish_interval
+    
+    while True:
+        stopping = SHUTDOWN_EVENT.is_set()
+        
+        if not stopping:
+            metrics = collect_metrics()
+            if validate_metrics(metrics):
+                latest_metrics = metrics
+                sample_count += 1
+                for key, value in flatten_numeric_metrics(metrics):
+                    if key not in buffers:
+                        buffers[key] = MetricRingBuffer(capacity)
+                    buffers[key].append(value)
+                        
+        if (stopping or time.monotonic() >= next_publish) and latest_metrics is not None:
+            publish_report(build_window_report(latest_metrics, buffers, window_start, sample_count))
+            published_count += 1
+            buffers = {}
+            latest_metrics = None
+            sample_count = 0
+            window_start = datetime.now().isoformat()
+            next_publish += publish_interval
+            
+        if stopping or (max_reports and published_count >= max_reports):
+            break
+            
+        # Schedule against the monotonic clock so collection time does not cause drift
+        next_sample += sample_interval
+        SHUTDOWN_EVENT.wait(max(0.0, next_sample - time.monotonic()))
+        
+    if _REPORT_SPOOL is not None:
+        _REPORT_SPOOL.close()
+    print(f"Data Team (DT-001) Sampler: Stopped after publishing {published_count} reports.")
+    return published_count
+
 def generate_report_and_publish():
     """
     Entry point for the Data Team's resource reporter.
     Generates the report and publishes it to the MQ using Redis-first logic.
+    DT-005: DT_REPORTER_MODE=SAMPLER runs the resident sampler instead of a single snapshot.
     """
+    if os.environ.get("DT_REPORTER_MODE", "SNAPSHOT") == "SAMPLER":
+        run_resource_sampler()
+        return
+        
     final_report = generate_report()
     
     # Check if the report is an error structure
@@ -261,17 +794,11 @@ def generate_report_and_publish():
         print(f"Data Team (DT-001) failed to generate a valid report: {final_report.get('message')}")
         return
 
-    mq_type = os.environ.get("MQ_TYPE", "FILE_SYSTEM")
+    publish_report(final_report)
     
-    if mq_type == "REDIS_STREAMS":
-        if publish_to_redis(final_report):
-            return
-        else:
-            print("CRITICAL: Redis publish failed. Falling back to File System MQ.")
-            publish_to_file_system(final_report)
-            
-    else: # Default to FILE_SYSTEM
-        publish_to_file_system(final_report)
+    # Make any spooled report durable before the process exits
+    if _REPORT_SPOOL is not None:
+        _REPORT_SPOOL.close()
 
 if __name__ == "__main__":
     generate_report_and_publish()
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+
+from src.mq_segment_log import SegmentLog
+
+# DT-008: Durable store-and-forward spool for reports that could not be published to Redis.
+#
+# Reports are appended, in arrival order, to a topic of the AT-005 segmented
+# log (records are length + CRC32 + compact JSON). A forwarder later replays
+# them to the stream in order and in batches, and keeps its position as the
+# log's 'forwarder' consumer group offset so nothing is replayed twice after
+# a restart.
+
+SPOOL_TOPIC = "reports"
+FORWARDER_GROUP = "forwarder"
+
+class ReportSpool:
+    """
+    DT-008: Append-only, segmented on-disk spool of reports.
+
+    Writes reach the OS on every append and are fsynced in batches: after
+    `fsync_batch` records or `fsync_interval` seconds, whichever comes first.
+    Segments rotate at `segment_bytes` and are deleted once fully forwarded.
+    """
+
+    def __init__(self, spool_dir=None, segment_bytes=None, fsync_batch=None, fsync_interval=None):
+        self.spool_dir = spool_dir or os.environ.get("DT_SPOOL_DIR", "parallel_orchestration/spool")
+        segment_bytes = segment_bytes or int(os.environ.get("DT_SPOOL_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+        self.fsync_batch = fsync_batch or int(os.environ.get("DT_SPOOL_FSYNC_BATCH", "32"))
+        self.fsync_interval = fsync_interval if fsync_interval is not None else float(os.environ.get("DT_SPOOL_FSYNC_INTERVAL_SECONDS", "1"))
+        self.log = SegmentLog(SPOOL_TOPIC, base_dir=self.spool_dir, segment_bytes=segment_bytes)
+
+        self._unsynced_records = 0
+        self._last_fsync = time.monotonic()
+        # Guards the fsync bookkeeping when a forwarder thread shares this instance
+        self._lock = threading.Lock()
+
+    # --- Writer ---
+
+    def append(self, report_data):
+        """
+        Appends one report to the spool.
+        """
+        payload = json.dumps(report_data, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._unsynced_records += 1
+            fsync = self._unsynced_records >= self.fsync_batch or time.monotonic() - self._last_fsync >= self.fsync_interval
+            self.log.append(payload, fsync=fsync)
+            if fsync:
+                self._unsynced_records = 0
+                self._last_fsync = time.monotonic()
+
+    def close(self):
+        """
+        Makes every appended report durable and releases the log's memory maps.
+        """
+        with self._lock:
+            if self._unsynced_records:
+                self.log.sync()
+                self._unsynced_records = 0
+            self.log.close()
+
+    # --- Forwarder ---
+
+    def has_pending(self):
+        """
+        Returns True if any spooled report has not been forwarded yet.
+        """
+        return self.log.committed_offset(FORWARDER_GROUP) < self.log.end_offset()
+
+    def forward(self, publish_batch, batch_size=None):
+        """
+        Replays spooled reports in order through `publish_batch`, a callable that
+        takes a list of reports and returns one (message_id, error) tuple each
+        (e.g. publish_batch_to_redis).
+
+        The offset only advances past the reports that were published before the
+        first failure, so order is preserved and the rest is retried on the next
+        call. Records corrupted on disk are skipped. Fully forwarded segments are deleted. Only one forwarder runs at a
+        time; concurrent calls return immediately.
+        Returns the number of reports forwarded.
+        """
+        if batch_size is None:
+            batch_size = int(os.environ.get("DT_SPOOL_FORWARD_BATCH_SIZE", "500"))
+
+        with self.log.group_lock(FORWARDER_GROUP, blocking=False) as acquired:
+            if not acquired:
+                return 0
+
+            forwarded_count = 0
+            while True:
+                records = self.log.read_group(FORWARDER_GROUP, batch_size)
+                if not records:
+                    break
+
+                reports = []
+                for offset, payload in records:
+                    if payload is None:
+                        print(f"Error: Data Team (DT-001) Spool: Dropping corrupted spooled report at offset {offset}.")
+                        continue
+                    reports.append((offset, json.loads(payload)))
+
+                results = publish_batch([report for offset, report in reports]) if reports else []
+                published = 0
+                for message_id, error in results:
+                    if error is not None:
+                        break
+                    published += 1
+
+                # Commit up to the first report that failed, past any corrupted records before it
+                next_offset = reports[published][0] if published < len(reports) else records[-1][0] + 1
+                if next_offset > records[0][0]:
+                    self.log.commit(FORWARDER_GROUP, next_offset)
+                forwarded_count += published
+                if published < len(reports):
+                    print(f"Data Team (DT-001) Spool: Forwarding paused after {forwarded_count} reports; will retry.")
+                    break
+
+            self.log.delete_consumed_segments()
+            if forwarded_count:
+                print(f"Data Team (DT-001) Spool: Forwarded {forwarded_count} spooled reports.")
+            return forwarded_count
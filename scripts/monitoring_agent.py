@@ -1,67 +1,282 @@
 import json
 import os
+import signal
+import sys
+import threading
+from collections import namedtuple
 from datetime import datetime, timedelta
-import time
 
-# Define the paths based on the .env file (assuming it's loaded or paths are known)
-HEALTH_CHECK_FILE = "parallel_orchestration/health_check.json"
-LOG_FILE = "parallel_orchestration/code_team_ct002_report_mq.json"
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from scripts.load_env import load_env
+from src.insight_rules import SEVERITY_CODES, SEVERITY_CRITICAL, SEVERITY_NAMES, SEVERITY_OK, SEVERITY_WARNING, get_rule_set
 
-def check_health_status():
+# Load environment variables (AT-002)
+load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# Define the paths based on the .env file
+HEALTH_CHECK_FILE = os.environ.get("AT_HEALTH_CHECK_FILE", "parallel_orchestration/health_check.json")
+LOG_FILE = os.environ.get("CT_OUTPUT_FILE", "parallel_orchestration/code_team_ct002_report_mq.json")
+
+# Define a threshold for "stale" data (e.g., 5 minutes)
+STALE_AFTER = timedelta(minutes=5)
+
+# AT-012: Resident monitoring agent.
+#
+# Every watched file is stat'ed on each poll and only re-read and parsed when
+# its (inode, mtime, size) signature changed; otherwise the parsed value of
+# the last read is evaluated again (health checks still go stale with time).
+# The agent keeps each check's alert level and hands an Alert to its sink only
+# when the level changes. A new level must persist for
+# AT_MONITOR_CONFIRM_POLLS consecutive polls before it is reported, so a
+# check flapping between levels (or a half-written file) does not raise an
+# alert on every poll. A steady check costs one stat per poll.
+
+Alert = namedtuple("Alert", ("check", "severity_code", "previous_severity_code", "message", "timestamp"))
+
+# Set by SIGTERM/SIGINT; the agent stops before its next poll
+STOP_EVENT = threading.Event()
+
+def _request_stop(signum, frame):
     """
-    Simulates checking the AT-003 Health Check File.
+    Signal handler for graceful shutdown of the monitoring agent.
+    """
+    print(f"Monitoring Agent (AT-012): Received signal {signum}. Stopping after the current poll.")
+    STOP_EVENT.set()
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class WatchedFile:
+    """
+    AT-012: A JSON file that is only re-read and parsed when its stat signature changes.
+    """
+
+    def __init__(self, path, parse=None):
+        self.path = path
+        self.parse = parse or (lambda data: data)
+        self.signature = None
+        self.value = None
+        self.read_count = 0
+
+    def poll(self):
+        """
+        Returns the parsed file. Raises FileNotFoundError if the file is missing,
+        or the error of reading or parsing it (retried on the next poll).
+        """
+        try:
+            signature = _file_signature(self.path)
+        except FileNotFoundError:
+            self.signature = None
+            raise
+        if signature != self.signature:
+            self.signature = None
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.read_count += 1
+            self.value = self.parse(data)
+            self.signature = signature
+        return self.value
+
+def _parse_health(health_data):
+    last_time_str = health_data.get("last_processed_time")
+    return health_data, datetime.fromisoformat(last_time_str) if last_time_str else None
+
+def evaluate_health(watched_file, now=None):
+    """
+    Checks the AT-003 Health Check File. Returns (severity code, message).
     """
-    print("\n--- Centralized Monitoring Agent: Health Check ---")
     try:
-        with open(HEALTH_CHECK_FILE, 'r') as f:
-            health_data = json.load(f)
-            
-        status = health_data.get("status", "UNKNOWN")
-        last_time_str = health_data.get("last_processed_time")
-        
-        if status != "HEALTHY":
-            print(f"ALERT: Service is reporting status: {status}")
-            return
-            
-        last_processed_time = datetime.fromisoformat(last_time_str)
-        time_since_last_process = datetime.now() - last_processed_time
-        
-        # Define a threshold for "stale" data (e.g., 5 minutes)
-        if time_since_last_process > timedelta(minutes=5):
-            print(f"WARNING: Service is HEALTHY but data is stale. Last processed {time_since_last_process} ago.")
-        else:
-            print(f"OK: Service is HEALTHY and last processed {time_since_last_process.seconds} seconds ago.")
-            
+        health_data, last_processed_time = watched_file.poll()
     except FileNotFoundError:
-        print(f"CRITICAL: Health Check file not found at {HEALTH_CHECK_FILE}. Service may be down.")
+        return SEVERITY_CRITICAL, f"CRITICAL: Health Check file not found at {watched_file.path}. Service may be down."
     except Exception as e:
-        print(f"ERROR: Could not parse Health Check file: {e}")
+        return SEVERITY_WARNING, f"ERROR: Could not parse Health Check file: {e}"
 
-def analyze_latest_log():
+    status = health_data.get("status", "UNKNOWN")
+    if status != "HEALTHY":
+        return SEVERITY_CRITICAL, f"ALERT: Service is reporting status: {status}"
+    if last_processed_time is None:
+        return SEVERITY_WARNING, "ERROR: Could not parse Health Check file: last_processed_time is missing"
+
+    time_since_last_process = (now or datetime.now()) - last_processed_time
+    if time_since_last_process > STALE_AFTER:
+        return SEVERITY_WARNING, f"WARNING: Service is HEALTHY but data is stale. Last processed {time_since_last_process} ago."
+    return SEVERITY_OK, f"OK: Service is HEALTHY and last processed {time_since_last_process.seconds} seconds ago."
+
+def _parse_log(log_data):
+    insight = log_data.get("actionable_insight", "No insight found.")
+    # AT-009: Alert on the structured severity code; older logs are evaluated against the rule set
+    if "insight_severity_code" in log_data:
+        severity_code = log_data["insight_severity_code"]
+    elif "insight_severity" in log_data:
+        severity_code = SEVERITY_CODES.get(log_data["insight_severity"], 0)
+    else:
+        severity_code = get_rule_set().evaluate(log_data.get("metrics_processed", {})).severity_code
+    return severity_code, insight
+
+def evaluate_log(watched_file, now=None):
     """
-    Simulates analyzing the latest Structured Log (CR-003) for actionable insights.
+    Checks the latest Structured Log (CR-003) for actionable insights. Returns (severity code, message).
     """
-    print("\n--- Centralized Monitoring Agent: Log Analysis ---")
     try:
-        with open(LOG_FILE, 'r') as f:
-            log_data = json.load(f)
-            
-        insight = log_data.get("actionable_insight", "No insight found.")
-        
-        if "CRITICAL" in insight:
-            print(f"CRITICAL ALERT: {insight}")
-        elif "WARNING" in insight:
-            print(f"WARNING ALERT: {insight}")
-        else:
-            print(f"INFO: Latest log shows acceptable status: {insight}")
-            
+        severity_code, insight = watched_file.poll()
     except FileNotFoundError:
-        print(f"INFO: Log file not found at {LOG_FILE}. Waiting for first run.")
+        return SEVERITY_OK, f"INFO: Log file not found at {watched_file.path}. Waiting for first run."
     except Exception as e:
-        print(f"ERROR: Could not parse Structured Log file: {e}")
+        return SEVERITY_WARNING, f"ERROR: Could not parse Structured Log file: {e}"
+
+    if severity_code >= SEVERITY_CRITICAL:
+        return SEVERITY_CRITICAL, f"CRITICAL ALERT: {insight}"
+    if severity_code >= SEVERITY_WARNING:
+        return SEVERITY_WARNING, f"WARNING ALERT: {insight}"
+    return SEVERITY_OK, f"INFO: Latest log shows acceptable status: {insight}"
+
+class Check:
+    """
+    AT-012: One monitored file with its evaluator and alert state.
+    """
+
+    def __init__(self, name, watched_file, evaluate):
+        self.name = name
+        self.watched_file = watched_file
+        self.evaluate = evaluate
+        # Last reported level, and the level waiting for confirmation
+        self.severity_code = SEVERITY_OK
+        self.pending_code = SEVERITY_OK
+        self.pending_polls = 0
+
+    def poll(self, confirm_polls, now=None):
+        """
+        Evaluates the check. Returns an Alert if its level changed and was
+        confirmed for `confirm_polls` consecutive polls, otherwise None.
+        """
+        severity_code, message = self.evaluate(self.watched_file, now)
+        if severity_code == self.severity_code:
+            self.pending_polls = 0
+            return None
+        if severity_code != self.pending_code:
+            self.pending_code = severity_code
+            self.pending_polls = 0
+        self.pending_polls += 1
+        if self.pending_polls < confirm_polls:
+            return None
+
+        alert = Alert(self.name, severity_code, self.severity_code, message, (now or datetime.now()).isoformat())
+        self.severity_code = severity_code
+        self.pending_polls = 0
+        return alert
+
+def print_alert(alert):
+    """
+    AT-012: Default alert sink, printing one line per transition.
+    """
+    transition = f"{SEVERITY_NAMES[alert.previous_severity_code]} -> {SEVERITY_NAMES[alert.severity_code]}"
+    print(f"[{alert.timestamp}] {alert.check}: {transition}: {alert.message}")
+
+class JsonLinesSink:
+    """
+    AT-012: Alert sink appending one JSON document per transition to a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, alert):
+        record = dict(alert._asdict(), severity=SEVERITY_NAMES[alert.severity_code])
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+def get_alert_sink():
+    """
+    AT-012: Returns the alert sink: AT_MONITOR_ALERT_FILE (JSON lines) if set, otherwise stdout.
+    """
+    alert_file = os.environ.get("AT_MONITOR_ALERT_FILE")
+    return JsonLinesSink(alert_file) if alert_file else print_alert
+
+def default_checks():
+    """
+    AT-012: The CT-002 health check and structured log, plus one health check per
+    file in AT_MONITOR_HEALTH_FILES (comma-separated), e.g. other services' health files.
+    """
+    checks = [
+        Check("health", WatchedFile(HEALTH_CHECK_FILE, _parse_health), evaluate_health),
+        Check("log", WatchedFile(LOG_FILE, _parse_log), evaluate_log)
+    ]
+    for path in filter(None, (path.strip() for path in os.environ.get("AT_MONITOR_HEALTH_FILES", "").split(","))):
+        checks.append(Check(f"health:{path}", WatchedFile(path, _parse_health), evaluate_health))
+    return checks
+
+class MonitoringAgent:
+    """
+    AT-012: Long-running agent polling its checks and emitting alerts on level transitions only.
+    """
+
+    def __init__(self, checks=None, sink=None, confirm_polls=None):
+        self.checks = checks if checks is not None else default_checks()
+        self.sink = sink or get_alert_sink()
+        self.confirm_polls = confirm_polls if confirm_polls is not None else int(os.environ.get("AT_MONITOR_CONFIRM_POLLS", "2"))
+
+    def poll_once(self, now=None):
+        """
+        Polls every check once and hands the resulting alerts to the sink.
+        Returns the alerts.
+        """
+        alerts = []
+        for check in self.checks:
+            alert = check.poll(self.confirm_polls, now)
+            if alert is not None:
+                alerts.append(alert)
+                try:
+                    self.sink(alert)
+                except Exception as e:
+                    print(f"Error: Monitoring Agent (AT-012) alert sink failed: {e}")
+        return alerts
+
+    def run(self, interval=None, stop_event=None, max_polls=None):
+        """
+        Polls every `interval` seconds (AT_MONITOR_INTERVAL_SECONDS, default 10)
+        until `stop_event` is set or `max_polls` polls were made. Without a
+        `stop_event`, SIGTERM and SIGINT stop the agent between polls.
+        """
+        if interval is None:
+            interval = float(os.environ.get("AT_MONITOR_INTERVAL_SECONDS", "10"))
+        if stop_event is None:
+            stop_event = STOP_EVENT
+            # Signal handlers can only be installed from the main thread
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, _request_stop)
+                signal.signal(signal.SIGINT, _request_stop)
+        poll_count = 0
+        while not stop_event.is_set():
+            self.poll_once()
+            poll_count += 1
+            if max_polls is not None and poll_count >= max_polls:
+                break
+            stop_event.wait(interval)
+
+def check_health_status():
+    """
+    Simulates checking the AT-003 Health Check File.
+    """
+    print("\n--- Centralized Monitoring Agent: Health Check ---")
+    print(evaluate_health(WatchedFile(HEALTH_CHECK_FILE, _parse_health))[1])
+
+def analyze_latest_log():
+    """
+    Simulates analyzing the latest Structured Log (CR-003) for actionable insights.
+    """
+    print("\n--- Centralized Monitoring Agent: Log Analysis ---")
+    print(evaluate_log(WatchedFile(LOG_FILE, _parse_log))[1])
 
 if __name__ == "__main__":
-    print("Starting Simulated Centralized Monitoring Agent...")
-    check_health_status()
-    analyze_latest_log()
-    print("Monitoring check complete.")
+    # AT-012: --once keeps the original one-shot check
+    if "--once" in sys.argv[1:]:
+        print("Starting Simulated Centralized Monitoring Agent...")
+        check_health_status()
+        analyze_latest_log()
+        print("Monitoring check complete.")
+    else:
+        print("Starting Centralized Monitoring Agent (AT-012)...")
+        MonitoringAgent().run()
+        print("Monitoring Agent stopped.")
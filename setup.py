@@ -9,12 +9,18 @@ setup(
         'python-dotenv',
         'redis',
     ],
+    extras_require={
+        'msgpack': ['msgpack'],
+        'bulk': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'orchestration-listener=src.ct_002_data_processor:start_mq_listener',
             'resource-reporter=scripts.dt_001_resource_reporter:generate_report_and_publish',
             'security-auditor=src.st_001_config_auditor:run_security_audit',
             'pdf-generator=src.rt_001_pdf_generator:generate_pdf_report',
+            'orchestration-pipeline=src.pipeline_runner:run_pipeline',
+            'mq-archive-compactor=src.mq_archive_compactor:run_archive_maintenance',
         ],
     },
     author='Meta Mega Orchestration Teams',
@@ -0,0 +1,185 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# AT-011: Content-addressed cache of stage artifacts (FT-001 summaries, RT-001 PDFs).
+#
+# An artifact is stored under the SHA-256 of the stage name, the stage version
+# and the stage's input bytes, so an unchanged input maps to the artifact
+# already produced for it and the stage can skip its work:
+#
+#   <cache_dir>/objects/<key[:2]>/<key>   artifact bytes
+#   <cache_dir>/index.json                {key: {"stage", "size", "created"}}
+#
+# A hit is a single stat plus a touch of the object's mtime, which serves as
+# its last-used time. When a store pushes the cache past its size limit, the
+# least recently used objects are evicted. Stores and evictions hold a lock
+# file, so several processes can share one cache.
+
+OBJECTS_DIR = "objects"
+INDEX_FILE = "index.json"
+
+def cache_enabled():
+    """
+    Returns False if the artifact cache is disabled (AT_ARTIFACT_CACHE=0).
+    """
+    return os.environ.get("AT_ARTIFACT_CACHE", "1") != "0"
+
+class ArtifactCache:
+    """
+    AT-011: On-disk, content-addressed artifact cache with LRU size eviction.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get("AT_ARTIFACT_CACHE_DIR", "parallel_orchestration/artifact_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("AT_ARTIFACT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        os.makedirs(os.path.join(self.cache_dir, OBJECTS_DIR), exist_ok=True)
+
+    @staticmethod
+    def key(stage, version, data):
+        """
+        Returns the cache key of a stage's input (bytes).
+        """
+        digest = hashlib.sha256(f"{stage}\0{version}\0".encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def object_path(self, key):
+        return os.path.join(self.cache_dir, OBJECTS_DIR, key[:2], key)
+
+    def get(self, key):
+        """
+        Returns the path of the cached artifact, or None on a miss.
+        A hit marks the artifact as recently used.
+        """
+        path = self.object_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def read(self, key):
+        """
+        Returns the cached artifact's bytes, or None on a miss.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by another process in between
+            return None
+
+    def materialize(self, key, destination):
+        """
+        Atomically places the cached artifact at `destination`, as a hard link
+        when possible (a copy otherwise). Writers of `destination` must replace
+        the file rather than write into it, or they would modify the cache.
+        Returns True on a hit.
+        """
+        path = self.get(key)
+        if path is None:
+            return False
+        temp_path = f"{destination}.{os.getpid()}.tmp"
+        try:
+            try:
+                os.link(path, temp_path)
+            except FileExistsError:
+                os.remove(temp_path)
+                os.link(path, temp_path)
+            except OSError:
+                shutil.copyfile(path, temp_path)
+        except FileNotFoundError:
+            return False
+        os.replace(temp_path, destination)
+        return True
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(os.path.join(self.cache_dir, "index.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            print(f"Warning: Artifact cache index in {self.cache_dir} is unreadable; starting a new one.")
+            return {}
+
+    def _save_index(self, index):
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(temp_path, index_path)
+
+    def put(self, key, data, stage=None):
+        """
+        Stores an artifact (bytes) under `key` and evicts the least recently
+        used artifacts beyond the size limit.
+        """
+        path = self.object_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._locked():
+            index = self._load_index()
+            index[key] = {"stage": stage, "size": len(data), "created": time.time()}
+            self._evict(index)
+            self._save_index(index)
+
+    def _evict(self, index):
+        total_bytes = sum(entry["size"] for entry in index.values())
+        if total_bytes <= self.max_bytes:
+            return 0
+
+        last_used = {}
+        for key in list(index):
+            try:
+                last_used[key] = os.path.getmtime(self.object_path(key))
+            except FileNotFoundError:
+                total_bytes -= index.pop(key)["size"]
+
+        evicted_count = 0
+        for key in sorted(last_used, key=last_used.get):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self.object_path(key))
+            except FileNotFoundError:
+                pass
+            total_bytes -= index.pop(key)["size"]
+            evicted_count += 1
+        if evicted_count:
+            print(f"Architecture (AT-011) evicted {evicted_count} artifacts from {self.cache_dir}.")
+        return evicted_count
+
+_CACHES = {}
+
+def get_artifact_cache():
+    """
+    AT-011: Returns this process's cache for AT_ARTIFACT_CACHE_DIR, or None if caching is disabled.
+    """
+    if not cache_enabled():
+        return None
+    cache_dir = os.environ.get("AT_ARTIFACT_CACHE_DIR", "parallel_orchestration/artifact_cache")
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = ArtifactCache(cache_dir)
+    return _CACHES[cache_dir]
@@ -0,0 +1,236 @@
+import os
+import sys
+import tarfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.insight_rules import OK_MESSAGE, SEVERITY_NAMES, SEVERITY_OK, get_rule_set
+from src.mq_archive_compactor import BUNDLES_DIR, BUNDLE_SUFFIX
+from src.mq_codec import decode_message, message_file_extensions
+from src.report_schema import REQUIRED_KEYS, REQUIRED_METRICS, Validator, contract_error, report_schema
+
+# CR-010: Vectorized bulk analysis of historical reports (backfill and re-scoring).
+#
+# A batch of reports is loaded once into columnar NumPy arrays and the AT-009
+# insight rules are evaluated over whole columns instead of one report at a
+# time. Results use the process_resource_report schema.
+# Requires the optional 'numpy' package (pip install meta_orchestration_core[bulk]).
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The bulk analysis API requires numpy: pip install meta_orchestration_core[bulk]")
+    return numpy
+
+# AT-010: Optional top-level fields (schema_version, timestamp, host) are
+# checked one by one; a report carrying any optional metric (nested per-core,
+# filesystem and disk I/O fields included) is left to the full validator
+_SCHEMA = report_schema()
+_OPTIONAL_FIELD_VALIDATORS = tuple(
+    (key, Validator(node)) for key, node in _SCHEMA["fields"].items() if key not in REQUIRED_KEYS
+)
+OPTIONAL_METRICS = frozenset(_SCHEMA["fields"]["metrics"]["fields"]) - frozenset(REQUIRED_METRICS)
+_METRIC_NODES = [_SCHEMA["fields"]["metrics"]["fields"][key] for key in REQUIRED_METRICS]
+_MISSING = (float("nan"),) * 3
+
+def _metric_values(report_data):
+    """
+    Fast path: returns the (disk, cpu, mem) values of a report whose fields are
+    valid apart from the ranges of these three metrics (checked column-wise by
+    the caller), or NaNs for any report the fast path cannot clear.
+    """
+    try:
+        metrics = report_data["metrics"]
+        if (type(report_data["team_id"]) is not str or type(report_data["resource_type"]) is not str
+                or not OPTIONAL_METRICS.isdisjoint(metrics)):
+            return _MISSING
+        values = metrics["disk_usage_percent"], metrics["cpu_usage_percent"], metrics["mem_usage_percent"]
+    except (KeyError, TypeError):
+        return _MISSING
+    for key, validator in _OPTIONAL_FIELD_VALIDATORS:
+        if key in report_data and validator.violations(report_data[key]):
+            return _MISSING
+    for value in values:
+        if type(value) is not int and type(value) is not float:
+            return _MISSING
+    return values
+
+def load_report_columns(reports):
+    """
+    CR-010: Loads a batch of report dictionaries into columnar arrays.
+    Returns a dictionary with float64 'disk', 'cpu' and 'mem' columns (NaN for
+    invalid reports), a boolean 'valid' column and the per-report 'errors'
+    (None for valid reports).
+    AT-009: Every metric a rule refers to also has a float64 column under its
+    key path tuple, e.g. ('disk_usage_percent',) (NaN where it is missing or
+    not numeric).
+    """
+    np = _numpy()
+    rows = [_metric_values(report_data) for report_data in reports]
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), 3)
+    # AT-010: Reports of only required fields are cleared by a vectorized range
+    # check (NaN fails it); every other report goes through the same contract
+    # validation as process_resource_report
+    with np.errstate(invalid="ignore"):
+        cleared = ((values >= [node["minimum"] for node in _METRIC_NODES]) & (values <= [node["maximum"] for node in _METRIC_NODES])).all(axis=1)
+    errors = [None if is_cleared else contract_error(report_data) for report_data, is_cleared in zip(reports, cleared.tolist())]
+    valid = np.fromiter((error is None for error in errors), dtype=bool, count=len(rows))
+    values[~valid] = np.nan
+    for row in np.flatnonzero(valid & ~cleared).tolist():
+        metrics = reports[row]["metrics"]
+        values[row] = metrics["disk_usage_percent"], metrics["cpu_usage_percent"], metrics["mem_usage_percent"]
+    columns = {"disk": values[:, 0], "cpu": values[:, 1], "mem": values[:, 2], "valid": valid, "errors": errors}
+    for column, key in zip(("disk", "cpu", "mem"), REQUIRED_METRICS):
+        columns[(key,)] = columns[column]
+
+    for path in get_rule_set().metric_paths():
+        if path not in columns:
+            columns[path] = np.fromiter((_nested_number(report_data, path) for report_data in reports), dtype=np.float64, count=len(rows))
+    return columns
+
+def _nested_value(metrics, path):
+    value = metrics
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+def _nested_number(report_data, path):
+    value = _nested_value(report_data.get("metrics") if isinstance(report_data, dict) else None, path)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return float("nan")
+    return value
+
+def score_columns(columns):
+    """
+    CR-010: Evaluates the AT-009 rules over whole columns.
+    Returns (winners, metric_winners): `winners` is an int32 array holding, per
+    report, the index of the winning rule in get_rule_set().rules (-1 if no rule
+    matched, -2 for invalid reports); `metric_winners` maps each rule metric
+    path to the same kind of array for the rules of that metric alone.
+    """
+    np = _numpy()
+    rules = get_rule_set().rules
+    count = len(columns["valid"])
+
+    # Lowest rank first, so each metric's winning rule is written last
+    order = sorted(range(len(rules)), key=lambda index: rules[index].rank)
+    # Keyed in rule order, so findings come out in the same order as RuleSet.evaluate
+    metric_winners = {rule.path: np.full(count, -1, dtype=np.int32) for rule in rules}
+    with np.errstate(invalid="ignore"):
+        for index in order:
+            rule = rules[index]
+            metric_winners[rule.path][rule.matches(columns[rule.path])] = index
+
+    # Rank position of every rule (0 = no match), to pick the winner across metrics
+    positions = np.zeros(len(rules) + 1, dtype=np.int32)
+    positions[np.array(order, dtype=np.int32)] = np.arange(1, len(rules) + 1, dtype=np.int32)
+    winners = np.full(count, -1, dtype=np.int32)
+    best_positions = np.zeros(count, dtype=np.int32)
+    for column_winners in metric_winners.values():
+        column_positions = positions[column_winners]
+        better = column_positions > best_positions
+        winners[better] = column_winners[better]
+        np.maximum(best_positions, column_positions, out=best_positions)
+
+    winners[~columns["valid"]] = -2
+    return winners, metric_winners
+
+def rescore_reports(reports):
+    """
+    CR-010: Re-scores a batch of historical reports with the point-in-time rules.
+    Returns one process_resource_report-style result per report ({"error": ...}
+    for invalid ones). Rolling windows do not apply, so 'window_aggregates' is
+    always empty and window-derived rules never match.
+    """
+    rules = get_rule_set().rules
+    columns = load_report_columns(reports)
+    winners, metric_winners = score_columns(columns)
+    winners = winners.tolist()
+    metric_winners = [(path, column_winners.tolist()) for path, column_winners in metric_winners.items()]
+
+    results = []
+    for row, (report_data, winner, error) in enumerate(zip(reports, winners, columns["errors"])):
+        if winner == -2:
+            results.append({"error": error})
+            continue
+        metrics = report_data["metrics"]
+        if winner >= 0:
+            rule = rules[winner]
+            findings = [
+                rules[column_winners[row]].finding(_nested_value(metrics, path))
+                for path, column_winners in metric_winners if column_winners[row] >= 0
+            ]
+            top = next(finding for finding in findings if finding["rule_id"] == rule.rule_id)
+            severity, severity_code, rule_id, message = top["severity"], top["severity_code"], rule.rule_id, top["message"]
+        else:
+            findings = []
+            severity, severity_code, rule_id, message = SEVERITY_NAMES[SEVERITY_OK], SEVERITY_OK, None, OK_MESSAGE
+        results.append({
+            "event_type": "RESOURCE_ANALYSIS_COMPLETED",
+            "source_team": report_data["team_id"],
+            "source_timestamp": report_data.get("timestamp", "N/A"),
+            "source_host": report_data.get("host", "unknown"),
+            "processing_status": "SUCCESS",
+            "resource_type": report_data["resource_type"],
+            "metrics_processed": metrics,
+            "window_aggregates": {},
+            "actionable_insight": (
+                f"System status: Disk {metrics['disk_usage_percent']}%, CPU {metrics['cpu_usage_percent']}%, "
+                f"Mem {metrics['mem_usage_percent']}%. {severity}: {message}"
+            ),
+            "insight_severity": severity,
+            "insight_severity_code": severity_code,
+            "insight_rule_id": rule_id,
+            "insight_findings": findings
+        })
+    return results
+
+def iter_archived_reports(archive_dir=None):
+    """
+    CR-010: Yields every decodable report in the MQ archive: loose archived
+    messages first, then the messages rolled into AT-007 bundles.
+    Corrupted messages are skipped.
+    """
+    archive_dir = archive_dir or os.environ.get("MQ_ARCHIVE_DIR")
+    extensions = message_file_extensions()
+    for name in sorted(os.listdir(archive_dir)):
+        path = os.path.join(archive_dir, name)
+        if name.endswith(extensions) and os.path.isfile(path):
+            with open(path, 'rb') as f:
+                try:
+                    yield decode_message(f.read())
+                except ValueError:
+                    continue
+
+    bundles_dir = os.path.join(archive_dir, BUNDLES_DIR)
+    if not os.path.isdir(bundles_dir):
+        return
+    for name in sorted(os.listdir(bundles_dir)):
+        if not name.endswith(BUNDLE_SUFFIX):
+            continue
+        with tarfile.open(os.path.join(bundles_dir, name), "r:gz") as bundle:
+            for member in bundle:
+                if not member.isfile() or not member.name.endswith(extensions):
+                    continue
+                try:
+                    yield decode_message(bundle.extractfile(member).read())
+                except ValueError:
+                    continue
+
+def rescore_archive(archive_dir=None, batch_size=None):
+    """
+    CR-010: Re-scores the whole MQ archive in batches of `batch_size` reports
+    (CT_BULK_BATCH_SIZE, default 100000). Yields one list of results per batch.
+    """
+    if batch_size is None:
+        batch_size = int(os.environ.get("CT_BULK_BATCH_SIZE", "100000"))
+    batch = []
+    for report_data in iter_archived_reports(archive_dir):
+        batch.append(report_data)
+        if len(batch) >= batch_size:
+            yield rescore_reports(batch)
+            batch = []
+    if batch:
+        yield rescore_reports(batch)
@@ -1,27 +1,71 @@
 import json
+import multiprocessing
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.load_env import load_env
+from src.mq_codec import decode_message, encode_message, message_file_extensions
+from src.mq_segment_log import SegmentLog
+from src.fs_watch import IN_MODIFY, open_directory_watcher
+from src.metric_windows import DEFAULT_WINDOW_METRICS, WindowAggregator
+from src.insight_rules import get_rule_set
+from src.report_schema import contract_error
+from src.fleet_state import FleetState, write_fleet_snapshot
+from collections import namedtuple
 from datetime import datetime
 import redis
+import signal
+import socket
+import threading
 import time
 
 # Load environment variables (AT-002)
 load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 # Initialize Redis client (will fail if Redis is not running, but we handle that)
+# AT-004: Responses are not decoded, since payloads may use a binary codec
 try:
     REDIS_CLIENT = redis.Redis(
         host=os.environ.get("REDIS_HOST"),
         port=int(os.environ.get("REDIS_PORT")),
-        decode_responses=True
+        decode_responses=False
     )
     REDIS_CLIENT.ping()
     REDIS_AVAILABLE = True
 except Exception:
     REDIS_AVAILABLE = False
 
+REDIS_CONSUMER_GROUP = "ct002_group"
+
+# CR-006: Consumer groups already created by this process
+_READY_CONSUMER_GROUPS = set()
+
+# CR-007: XAUTOCLAIM cursor per stream and time of the last reclaim pass
+_RECLAIM_CURSORS = {}
+_LAST_RECLAIM_TIME = None
+
+# AT-005: Consumer group of the segmented log MQ and the topic logs opened by this process
+SEGMENT_LOG_CONSUMER_GROUP = "ct002_group"
+_SEGMENT_LOGS = {}
+
+# Outcome of one consumer batch: `processed` messages succeeded, `consumed`
+# messages left the queue (processed, dead-lettered or committed past). Drains
+# continue while a batch consumed anything, even if none of it succeeded.
+BatchOutcome = namedtuple("BatchOutcome", ("processed", "consumed"))
+
+# CR-009: Rolling per-host metric windows (CT_WINDOW_SIZE samples, 0 disables them)
+_WINDOW_SIZE = int(os.environ.get("CT_WINDOW_SIZE", "60"))
+WINDOW_AGGREGATOR = WindowAggregator(_WINDOW_SIZE) if _WINDOW_SIZE > 0 else None
+
+# CR-011: Latest result per host, published as the fleet snapshot (CT_FLEET_FILE)
+FLEET_STATE = FleetState()
+
+# CR-005: Set by SIGTERM/SIGINT to stop the listener daemon between messages
+SHUTDOWN_EVENT = threading.Event()
+
+# AT-006: inotify watcher the idle listener daemon sleeps on
+_MQ_WATCHER = None
+
 def update_health_check(last_processed_data):
     """
     AT-003: Updates the centralized health check file upon successful processing.
@@ -50,23 +94,18 @@ def process_resource_report(report_data):
     Code Team Task CT-002: Processes the Data Team's JSON report (as a dictionary).
     
     Processing involves:
-    1. Validating the presence of key metrics.
+    1. Validating the report against the Artifact Contract (AT-010).
     2. Generating a human-readable summary.
     """
     
     # --- Validation and Processing ---
 
-    # Check for required keys as per Artifact Contract
-    required_keys = ["team_id", "resource_type", "metrics"]
-    if not all(key in report_data for key in required_keys):
-        return {"error": "JSON structure is missing required top-level keys."}
+    # AT-010: Validate against the versioned Artifact Contract schema, reporting every violation
+    error = contract_error(report_data)
+    if error is not None:
+        return {"error": error}
 
-    metrics = report_data.get("metrics", {})
-    
-    # Check for required metrics keys (Updated for DT-002)
-    required_metrics = ["disk_usage_percent", "cpu_usage_percent", "mem_usage_percent"]
-    if not all(key in metrics for key in required_metrics):
-        return {"error": f"JSON metrics object is missing required keys. Expected: {required_metrics}. Found: {list(metrics.keys())}"}
+    metrics = report_data["metrics"]
 
     # CR-003: Formalize Output as a Structured Log Event (JSON)
     
@@ -75,28 +114,144 @@ def process_resource_report(report_data):
     cpu_percent = metrics['cpu_usage_percent']
     mem_percent = metrics['mem_usage_percent']
     
+    # CR-009: Thresholds apply to the host's moving averages, so a single noisy sample
+    # does not raise an alert, and the disk trend projects when the disk fills up
+    aggregates = observe_metric_windows(report_data)
     insight = f"System status: Disk {disk_percent}%, CPU {cpu_percent}%, Mem {mem_percent}%. "
+    rule_metrics = metrics
+    if all(name in aggregates for name in DEFAULT_WINDOW_METRICS):
+        rule_metrics = dict(metrics)
+        for name in DEFAULT_WINDOW_METRICS:
+            rule_metrics[name] = aggregates[name]['mean']
+        insight += (
+            f"Window of {aggregates['disk_usage_percent']['samples']} samples: Disk avg {rule_metrics['disk_usage_percent']}%, "
+            f"CPU avg {rule_metrics['cpu_usage_percent']}% (p95 {aggregates['cpu_usage_percent']['p95']}%), Mem avg {rule_metrics['mem_usage_percent']}%. "
+        )
+    hours_to_disk_full = project_hours_to_disk_full(aggregates)
+    if hours_to_disk_full is not None:
+        rule_metrics = dict(rule_metrics, disk_hours_to_full=hours_to_disk_full)
     
-    if disk_percent >= 80:
-        insight += "CRITICAL: Disk usage is at or above 80% threshold. Immediate action required."
-    elif cpu_percent >= 90:
-        insight += "WARNING: CPU usage is at or above 90% threshold. Investigate process load."
-    elif mem_percent >= 90:
-        insight += "WARNING: Memory usage is at or above 90% threshold. Investigate memory leaks."
-    else:
-        insight += "OK: All primary resource metrics are within acceptable limits."
+    # AT-009: The configured rule set decides the insight and its structured severity
+    evaluation = get_rule_set().evaluate(rule_metrics)
+    insight += evaluation.insight()
         
     output_data = {
         "event_type": "RESOURCE_ANALYSIS_COMPLETED",
         "source_team": report_data['team_id'],
         "source_timestamp": report_data.get('timestamp', 'N/A'),
+        "source_host": report_data.get('host', 'unknown'),
         "processing_status": "SUCCESS",
         "resource_type": report_data['resource_type'],
         "metrics_processed": metrics, # Use all metrics from the Data Team
-        "actionable_insight": insight
+        "window_aggregates": aggregates,
+        "actionable_insight": insight,
+        "insight_severity": evaluation.severity,
+        "insight_severity_code": evaluation.severity_code,
+        "insight_rule_id": evaluation.rule_id,
+        "insight_findings": evaluation.findings
     }
+    FLEET_STATE.observe(output_data)
     return output_data
 
+def observe_metric_windows(report_data):
+    """
+    CR-009: Adds a validated report to its host's rolling windows.
+    Returns {metric: {latest, mean, p95, rate_per_minute, samples, window_seconds}},
+    or an empty dictionary when windowing is disabled (CT_WINDOW_SIZE=0).
+    Windows are per process: each pool worker aggregates the reports it consumes.
+    """
+    if WINDOW_AGGREGATOR is None:
+        return {}
+    try:
+        sample_time = datetime.fromisoformat(report_data['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        sample_time = time.time()
+    return WINDOW_AGGREGATOR.observe(report_data.get('host', 'unknown'), sample_time, report_data['metrics'])
+
+def project_hours_to_disk_full(aggregates):
+    """
+    CR-009: Returns the hours until the disk fills at its current rate of growth,
+    if the window holds at least CT_TREND_MIN_SAMPLES samples (default 5) and
+    the disk is growing. Returns None otherwise.
+    AT-009: The result is evaluated as the 'disk_hours_to_full' metric, so the
+    alerting horizon is a rule threshold (CT_DISK_FULL_HORIZON_HOURS by default).
+    """
+    disk = aggregates.get('disk_usage_percent')
+    if not disk or disk['samples'] < int(os.environ.get("CT_TREND_MIN_SAMPLES", "5")) or disk['rate_per_minute'] <= 0:
+        return None
+    return (100 - disk['latest']) / disk['rate_per_minute'] / 60
+
+def get_consumer_name():
+    """
+    CR-007: Returns this instance's consumer name within the consumer group.
+    Defaults to a name unique per host and process so replicas never share a PEL.
+    """
+    return os.environ.get("CT_CONSUMER_NAME") or f"ct002_{socket.gethostname()}_{os.getpid()}"
+
+def get_claim_dir(mq_new_dir):
+    """
+    CR-008: Returns this consumer's 'processing' directory for claimed file system messages.
+    Defaults to a 'processing' directory next to MQ_NEW_DIR (MQ_PROCESSING_DIR).
+    """
+    processing_dir = os.environ.get("MQ_PROCESSING_DIR") or os.path.join(os.path.dirname(os.path.normpath(mq_new_dir)), "processing")
+    return os.path.join(processing_dir, get_consumer_name())
+
+def reclaim_stale_file_claims():
+    """
+    CR-008: Returns messages claimed by consumers that died back to the 'new' queue.
+
+    A claim is stale once the claiming rename (which sets the file's ctime) is
+    older than CT_FILE_CLAIM_TIMEOUT_SECONDS (default 300).
+    Returns the number of messages returned to the queue.
+    """
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    if not mq_new_dir:
+        return 0
+        
+    processing_dir = os.path.dirname(get_claim_dir(mq_new_dir))
+    claim_timeout = float(os.environ.get("CT_FILE_CLAIM_TIMEOUT_SECONDS", "300"))
+    cutoff = time.time() - claim_timeout
+    
+    reclaimed_count = 0
+    try:
+        with os.scandir(processing_dir) as consumer_dirs:
+            consumer_paths = [entry.path for entry in consumer_dirs if entry.is_dir()]
+    except FileNotFoundError:
+        return 0
+        
+    for consumer_path in consumer_paths:
+        with os.scandir(consumer_path) as claimed:
+            stale = [entry for entry in claimed if entry.is_file() and entry.stat().st_ctime < cutoff]
+        for entry in stale:
+            try:
+                os.rename(entry.path, os.path.join(mq_new_dir, entry.name))
+                reclaimed_count += 1
+            except FileNotFoundError:
+                # Finished or reclaimed by another consumer in the meantime
+                continue
+                
+    if reclaimed_count:
+        print(f"Code Team (CT-002) returned {reclaimed_count} stale claimed messages to the queue.")
+    return reclaimed_count
+
+def _read_message_file(input_file_path, message_file, mq_archive_dir):
+    """
+    Reads and decodes a single message file from the file system MQ (any AT-004 codec).
+    Corrupted messages are archived with a '.corrupted' suffix to prevent reprocessing.
+    Returns the report dictionary, or None if the message could not be read.
+    """
+    try:
+        with open(input_file_path, 'rb') as f:
+            return decode_message(f.read())
+    except ValueError:
+        print(f"Error: Data Team artifact at {input_file_path} could not be decoded. Archiving corrupted message.")
+        # Archive corrupted message to prevent reprocessing
+        os.rename(input_file_path, os.path.join(mq_archive_dir, message_file + ".corrupted"))
+        return None
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return None
+
 def consume_from_file_system():
     """
     Fallback: Consumes the latest message from the file system MQ.
@@ -110,7 +265,7 @@ def consume_from_file_system():
     
     # 1. Find the latest message (file) in the 'new' queue
     try:
-        messages = [f for f in os.listdir(mq_new_dir) if f.endswith('.json')]
+        messages = [f for f in os.listdir(mq_new_dir) if f.endswith(message_file_extensions())]
         if not messages:
             return None, None, None
             
@@ -123,16 +278,8 @@ def consume_from_file_system():
         return None, None, None
 
     # 2. Read and parse the message
-    try:
-        with open(input_file_path, 'r') as f:
-            report_data = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Error: Data Team artifact at {input_file_path} is not valid JSON. Archiving corrupted message.")
-        # Archive corrupted message to prevent reprocessing
-        os.rename(input_file_path, os.path.join(mq_archive_dir, latest_message_file + ".corrupted"))
-        return None, None, None
-    except Exception as e:
-        print(f"Error reading file: {e}")
+    report_data = _read_message_file(input_file_path, latest_message_file, mq_archive_dir)
+    if report_data is None:
         return None, None, None
         
     # Return data and consumption function
@@ -143,102 +290,796 @@ def consume_from_file_system():
         
     return report_data, consume_file, latest_message_file
 
-def consume_from_redis():
+def write_processing_output(processing_result_dict):
     """
-    Primary: Consumes a message from the Redis Stream MQ.
+    Writes a processing result to the Code Team's output file (CT_OUTPUT_FILE).
+    The file is replaced atomically so concurrent workers never interleave writes.
+    CR-011: The fleet snapshot (CT_FLEET_FILE) is refreshed at the same time.
+    Returns True if the output was written.
     """
-    if not REDIS_AVAILABLE:
-        return None, None, None
+    output_file = os.environ.get("CT_OUTPUT_FILE")
+    if not output_file:
+        print("Error: CT_OUTPUT_FILE environment variable not set. Cannot write report.")
+        return False
+    
+    # Ensure atomic write: write to a per-process temp file first, then rename
+    temp_path = f"{output_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(processing_result_dict, f, indent=2)
+    os.replace(temp_path, output_file)
         
-    stream_name = os.environ.get("REDIS_STREAM_NAME")
-    consumer_group = "ct002_group"
-    consumer_name = "ct002_instance"
+    print(f"Code Team (CT-002) processing report written to {output_file}")
     
+    # CR-011: Publish the fleet view with the same cadence as the output file
     try:
-        # Ensure the consumer group exists
+        if write_fleet_snapshot(FLEET_STATE):
+            print(f"Code Team (CT-002) fleet snapshot written ({len(FLEET_STATE.hosts)} hosts).")
+    except OSError as e:
+        print(f"Error writing fleet snapshot: {e}")
+    return True
+
+def get_result_topic():
+    """
+    FT-002: Returns the topic CT-002 publishes its results to (CT_RESULT_TOPIC, default 'ct_results').
+    """
+    return os.environ.get("CT_RESULT_TOPIC", "ct_results")
+
+def publish_results(results):
+    """
+    FT-002: Publishes processing results, in order, to the result topic FT-001
+    consumes with its own offset: a Redis Stream with MQ_TYPE=REDIS_STREAMS
+    (when Redis is available), otherwise a topic of the segmented log MQ.
+    Each result is encoded once with the MQ_CODEC codec, so readers never see
+    a partially written result. CT_PUBLISH_RESULTS=0 disables publishing.
+    Returns True if the results were published (or publishing is disabled).
+    """
+    if not results or os.environ.get("CT_PUBLISH_RESULTS", "1") == "0":
+        return True
+        
+    topic = get_result_topic()
+    payloads = [encode_message(result) for result in results]
+    try:
+        if os.environ.get("MQ_TYPE", "FILE_SYSTEM") == "REDIS_STREAMS" and REDIS_AVAILABLE:
+            # One pipelined round trip for the whole batch
+            pipeline = REDIS_CLIENT.pipeline(transaction=False)
+            for payload in payloads:
+                pipeline.xadd(topic, {'data': payload}, maxlen=int(os.environ.get("CT_RESULT_STREAM_MAXLEN", "10000")), approximate=True)
+            pipeline.execute()
+        else:
+            get_segment_log(topic).append(payloads)
+    except Exception as e:
+        print(f"Error publishing {len(results)} results to {topic}: {e}")
+        return False
+        
+    print(f"Code Team (CT-002) published {len(results)} results to {topic}")
+    return True
+
+def process_message_batch(messages):
+    """
+    CR-004: Processes a batch of decoded messages in order.
+
+    `messages` is a list of (message_id, report_data) tuples. Only the last
+    successful result is written to CT_OUTPUT_FILE, since each write would
+    overwrite the previous one.
+    FT-002: Every successful result is published to the result topic.
+    Returns a tuple (last_result, processed_ids, rejected_ids, failed_ids), where
+    rejected IDs are messages whose reports failed validation and failed IDs are
+    messages whose processing raised an exception.
+    """
+    results = []
+    processed_ids = []
+    rejected_ids = []
+    failed_ids = []
+    
+    for message_id, report_data in messages:
         try:
-            REDIS_CLIENT.xgroup_create(stream_name, consumer_group, id='0', mkstream=True)
-        except redis.exceptions.ResponseError as e:
-            if 'BUSYGROUP' not in str(e):
-                raise
+            processing_result_dict = process_resource_report(report_data)
+        except Exception as e:
+            print(f"Code Team (CT-002) Processing Error for message {message_id}: {e}")
+            failed_ids.append(message_id)
+            continue
+        if "error" in processing_result_dict:
+            print(f"Code Team (CT-002) Processing Error for message {message_id}: {processing_result_dict['error']}")
+            rejected_ids.append(message_id)
+            continue
+        results.append(processing_result_dict)
+        processed_ids.append(message_id)
+        
+    if results and not (write_processing_output(results[-1]) and publish_results(results)):
+        # Without the output nothing was delivered downstream
+        return None, [], rejected_ids, failed_ids
+        
+    return (results[-1] if results else None), processed_ids, rejected_ids, failed_ids
+
+def drain_file_system_queue(batch_size=None, limit=None):
+    """
+    CR-004: Drains the file system MQ backlog in a single pass.
+
+    The 'new' directory is listed once and the backlog is processed oldest
+    first, in batches of `batch_size` messages (CT_DRAIN_BATCH_SIZE, default 500).
+    Each batch writes the output and health check files once and then
+    archives all of its messages. At most `limit` messages are taken from
+    the backlog, and a shutdown request stops the drain between batches.
+
+    CR-008: Messages are claimed with an atomic rename into this consumer's
+    'processing' directory before they are read, so concurrent workers
+    never process the same message twice.
+    Returns a BatchOutcome: the messages successfully processed and the
+    messages taken off the queue (processed, rejected or corrupted).
+    """
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    
+    if not mq_new_dir or not mq_archive_dir:
+        print("Error: MQ_NEW_DIR or MQ_ARCHIVE_DIR environment variables not set. Cannot start file system listener.")
+        return BatchOutcome(0, 0)
+    
+    if batch_size is None:
+        batch_size = int(os.environ.get("CT_DRAIN_BATCH_SIZE", "500"))
+    batch_size = max(1, batch_size)
+    
+    # 1. List the 'new' queue once; names include the publish timestamp, so sorting gives FIFO order
+    extensions = message_file_extensions()
+    try:
+        with os.scandir(mq_new_dir) as entries:
+            backlog = sorted(entry.name for entry in entries if entry.name.endswith(extensions))
+    except Exception as e:
+        print(f"Code Team (CT-002) Subscriber Error: Could not read MQ directory. {e}")
+        return BatchOutcome(0, 0)
+        
+    if not backlog:
+        return BatchOutcome(0, 0)
+        
+    claim_dir = get_claim_dir(mq_new_dir)
+    os.makedirs(claim_dir, exist_ok=True)
+    
+    print(f"Code Team (CT-002) Subscriber: Draining up to {len(backlog)} messages in batches of {batch_size}.")
+    
+    processed_count = 0
+    consumed_count = 0
+    claimed_count = 0
+    position = 0
+    while position < len(backlog) and not SHUTDOWN_EVENT.is_set():
+        if limit and claimed_count >= limit:
+            break
+            
+        # 2. Claim the next batch; a failed rename means another worker claimed the message first
+        batch_files = []
+        while position < len(backlog) and len(batch_files) < batch_size:
+            if limit and claimed_count + len(batch_files) >= limit:
+                break
+            message_file = backlog[position]
+            position += 1
+            try:
+                os.rename(os.path.join(mq_new_dir, message_file), os.path.join(claim_dir, message_file))
+            except FileNotFoundError:
+                continue
+            batch_files.append(message_file)
+            
+        if not batch_files:
+            break
+        claimed_count += len(batch_files)
+        
+        # 3. Read and parse the batch
+        messages = []
+        for message_file in batch_files:
+            report_data = _read_message_file(os.path.join(claim_dir, message_file), message_file, mq_archive_dir)
+            if report_data is not None:
+                messages.append((message_file, report_data))
                 
-        # Read one message from the stream
+        # 4. Process the batch and write the output once
+        last_result, processed_files, rejected_files, failed_files = process_message_batch(messages)
+        
+        # 5. Archive the batch; unprocessable reports are archived as corrupted so the drain can progress
+        rejected_files = rejected_files + failed_files
+        for message_file in processed_files:
+            os.rename(os.path.join(claim_dir, message_file), os.path.join(mq_archive_dir, message_file))
+        for message_file in rejected_files:
+            os.rename(os.path.join(claim_dir, message_file), os.path.join(mq_archive_dir, message_file + ".corrupted"))
+            
+        # Messages whose output could not be written go back to the queue
+        handled_files = set(processed_files) | set(rejected_files)
+        for message_file, _ in messages:
+            if message_file not in handled_files:
+                os.rename(os.path.join(claim_dir, message_file), os.path.join(mq_new_dir, message_file))
+            
+        processed_count += len(processed_files)
+        consumed_count += len(batch_files) - (len(messages) - len(handled_files))
+        print(f"Code Team (CT-002) consumed and archived {len(processed_files)} messages ({len(rejected_files)} rejected).")
+        
+        # 6. AT-003: Update Health Check File once per batch
+        if last_result is not None:
+            update_health_check(last_result)
+            
+    # Remove the claim directory once empty so per-process consumer names don't accumulate
+    try:
+        os.rmdir(claim_dir)
+    except OSError:
+        pass
+        
+    return BatchOutcome(processed_count, consumed_count)
+
+def _as_str(value):
+    """
+    Returns a Redis reply value as a string, whether or not the client decodes responses.
+    """
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+def _decode_stream_entry(message_data):
+    """
+    Decodes the report carried in the 'data' field of a Redis Stream entry (any AT-004 codec).
+    """
+    payload = message_data.get('data', message_data.get(b'data'))
+    return decode_message(payload)
+
+def ensure_consumer_group(stream_name, consumer_group=REDIS_CONSUMER_GROUP):
+    """
+    CR-006: Creates the consumer group on first use; later calls cost no round trip.
+    """
+    if (stream_name, consumer_group) in _READY_CONSUMER_GROUPS:
+        return
+        
+    try:
+        REDIS_CLIENT.xgroup_create(stream_name, consumer_group, id='0', mkstream=True)
+    except redis.exceptions.ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+            
+    _READY_CONSUMER_GROUPS.add((stream_name, consumer_group))
+
+def dead_letter_messages(stream_name, entries, reason):
+    """
+    CR-007: Moves stream entries to the dead-letter stream and acknowledges them.
+
+    The dead-letter stream (REDIS_DEAD_LETTER_STREAM, default '<stream>:dead-letter')
+    keeps the original fields plus the source stream, source ID and reason.
+    All XADDs and the XACK are sent in one pipelined round trip.
+    """
+    if not entries:
+        return
+        
+    dead_letter_stream = os.environ.get("REDIS_DEAD_LETTER_STREAM") or f"{stream_name}:dead-letter"
+    
+    pipeline = REDIS_CLIENT.pipeline(transaction=False)
+    for message_id, message_data in entries:
+        fields = dict(message_data or {})
+        fields.update({
+            "source_stream": stream_name,
+            "source_id": _as_str(message_id),
+            "reason": reason,
+            "dead_lettered_at": datetime.now().isoformat()
+        })
+        pipeline.xadd(dead_letter_stream, fields, maxlen=10000, approximate=True)
+    pipeline.xack(stream_name, REDIS_CONSUMER_GROUP, *[message_id for message_id, _ in entries])
+    pipeline.execute()
+    
+    print(f"Code Team (CT-002) moved {len(entries)} messages to dead-letter stream {dead_letter_stream}: {reason}")
+
+def _process_stream_entries(stream_name, entries):
+    """
+    Decodes, processes and acknowledges a batch of Redis Stream entries.
+
+    Processed entries are acknowledged with a single multi-ID XACK. Entries that
+    cannot be decoded or fail validation are dead-lettered, since retrying them
+    cannot succeed. Entries whose processing raised, or whose output could not
+    be written, stay pending and are retried through reclaim_pending_messages.
+    Returns a BatchOutcome: the messages successfully processed and the entries read.
+    """
+    messages = []
+    entries_by_id = {}
+    unprocessable = []
+    for message_id, message_data in entries:
+        entries_by_id[message_id] = message_data
+        try:
+            messages.append((message_id, _decode_stream_entry(message_data)))
+        except Exception as e:
+            print(f"Error: Redis message {_as_str(message_id)} is not a valid report ({e}).")
+            unprocessable.append((message_id, message_data))
+            
+    last_result, processed_ids, rejected_ids, failed_ids = process_message_batch(messages)
+    unprocessable.extend((message_id, entries_by_id[message_id]) for message_id in rejected_ids)
+    
+    # Acknowledge the whole batch in one round trip
+    if processed_ids:
+        REDIS_CLIENT.xack(stream_name, REDIS_CONSUMER_GROUP, *processed_ids)
+    dead_letter_messages(stream_name, unprocessable, "INVALID_REPORT")
+    print(f"Code Team (CT-002) consumed and ACKed {len(processed_ids)} messages ({len(unprocessable)} rejected, {len(failed_ids)} left pending).")
+    
+    if last_result is not None:
+        update_health_check(last_result)
+        
+    return BatchOutcome(len(processed_ids), len(entries))
+
+def consume_batch_from_redis(batch_size=None, block_ms=1000):
+    """
+    CR-006: Consumes and processes a batch of messages from the Redis Stream MQ.
+
+    Up to `batch_size` entries (CT_REDIS_BATCH_SIZE, default 100) are read with a
+    single XREADGROUP, processed as one batch, and acknowledged together.
+    `block_ms=None` returns immediately when the stream is empty.
+    Returns a BatchOutcome: the messages successfully processed and the entries read.
+    """
+    if not REDIS_AVAILABLE:
+        return BatchOutcome(0, 0)
+        
+    stream_name = os.environ.get("REDIS_STREAM_NAME")
+    if batch_size is None:
+        batch_size = int(os.environ.get("CT_REDIS_BATCH_SIZE", "100"))
+    
+    try:
+        ensure_consumer_group(stream_name)
+        
         response = REDIS_CLIENT.xreadgroup(
-            consumer_group,
-            consumer_name,
+            REDIS_CONSUMER_GROUP,
+            get_consumer_name(),
             {stream_name: '>'},
-            count=1,
-            block=1000 # Block for 1 second
+            count=max(1, batch_size),
+            block=block_ms
         )
-        
         if not response or not response[0][1]:
-            return None, None, None
+            return BatchOutcome(0, 0)
             
-        stream_key, messages = response[0]
-        message_id, message_data = messages[0]
+        stream_key, entries = response[0]
+        return _process_stream_entries(stream_name, entries)
+        
+    except Exception as e:
+        print(f"Code Team (CT-002) Redis Subscriber Error: {e}")
+        return BatchOutcome(0, 0)
+
+def reclaim_pending_messages(batch_size=None):
+    """
+    CR-007: Reclaims stalled entries from the consumer group's pending entries list.
+
+    XAUTOCLAIM takes over entries that have been idle for longer than
+    CT_REDIS_CLAIM_IDLE_MS (default 60000), whether their consumer crashed or
+    their processing failed. Entries delivered more than CT_REDIS_MAX_DELIVERIES
+    times (default 5) are moved to the dead-letter stream; the rest are
+    processed as a normal batch.
+    Returns a BatchOutcome: the messages successfully processed and the entries reclaimed.
+    """
+    if not REDIS_AVAILABLE:
+        return BatchOutcome(0, 0)
         
-        # The message data is a dictionary of bytes, convert to string/JSON
-        report_data = json.loads(message_data[b'data'].decode('utf-8'))
+    stream_name = os.environ.get("REDIS_STREAM_NAME")
+    if batch_size is None:
+        batch_size = int(os.environ.get("CT_REDIS_BATCH_SIZE", "100"))
+    min_idle_ms = int(os.environ.get("CT_REDIS_CLAIM_IDLE_MS", "60000"))
+    max_deliveries = int(os.environ.get("CT_REDIS_MAX_DELIVERIES", "5"))
+    consumer_name = get_consumer_name()
+    
+    try:
+        ensure_consumer_group(stream_name)
         
-        # Return data and consumption function (ACK)
-        def consume_redis():
-            REDIS_CLIENT.xack(stream_name, consumer_group, message_id)
-            print(f"Code Team (CT-002) consumed and ACKed message: {message_id}")
+        response = REDIS_CLIENT.xautoclaim(
+            stream_name,
+            REDIS_CONSUMER_GROUP,
+            consumer_name,
+            min_idle_ms,
+            start_id=_RECLAIM_CURSORS.get(stream_name, "0-0"),
+            count=max(1, batch_size)
+        )
+        # The cursor wraps back to 0-0 once the whole PEL has been scanned
+        _RECLAIM_CURSORS[stream_name] = response[0]
+        entries = response[1]
+        if not entries:
+            return BatchOutcome(0, 0)
+        reclaimed_count = len(entries)
+            
+        # Entries trimmed from the stream come back without fields; just acknowledge them
+        trimmed_ids = [message_id for message_id, message_data in entries if not message_data]
+        entries = [(message_id, message_data) for message_id, message_data in entries if message_data]
+        if trimmed_ids:
+            REDIS_CLIENT.xack(stream_name, REDIS_CONSUMER_GROUP, *trimmed_ids)
+        if not entries:
+            return BatchOutcome(0, reclaimed_count)
             
-        return report_data, consume_redis, message_id.decode('utf-8')
+        # One XPENDING per claimed ID, in a single round trip: a range from the
+        # first to the last claimed ID can also return entries this call did not claim
+        pipeline = REDIS_CLIENT.pipeline(transaction=False)
+        for message_id, message_data in entries:
+            pipeline.xpending_range(
+                stream_name,
+                REDIS_CONSUMER_GROUP,
+                min=message_id,
+                max=message_id,
+                count=1,
+                consumername=consumer_name
+            )
+        deliveries = {
+            _as_str(entry["message_id"]): entry["times_delivered"]
+            for pending in pipeline.execute() for entry in pending
+        }
+        
+        exhausted = [entry for entry in entries if deliveries.get(_as_str(entry[0]), 0) > max_deliveries]
+        retryable = [entry for entry in entries if deliveries.get(_as_str(entry[0]), 0) <= max_deliveries]
+        
+        print(f"Code Team (CT-002) reclaimed {len(entries)} pending messages ({len(exhausted)} over the retry limit).")
+        dead_letter_messages(stream_name, exhausted, "MAX_DELIVERIES_EXCEEDED")
+        
+        if not retryable:
+            return BatchOutcome(0, reclaimed_count)
+        return BatchOutcome(_process_stream_entries(stream_name, retryable).processed, reclaimed_count)
         
     except Exception as e:
-        print(f"Code Team (CT-002) Redis Subscriber Error: {e}")
-        return None, None, None
+        print(f"Code Team (CT-002) Redis Reclaim Error: {e}")
+        return BatchOutcome(0, 0)
 
-def start_mq_listener():
+def handle_single_message(report_data, consume_func):
     """
-    CR-001: Handles the MQ subscription logic with Redis fallback.
+    Processes one consumed message, writes the output and consumes it.
+    A message whose processing raises is left unconsumed, like the failed
+    messages of a batch, so the next run retries it.
+    Returns True if the message was processed successfully.
     """
-    mq_type = os.environ.get("MQ_TYPE", "FILE_SYSTEM")
+    # 3. Process the message (passing the dictionary)
+    try:
+        processing_result_dict = process_resource_report(report_data)
+    except Exception as e:
+        print(f"Code Team (CT-002) Processing Error: {e}")
+        update_health_check({"event_type": "PROCESSING_ERROR", "source_timestamp": datetime.now().isoformat()})
+        return False
+
+    # 4. Write the Code Team's report to the output file
+    if not write_processing_output(processing_result_dict):
+        return False
+        
+    # FT-002: Publish successful results to the result topic; the message is retried if that fails
+    if "error" not in processing_result_dict and not publish_results([processing_result_dict]):
+        return False
+    
+    # 5. Consume/Archive the message (Atomic operation)
+    consume_func()
+    
+    # 6. AT-003: Update Health Check File
+    update_health_check(processing_result_dict)
+    return True
+
+def get_segment_log(topic):
+    """
+    AT-005: Returns this process's reader for a segmented log topic, keeping its memory maps across polls.
+    """
+    key = (os.environ.get("MQ_SEGMENT_LOG_DIR"), topic)
+    if key not in _SEGMENT_LOGS:
+        _SEGMENT_LOGS[key] = SegmentLog(topic)
+    return _SEGMENT_LOGS[key]
+
+def consume_from_segment_log(batch_size=None):
+    """
+    AT-005: Consumes and processes a batch of messages from the segmented log MQ.
+
+    Up to `batch_size` records (CT_DRAIN_BATCH_SIZE, default 500) are read from
+    the consumer group's committed offset, processed as one batch, and
+    committed with a single offset write. Records that cannot be decoded, fail
+    validation or raise during processing are copied to the
+    '<topic>.dead-letter' topic, which keeps its newest
+    MQ_DEAD_LETTER_RETENTION_BYTES (default 256 MiB); corrupted records are
+    committed past. If the output file cannot be written the
+    offset is not committed, so the batch is redelivered. Workers sharing the
+    group take turns under the group lock. Fully consumed segments are deleted.
+    Returns a BatchOutcome: the messages successfully processed and the records committed.
+    """
+    topic = os.environ.get("MQ_TOPIC_DISK_USAGE", "disk_usage")
+    if batch_size is None:
+        batch_size = int(os.environ.get("CT_DRAIN_BATCH_SIZE", "500"))
+    log = get_segment_log(topic)
     
-    report_data = None
-    consume_func = None
-    message_id = None
+    with log.group_lock(SEGMENT_LOG_CONSUMER_GROUP):
+        records = log.read_group(SEGMENT_LOG_CONSUMER_GROUP, max(1, batch_size))
+        if not records:
+            return BatchOutcome(0, 0)
+            
+        messages = []
+        payloads = dict(records)
+        unprocessable = []
+        for offset, payload in records:
+            if payload is None:
+                # Corrupted on disk (reported by the log); there is nothing to dead-letter
+                continue
+            try:
+                messages.append((offset, decode_message(payload)))
+            except ValueError as e:
+                print(f"Error: Segment log record {topic}@{offset} is not a valid report ({e}).")
+                unprocessable.append(offset)
+                
+        last_result, processed_ids, rejected_ids, failed_ids = process_message_batch(messages)
+        if len(messages) > len(rejected_ids) + len(failed_ids) and not processed_ids:
+            print("Code Team (CT-002) Subscriber: Output could not be written. Leaving the batch uncommitted.")
+            return BatchOutcome(0, 0)
+            
+        unprocessable.extend(rejected_ids + failed_ids)
+        if unprocessable:
+            dead_letter_log = get_segment_log(f"{topic}.dead-letter")
+            dead_letter_log.append([payloads[offset] for offset in sorted(unprocessable)])
+            dead_letter_log.delete_segments_over(int(os.environ.get("MQ_DEAD_LETTER_RETENTION_BYTES", str(256 * 1024 * 1024))))
+        log.commit(SEGMENT_LOG_CONSUMER_GROUP, records[-1][0] + 1)
+        
+    log.delete_consumed_segments()
+    print(f"Code Team (CT-002) consumed {len(processed_ids)} messages from {topic} up to offset {records[-1][0]} ({len(unprocessable)} dead-lettered).")
+    
+    if last_result is not None:
+        update_health_check(last_result)
+        
+    return BatchOutcome(len(processed_ids), len(records))
+
+def poll_mq_once(mq_type, limit=None):
+    """
+    CR-005: Processes the messages currently available on the configured MQ.
+    The file system backend is drained oldest first; Redis Streams and the
+    segmented log read one batch.
+    Stalled Redis pending entries are reclaimed first every
+    CT_REDIS_RECLAIM_INTERVAL_SECONDS, stale file system claims every
+    CT_FILE_CLAIM_RECLAIM_INTERVAL_SECONDS (both default 30).
+    Returns a BatchOutcome.
+    """
+    global _LAST_RECLAIM_TIME
     
     if mq_type == "REDIS_STREAMS" and REDIS_AVAILABLE:
-        print("Code Team (CT-002) Subscriber: Attempting to consume from Redis Streams...")
-        report_data, consume_func, message_id = consume_from_redis()
+        reclaim_interval = float(os.environ.get("CT_REDIS_RECLAIM_INTERVAL_SECONDS", "30"))
     else:
-        if mq_type == "REDIS_STREAMS":
-            print("Code Team (CT-002) Subscriber: Redis Streams requested but not available. Falling back to File System MQ.")
+        reclaim_interval = float(os.environ.get("CT_FILE_CLAIM_RECLAIM_INTERVAL_SECONDS", "30"))
+    reclaim_due = _LAST_RECLAIM_TIME is None or time.monotonic() - _LAST_RECLAIM_TIME >= reclaim_interval
+    if reclaim_due:
+        _LAST_RECLAIM_TIME = time.monotonic()
+    
+    if mq_type == "REDIS_STREAMS" and REDIS_AVAILABLE:
+        if reclaim_due:
+            reclaimed = reclaim_pending_messages(batch_size=limit)
+            if reclaimed.consumed:
+                return reclaimed
+        return consume_batch_from_redis(batch_size=limit)
         
-        report_data, consume_func, message_id = consume_from_file_system()
+    if mq_type == "SEGMENT_LOG":
+        return consume_from_segment_log(batch_size=limit)
         
-    if not report_data:
-        print("Code Team (CT-002) Subscriber: No new messages in queue.")
-        return
+    if reclaim_due:
+        reclaim_stale_file_claims()
+    # The drain lists the whole backlog, so later messages were published after it and wake the watcher
+    return drain_file_system_queue(limit=limit)
+
+def _request_shutdown(signum, frame):
+    """
+    Signal handler for graceful shutdown of the listener daemon.
+    """
+    print(f"Code Team (CT-002) Subscriber: Received signal {signum}. Shutting down after the current batch.")
+    SHUTDOWN_EVENT.set()
+    if _MQ_WATCHER is not None:
+        _MQ_WATCHER.wake()
+
+def open_mq_watcher(mq_type):
+    """
+    AT-006: Opens an inotify watcher on the directory the file-backed MQ is published to:
+    the 'new' directory (renamed-in messages) or the segmented log topic (index appends).
+    Returns None for Redis Streams, which blocks in XREADGROUP, when CT_MQ_WATCH=0,
+    or when inotify is unavailable.
+    """
+    if os.environ.get("CT_MQ_WATCH", "1") == "0":
+        return None
+    if mq_type == "SEGMENT_LOG":
+        topic = os.environ.get("MQ_TOPIC_DISK_USAGE", "disk_usage")
+        return open_directory_watcher(get_segment_log(topic).topic_dir, IN_MODIFY)
+    if mq_type == "REDIS_STREAMS" and REDIS_AVAILABLE:
+        return None
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    if not mq_new_dir or not os.path.isdir(mq_new_dir):
+        return None
+    return open_directory_watcher(mq_new_dir)
+
+def run_listener_daemon(max_messages=None, max_runtime_seconds=None):
+    """
+    CR-005: Runs the MQ listener as a long-running service.
+
+    Messages are processed in a persistent loop, so the interpreter start-up,
+    environment loading and Redis connection are paid once per process. When
+    the queue is empty the loop backs off exponentially between
+    CT_IDLE_BACKOFF_MIN_SECONDS and CT_IDLE_BACKOFF_MAX_SECONDS.
+    AT-006: On the file-backed MQs the idle loop instead sleeps on inotify
+    events, waking as soon as a message is published, with a safety poll every
+    CT_WATCH_TIMEOUT_SECONDS (default 30). The run ends on
+    SIGTERM/SIGINT, or after CT_MAX_MESSAGES messages or CT_MAX_RUNTIME_SECONDS
+    seconds (0 means unlimited).
+    Returns the number of messages processed.
+    """
+    global _MQ_WATCHER
+    
+    mq_type = os.environ.get("MQ_TYPE", "FILE_SYSTEM")
+    if max_messages is None:
+        max_messages = int(os.environ.get("CT_MAX_MESSAGES", "0"))
+    if max_runtime_seconds is None:
+        max_runtime_seconds = float(os.environ.get("CT_MAX_RUNTIME_SECONDS", "0"))
+    backoff_min = float(os.environ.get("CT_IDLE_BACKOFF_MIN_SECONDS", "0.05"))
+    backoff_max = float(os.environ.get("CT_IDLE_BACKOFF_MAX_SECONDS", "5"))
+    watch_timeout = float(os.environ.get("CT_WATCH_TIMEOUT_SECONDS", "30"))
+    
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _request_shutdown)
+        signal.signal(signal.SIGINT, _request_shutdown)
+    
+    # Watch before the first poll, so messages published while it runs queue a wakeup
+    _MQ_WATCHER = open_mq_watcher(mq_type)
+    print(f"Code Team (CT-002) Subscriber: Starting listener daemon on {mq_type} ({'inotify' if _MQ_WATCHER else 'polling'}).")
+    
+    started_at = time.monotonic()
+    processed_count = 0
+    backoff = backoff_min
+    
+    while not SHUTDOWN_EVENT.is_set():
+        if max_runtime_seconds and time.monotonic() - started_at >= max_runtime_seconds:
+            print("Code Team (CT-002) Subscriber: Maximum runtime reached.")
+            break
+            
+        remaining = max_messages - processed_count if max_messages else None
+        outcome = poll_mq_once(mq_type, limit=remaining)
+        processed_count += outcome.processed
         
-    # 3. Process the message (passing the dictionary)
-    processing_result_dict = process_resource_report(report_data)
+        if max_messages and processed_count >= max_messages:
+            print("Code Team (CT-002) Subscriber: Maximum message count reached.")
+            break
+            
+        # Poll again while the queue yields anything, even a batch that was all dead-lettered
+        if outcome.consumed:
+            backoff = backoff_min
+            continue
+            
+        if _MQ_WATCHER is not None:
+            # Idle: sleep until a message is published, a signal arrives, or the safety poll/runtime limit is due
+            timeout = watch_timeout
+            if max_runtime_seconds:
+                timeout = min(timeout, max(0.0, max_runtime_seconds - (time.monotonic() - started_at)))
+            _MQ_WATCHER.wait(timeout)
+            continue
+            
+        # Idle: wait with exponential backoff, waking immediately on shutdown
+        SHUTDOWN_EVENT.wait(backoff)
+        backoff = min(backoff * 2, backoff_max)
+        
+    if _MQ_WATCHER is not None:
+        _MQ_WATCHER.close()
+        _MQ_WATCHER = None
+        
+    print(f"Code Team (CT-002) Subscriber: Listener daemon stopped after processing {processed_count} messages.")
+    return processed_count
+
+def _run_pool_worker(consumer_name):
+    """
+    CR-008: Entry point of a worker process started by run_worker_pool.
+    """
+    os.environ["CT_CONSUMER_NAME"] = consumer_name
+    run_listener_daemon()
+
+def run_worker_pool(worker_count=None, max_runtime_seconds=None):
+    """
+    CR-008: Runs a supervised pool of listener worker processes.
+
+    Each worker runs the listener daemon under its own stable consumer name
+    (`<CT_CONSUMER_NAME or ct002_<host>>_w<index>`), so on Redis it is a separate
+    consumer in the group and on the file system it claims messages into its
+    own 'processing' directory. The pool size defaults to CT_WORKER_COUNT or
+    the number of CPUs. Workers that exit are restarted with an exponential
+    backoff per slot, from CT_WORKER_RESTART_BACKOFF_MIN_SECONDS (default 1)
+    doubling up to CT_WORKER_RESTART_BACKOFF_MAX_SECONDS (default 60), so a
+    worker that crashes on startup is not respawned every second; a worker
+    that ran for longer than the maximum backoff restarts after the minimum.
+    SIGTERM/SIGINT (or `max_runtime_seconds`) stops the pool and is forwarded
+    to every worker.
+    """
+    if worker_count is None:
+        worker_count = int(os.environ.get("CT_WORKER_COUNT", "0")) or os.cpu_count() or 1
+    base_name = os.environ.get("CT_CONSUMER_NAME") or f"ct002_{socket.gethostname()}"
+    backoff_min = float(os.environ.get("CT_WORKER_RESTART_BACKOFF_MIN_SECONDS", "1"))
+    backoff_max = float(os.environ.get("CT_WORKER_RESTART_BACKOFF_MAX_SECONDS", "60"))
     
-    # Handle potential error string returned by process_resource_report
-    if isinstance(processing_result_dict, str):
-        print(f"Code Team (CT-002) Processing Error: {processing_result_dict}")
-        update_health_check({"event_type": "PROCESSING_ERROR", "source_timestamp": datetime.now().isoformat()})
-        return
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _request_shutdown)
+        signal.signal(signal.SIGINT, _request_shutdown)
+        
+    # Spawned workers open their own Redis connections instead of sharing the parent's socket
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+    # Per slot: when its worker started, its consecutive restarts and when it may start again
+    worker_started_at = {}
+    restart_counts = {}
+    restart_at = {}
+    started_at = time.monotonic()
+    
+    print(f"Code Team (CT-002) Supervisor: Starting {worker_count} listener workers.")
+    
+    while not SHUTDOWN_EVENT.is_set():
+        now = time.monotonic()
+        if max_runtime_seconds and now - started_at >= max_runtime_seconds:
+            break
+            
+        for index in range(worker_count):
+            worker = workers.get(index)
+            if worker is not None and worker.is_alive():
+                continue
+            if worker is not None and index not in restart_at:
+                if now - worker_started_at[index] >= backoff_max:
+                    restart_counts[index] = 0
+                delay = min(backoff_max, backoff_min * 2 ** restart_counts.get(index, 0))
+                restart_counts[index] = restart_counts.get(index, 0) + 1
+                restart_at[index] = now + delay
+                print(f"Code Team (CT-002) Supervisor: Worker {worker.name} exited with code {worker.exitcode}. Restarting in {delay:g}s.")
+            if now < restart_at.get(index, now):
+                continue
+            restart_at.pop(index, None)
+            consumer_name = f"{base_name}_w{index}"
+            worker = context.Process(target=_run_pool_worker, args=(consumer_name,), name=consumer_name)
+            worker.start()
+            workers[index] = worker
+            worker_started_at[index] = now
+            
+        next_restart = min(restart_at.values(), default=now + 1.0)
+        SHUTDOWN_EVENT.wait(max(0.0, min(1.0, next_restart - time.monotonic())))
+        
+    print("Code Team (CT-002) Supervisor: Stopping listener workers.")
+    for worker in workers.values():
+        if worker.is_alive():
+            worker.terminate()
+    for worker in workers.values():
+        worker.join(timeout=30)
 
-    # 4. Define the output file path for the Code Team's report
-    output_file = os.environ.get("CT_OUTPUT_FILE")
-    if not output_file:
-        print("Error: CT_OUTPUT_FILE environment variable not set. Cannot write report.")
+def start_mq_listener():
+    """
+    CR-001: Handles the MQ subscription logic with Redis fallback.
+    CR-004: CT_LISTENER_MODE=DRAIN drains the whole backlog in one run.
+    CR-005: CT_LISTENER_MODE=DAEMON keeps the listener running as a service.
+    CR-008: CT_LISTENER_MODE=SUPERVISOR runs a pool of CT_WORKER_COUNT daemon workers.
+    AT-005: MQ_TYPE=SEGMENT_LOG consumes from the segmented log MQ.
+    """
+    mq_type = os.environ.get("MQ_TYPE", "FILE_SYSTEM")
+    listener_mode = os.environ.get("CT_LISTENER_MODE", "SINGLE")
+    
+    if listener_mode == "DAEMON":
+        run_listener_daemon()
         return
     
-    with open(output_file, 'w') as f:
-        json.dump(processing_result_dict, f, indent=2)
-        
-    print(f"Code Team (CT-002) processing report written to {output_file}")
+    if listener_mode == "SUPERVISOR":
+        run_worker_pool()
+        return
     
-    # 5. Consume/Archive the message (Atomic operation)
-    consume_func()
+    if listener_mode == "DRAIN":
+        if mq_type == "REDIS_STREAMS" and REDIS_AVAILABLE:
+            consumed_count = 0
+            while True:
+                outcome = consume_batch_from_redis(block_ms=None)
+                if not outcome.consumed:
+                    break
+                consumed_count += outcome.consumed
+        elif mq_type == "SEGMENT_LOG":
+            consumed_count = 0
+            while True:
+                outcome = consume_from_segment_log()
+                if not outcome.consumed:
+                    break
+                consumed_count += outcome.consumed
+        else:
+            consumed_count = drain_file_system_queue().consumed
+        if not consumed_count:
+            print("Code Team (CT-002) Subscriber: No new messages in queue.")
+        return
     
-    # 6. AT-003: Update Health Check File
-    update_health_check(processing_result_dict)
+    if mq_type == "SEGMENT_LOG":
+        if not consume_from_segment_log(batch_size=1).consumed:
+            print("Code Team (CT-002) Subscriber: No new messages in queue.")
+        return
+    
+    if mq_type == "REDIS_STREAMS" and REDIS_AVAILABLE:
+        print("Code Team (CT-002) Subscriber: Attempting to consume from Redis Streams...")
+        # A stalled pending entry is retried (or dead-lettered) before a new one is read
+        if not (reclaim_pending_messages(batch_size=1).consumed or consume_batch_from_redis(batch_size=1).consumed):
+            print("Code Team (CT-002) Subscriber: No new messages in queue.")
+        return
+        
+    if mq_type == "REDIS_STREAMS":
+        print("Code Team (CT-002) Subscriber: Redis Streams requested but not available. Falling back to File System MQ.")
+    
+    report_data, consume_func, message_id = consume_from_file_system()
+    if not report_data:
+        print("Code Team (CT-002) Subscriber: No new messages in queue.")
+        return
+        
+    handle_single_message(report_data, consume_func)
 
 if __name__ == "__main__":
     start_mq_listener()
@@ -0,0 +1,158 @@
+import fcntl
+import json
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.insight_rules import SEVERITY_NAMES
+
+# CR-011: Cross-host fleet view of the Code Team processor (CT-002).
+#
+# CT_OUTPUT_FILE only ever holds the last processed report. The fleet state
+# keeps the latest result of every host in memory and is updated in O(log n)
+# per report: the per-severity host counts are adjusted in place and the
+# hosts are kept ranked by (severity, hottest primary metric) in a sorted
+# list, so the top-N hottest hosts are a slice. The snapshot is written to
+# CT_FLEET_FILE, one JSON document holding the whole fleet.
+#
+# Workers of a pool each see part of the stream. Before writing, a worker
+# merges the hosts another worker wrote to the snapshot since its own last
+# write (newest result per host wins), under a lock file, so the snapshot
+# always covers the whole fleet.
+
+PRIMARY_METRICS = ("disk_usage_percent", "cpu_usage_percent", "mem_usage_percent")
+
+def host_entry(result, seen_at=None):
+    """
+    Builds a host's fleet entry from a process_resource_report result.
+    """
+    metrics = result.get("metrics_processed", {})
+    entry = {
+        "host": result.get("source_host", "unknown"),
+        "last_seen": seen_at if seen_at is not None else time.time(),
+        "source_timestamp": result.get("source_timestamp", "N/A"),
+        "severity": result.get("insight_severity", SEVERITY_NAMES[0]),
+        "severity_code": result.get("insight_severity_code", 0),
+        "rule_id": result.get("insight_rule_id"),
+        "heat": max(metrics.get(name, 0) for name in PRIMARY_METRICS)
+    }
+    for name in PRIMARY_METRICS:
+        entry[name] = metrics.get(name)
+    return entry
+
+def _rank_key(entry):
+    return (entry["severity_code"], entry["heat"], entry["host"])
+
+class FleetState:
+    """
+    CR-011: Latest analysis result of every host, with incrementally maintained
+    severity counts and heat ranking.
+    """
+
+    def __init__(self):
+        self.hosts = {}
+        self.severity_counts = {name: 0 for name in SEVERITY_NAMES.values()}
+        # Rank keys of all hosts in ascending order
+        self._ranked = []
+        # Stat signature (inode, mtime, size) of the snapshot this state wrote last
+        self.written_signature = None
+
+    def _remove(self, host):
+        entry = self.hosts.pop(host)
+        self.severity_counts[entry["severity"]] -= 1
+        key = _rank_key(entry)
+        del self._ranked[bisect_left(self._ranked, key)]
+
+    def update(self, entry):
+        """
+        Records a host entry unless the host already has a newer one.
+        Returns True if the entry was recorded.
+        """
+        current = self.hosts.get(entry["host"])
+        if current is not None:
+            if current["last_seen"] > entry["last_seen"]:
+                return False
+            self._remove(entry["host"])
+        self.hosts[entry["host"]] = entry
+        self.severity_counts[entry["severity"]] = self.severity_counts.get(entry["severity"], 0) + 1
+        insort(self._ranked, _rank_key(entry))
+        return True
+
+    def observe(self, result, seen_at=None):
+        """
+        Records a process_resource_report result as its host's latest state.
+        """
+        return self.update(host_entry(result, seen_at))
+
+    def expire(self, max_age_seconds, now=None):
+        """
+        Drops hosts that have not reported for `max_age_seconds`.
+        Returns the number of hosts dropped.
+        """
+        cutoff = (now if now is not None else time.time()) - max_age_seconds
+        stale = [host for host, entry in self.hosts.items() if entry["last_seen"] < cutoff]
+        for host in stale:
+            self._remove(host)
+        return len(stale)
+
+    def top_hosts(self, count):
+        """
+        Returns the entries of the `count` hottest hosts: most severe first, then by their highest primary metric.
+        """
+        return [self.hosts[key[2]] for key in reversed(self._ranked[-count:])] if count > 0 else []
+
+    def snapshot(self, top_count):
+        return {
+            "event_type": "FLEET_SNAPSHOT",
+            "generated_at": datetime.now().isoformat(),
+            "host_count": len(self.hosts),
+            "severity_counts": dict(self.severity_counts),
+            "top_hosts": self.top_hosts(top_count),
+            "hosts": self.hosts
+        }
+
+def write_fleet_snapshot(fleet_state, output_file=None, top_count=None, max_age_seconds=None):
+    """
+    CR-011: Atomically writes the fleet snapshot to `output_file` (CT_FLEET_FILE).
+    Holds the `CT_FLEET_TOP_N` hottest hosts (default 10) and drops hosts
+    silent for `CT_FLEET_HOST_TTL_SECONDS` (default 3600).
+    Returns True if the snapshot was written, False if no file is configured.
+    """
+    output_file = output_file or os.environ.get("CT_FLEET_FILE")
+    if not output_file:
+        return False
+    if top_count is None:
+        top_count = int(os.environ.get("CT_FLEET_TOP_N", "10"))
+    if max_age_seconds is None:
+        max_age_seconds = float(os.environ.get("CT_FLEET_HOST_TTL_SECONDS", "3600"))
+
+    with open(f"{output_file}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            try:
+                stat = os.stat(output_file)
+                signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signature = None
+            if signature is not None and signature != fleet_state.written_signature:
+                # Written by another worker (or an earlier run): take its newer hosts
+                try:
+                    with open(output_file, 'r') as f:
+                        for entry in json.load(f).get("hosts", {}).values():
+                            fleet_state.update(entry)
+                except (OSError, ValueError, KeyError, AttributeError) as e:
+                    print(f"Warning: Could not merge fleet snapshot {output_file}: {e}")
+
+            fleet_state.expire(max_age_seconds)
+            temp_path = f"{output_file}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(fleet_state.snapshot(top_count), f, indent=2)
+            os.replace(temp_path, output_file)
+            stat = os.stat(output_file)
+            fleet_state.written_signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    return True
@@ -0,0 +1,103 @@
+import ctypes
+import ctypes.util
+import os
+import select
+
+# AT-006: Event-driven wakeups for the file-backed MQ listeners (Linux inotify).
+#
+# A listener blocks on the inotify descriptor of the directory it consumes
+# instead of re-listing it on a timer, so an idle listener uses no CPU and a
+# new message wakes it within milliseconds. Platforms without inotify return
+# no watcher and the caller keeps polling.
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+# Messages are published with a rename (IN_MOVED_TO); IN_CLOSE_WRITE covers writers that create files in place
+NEW_MESSAGE_EVENTS = IN_MOVED_TO | IN_CLOSE_WRITE
+
+_LIBC = None
+
+def _load_libc():
+    global _LIBC
+    if _LIBC is None:
+        _LIBC = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _LIBC
+
+class DirectoryWatcher:
+    """
+    AT-006: Waits for inotify events on a directory.
+
+    `wait` blocks until an event matching `mask` arrives, `wake` is called
+    (e.g. from a signal handler) or the timeout expires. Events queue up while
+    the caller is busy, so nothing published between two waits is missed.
+    Raises OSError if inotify is not available.
+    """
+
+    def __init__(self, path, mask=NEW_MESSAGE_EVENTS):
+        libc = _load_libc()
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform.")
+
+        self.path = path
+        self._inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._inotify_fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        if libc.inotify_add_watch(self._inotify_fd, os.fsencode(path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._inotify_fd)
+            raise OSError(error, f"{os.strerror(error)}: {path}")
+
+        # Self-pipe so `wake` can interrupt a blocked wait
+        self._wake_read_fd, self._wake_write_fd = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self._poller = select.poll()
+        self._poller.register(self._inotify_fd, select.POLLIN)
+        self._poller.register(self._wake_read_fd, select.POLLIN)
+
+    def _discard(self, fd):
+        try:
+            while os.read(fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout=None):
+        """
+        Blocks for up to `timeout` seconds (None waits indefinitely).
+        Returns True if woken by an event or `wake`, False on timeout.
+        """
+        ready = self._poller.poll(None if timeout is None else int(timeout * 1000))
+        for fd, event in ready:
+            # Only the wakeup matters, not which files changed
+            self._discard(fd)
+        return bool(ready)
+
+    def wake(self):
+        """
+        Interrupts a blocked `wait`. Safe to call from a signal handler.
+        """
+        try:
+            os.write(self._wake_write_fd, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self):
+        for fd in (self._inotify_fd, self._wake_read_fd, self._wake_write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+def open_directory_watcher(path, mask=NEW_MESSAGE_EVENTS):
+    """
+    Returns a DirectoryWatcher for `path`, or None if inotify cannot be used
+    (the caller then falls back to polling).
+    """
+    try:
+        return DirectoryWatcher(path, mask)
+    except (OSError, AttributeError) as e:
+        print(f"Warning: inotify unavailable for {path} ({e}). Falling back to polling.")
+        return None
@@ -1,97 +1,491 @@
+import hashlib
 import json
 import os
 import sys
+import time
 from datetime import datetime
+from string import Formatter
 
 # Add the project root to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.load_env import load_env
+from src.artifact_cache import ArtifactCache, get_artifact_cache
+from src.insight_rules import SEVERITY_CODES, SEVERITY_CRITICAL, SEVERITY_WARNING, get_rule_set
+from src.mq_codec import decode_message
+from src.mq_segment_log import SegmentLog
+import redis
 
 # Load environment variables
 load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
-def generate_executive_summary(processed_data):
+# FT-002: Consumer group of the Code Team's result topic, and FT-001's consumer in it on Redis
+FT_CONSUMER_GROUP = "ft001_group"
+FT_CONSUMER_NAME = "ft001"
+
+# AT-011: Artifact cache stage of the summaries. Bump the version whenever the
+# templates or the rendering change, so summaries cached by older code are not reused.
+SUMMARY_STAGE = "ft001_summary"
+SUMMARY_STAGE_VERSION = "4"
+
+# FT-002: Redis client for the result stream (MQ_TYPE=REDIS_STREAMS)
+try:
+    REDIS_CLIENT = redis.Redis(
+        host=os.environ.get("REDIS_HOST"),
+        port=int(os.environ.get("REDIS_PORT")),
+        decode_responses=False
+    )
+    REDIS_CLIENT.ping()
+    REDIS_AVAILABLE = True
+except Exception:
+    REDIS_AVAILABLE = False
+
+def status_icon(severity_code):
     """
-    Generates a high-level Markdown summary from the Code Team's processed JSON.
+    AT-009: Returns the status icon for a metric's severity code (None means no rule matched).
     """
-    
-    # Extract key data points
-    timestamp = processed_data.get("source_timestamp", "N/A")
-    insight = processed_data.get("actionable_insight", "No specific insight generated.")
-    metrics = processed_data.get("metrics_processed", {})
-    
-    disk_percent = metrics.get("disk_usage_percent", "N/A")
-    cpu_percent = metrics.get("cpu_usage_percent", "N/A")
-    mem_percent = metrics.get("mem_usage_percent", "N/A")
-    
-    # Determine overall status
-    overall_status = "GREEN"
-    if "CRITICAL" in insight:
-        overall_status = "RED"
-    elif "WARNING" in insight:
-        overall_status = "YELLOW"
-        
-    # Build the Markdown report
-    report = f"""# Executive Summary Report: System Resource Analysis
+    if severity_code == SEVERITY_CRITICAL:
+        return '🔴'
+    if severity_code == SEVERITY_WARNING:
+        return '🟡'
+    return '🟢'
+
+# FT-003: Templates are parsed once at import into (literal, field) pairs, so
+# rendering is a single join. The 'Generated At' line is excluded from the
+# content hash, so an unchanged summary is not rewritten.
+GENERATED_AT_LABEL = "**Generated At:** "
+
+REPORT_TEMPLATE = """# Executive Summary Report: System Resource Analysis
 
 **Generated By:** Features Team (FT-001)
-**Generated At:** {datetime.now().isoformat()}
-**Source Timestamp:** {timestamp}
+**Generated At:** {generated_at}
+**Source Timestamp:** {source_timestamp}
 **Overall Status:** **{overall_status}**
 
 ## Key Findings
 
-The system resource analysis indicates the following status:
-
-| Metric | Value | Status |
-| :--- | :--- | :--- |
-| Disk Usage | {disk_percent}% | {'🔴' if disk_percent >= 80 else '🟢'} |
-| CPU Usage | {cpu_percent}% | {'🟡' if cpu_percent >= 90 else '🟢'} |
-| Memory Usage | {mem_percent}% | {'🟡' if mem_percent >= 90 else '🟢'} |
+{key_findings}
 
 ## Actionable Insight
 
-> {insight}
+{insights}
 
 ## Raw Data Reference
 
 The full processed data is available in the Code Team's output topic.
 """
-    return report
 
-def start_summary_listener():
+SINGLE_FINDINGS_TEMPLATE = """The system resource analysis indicates the following status:
+
+| Metric | Value | Status |
+| :--- | :--- | :--- |
+| Disk Usage | {disk}% | {disk_icon} |
+| CPU Usage | {cpu}% | {cpu_icon} |
+| Memory Usage | {mem}% | {mem_icon} |"""
+
+MULTI_FINDINGS_TEMPLATE = """The system resource analysis covers {result_count} results from {host_count} hosts:
+
+| Host | Source Timestamp | Disk Usage | CPU Usage | Memory Usage | Status |
+| :--- | :--- | :--- | :--- | :--- | :--- |
+{rows}"""
+
+MULTI_ROW_TEMPLATE = "| {host} | {source_timestamp} | {disk}% {disk_icon} | {cpu}% {cpu_icon} | {mem}% {mem_icon} | {status} |"
+MULTI_INSIGHT_TEMPLATE = "- **{host}** ({source_timestamp}): {insight}"
+
+def compile_template(template):
     """
-    Handles the MQ subscription logic for the Features Team.
-    It consumes the Code Team's output and generates the summary.
+    FT-003: Parses a str.format-style template once.
+    Returns a function rendering it from keyword arguments.
     """
-    # The Features Team consumes the Code Team's output file directly for simplicity
-    # In a real system, this would be a separate MQ topic.
-    input_file = os.environ.get("CT_OUTPUT_FILE")
-    output_file = os.environ.get("FT_OUTPUT_FILE")
+    parts = [(literal, field) for literal, field, format_spec, conversion in Formatter().parse(template)]
+    def render(**values):
+        return "".join(literal + (str(values[field]) if field is not None else "") for literal, field in parts)
+    return render
+
+_RENDER_REPORT = compile_template(REPORT_TEMPLATE)
+_RENDER_SINGLE_FINDINGS = compile_template(SINGLE_FINDINGS_TEMPLATE)
+_RENDER_MULTI_FINDINGS = compile_template(MULTI_FINDINGS_TEMPLATE)
+_RENDER_MULTI_ROW = compile_template(MULTI_ROW_TEMPLATE)
+_RENDER_MULTI_INSIGHT = compile_template(MULTI_INSIGHT_TEMPLATE)
+
+def overall_status(severity_code):
+    if severity_code >= SEVERITY_CRITICAL:
+        return "RED"
+    if severity_code >= SEVERITY_WARNING:
+        return "YELLOW"
+    return "GREEN"
+
+def _summary_fields(processed_data):
+    """
+    Extracts the values one result contributes to the summary.
+    """
+    metrics = processed_data.get("metrics_processed", {})
     
-    if not input_file or not output_file:
-        print("Error: CT_OUTPUT_FILE or FT_OUTPUT_FILE environment variables not set.")
+    # AT-009: Status comes from the structured severity codes instead of scanning the insight text.
+    # Reports from before the rule engine are evaluated against the rule set.
+    findings = processed_data.get("insight_findings")
+    if findings is None:
+        evaluation = get_rule_set().evaluate(metrics)
+        findings = evaluation.findings
+        severity_code = evaluation.severity_code
+    else:
+        severity_code = processed_data.get("insight_severity_code", SEVERITY_CODES.get(processed_data.get("insight_severity"), 0))
+    metric_severity = {finding["metric"]: finding["severity_code"] for finding in findings}
+    
+    return {
+        "host": processed_data.get("source_host", "unknown"),
+        "source_timestamp": processed_data.get("source_timestamp", "N/A"),
+        "insight": processed_data.get("actionable_insight", "No specific insight generated."),
+        "severity_code": severity_code,
+        "status": overall_status(severity_code),
+        "disk": metrics.get("disk_usage_percent", "N/A"),
+        "cpu": metrics.get("cpu_usage_percent", "N/A"),
+        "mem": metrics.get("mem_usage_percent", "N/A"),
+        "disk_icon": status_icon(metric_severity.get("disk_usage_percent")),
+        "cpu_icon": status_icon(metric_severity.get("cpu_usage_percent")),
+        "mem_icon": status_icon(metric_severity.get("mem_usage_percent"))
+    }
+
+def render_summary(results):
+    """
+    FT-003: Renders one Markdown summary from a list of processed results
+    (several hosts, or several windows of one host) in a single pass.
+    A single result gets the per-metric table; several get one row each and
+    the overall status of the most severe.
+    """
+    rows = [_summary_fields(processed_data) for processed_data in results]
+    if len(rows) == 1:
+        fields = rows[0]
+        key_findings = _RENDER_SINGLE_FINDINGS(**fields)
+        insights = f"> {fields['insight']}"
+        source_timestamp = fields["source_timestamp"]
+    else:
+        key_findings = _RENDER_MULTI_FINDINGS(
+            result_count=len(rows),
+            host_count=len({fields["host"] for fields in rows}),
+            rows="\n".join(_RENDER_MULTI_ROW(**fields) for fields in rows)
+        )
+        insights = "\n".join(_RENDER_MULTI_INSIGHT(**fields) for fields in rows)
+        source_timestamp = max((str(fields["source_timestamp"]) for fields in rows), default="N/A")
+    
+    return _RENDER_REPORT(
+        generated_at=datetime.now().isoformat(),
+        source_timestamp=source_timestamp,
+        overall_status=overall_status(max((fields["severity_code"] for fields in rows), default=0)),
+        key_findings=key_findings,
+        insights=insights
+    )
+
+def generate_executive_summary(processed_data):
+    """
+    Generates a high-level Markdown summary from the Code Team's processed JSON.
+    """
+    return render_summary([processed_data])
+
+def summary_content_hash(summary_report):
+    """
+    FT-003: Returns the SHA-256 of a summary without its 'Generated At' line.
+    """
+    start = summary_report.find(GENERATED_AT_LABEL)
+    if start != -1:
+        end = summary_report.find("\n", start)
+        summary_report = summary_report[:start] + (summary_report[end:] if end != -1 else "")
+    return hashlib.sha256(summary_report.encode('utf-8')).hexdigest()
+
+def set_generated_at(summary_report, generated_at):
+    """
+    AT-011: Returns the summary with `generated_at` as the value of its 'Generated At' line.
+    """
+    start = summary_report.find(GENERATED_AT_LABEL)
+    if start == -1:
+        return summary_report
+    start += len(GENERATED_AT_LABEL)
+    end = summary_report.find("\n", start)
+    return summary_report[:start] + generated_at + (summary_report[end:] if end != -1 else "")
+
+def get_result_topic():
+    """
+    FT-002: Returns the Code Team's result topic (CT_RESULT_TOPIC, default 'ct_results').
+    """
+    return os.environ.get("CT_RESULT_TOPIC", "ct_results")
+
+def write_summary(summary_report, output_file):
+    """
+    Writes the summary atomically, so RT-001 never reads a partial file.
+    FT-003: The write is skipped when the content (ignoring 'Generated At') has
+    the hash recorded in '<output_file>.sha256' by the last write, so RT-001
+    only regenerates the PDF on real changes.
+    Returns True if the file was written.
+    """
+    content_hash = summary_content_hash(summary_report)
+    hash_file = f"{output_file}.sha256"
+    try:
+        with open(hash_file, 'r') as f:
+            if f.read().strip() == content_hash and os.path.exists(output_file):
+                print(f"Features Team (FT-001) Executive Summary unchanged; not rewriting {output_file}")
+                return False
+    except FileNotFoundError:
+        pass
+
+    for path, text in ((output_file, summary_report), (hash_file, content_hash)):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    return True
+
+def write_cached_summary(input_data, build_summary, output_file):
+    """
+    AT-011: Writes the summary of serialized Code Team results (bytes), built
+    by `build_summary(input_data)`. Results summarized before are served from
+    the artifact cache without decoding or rendering them. The cache holds
+    the summary without its generation time, which is filled in on a hit.
+    Raises ValueError if the results cannot be decoded.
+    """
+    cache = get_artifact_cache()
+    if cache is None:
+        write_summary(build_summary(input_data), output_file)
         return
 
+    key = ArtifactCache.key(SUMMARY_STAGE, SUMMARY_STAGE_VERSION, input_data)
+    cached_summary = cache.read(key)
+    if cached_summary is not None:
+        print("Features Team (FT-001) Executive Summary for these results is cached (AT-011).")
+        write_summary(set_generated_at(cached_summary.decode('utf-8'), datetime.now().isoformat()), output_file)
+        return
+
+    summary_report = build_summary(input_data)
+    cache.put(key, set_generated_at(summary_report, "").encode('utf-8'), SUMMARY_STAGE)
+    write_summary(summary_report, output_file)
+
+def newest_per_host(payloads, newest_by_host=None):
+    """
+    FT-003: Folds result payloads (oldest first) into the newest decodable
+    result of every source host: {host: result}.
+    """
+    if newest_by_host is None:
+        newest_by_host = {}
+    for payload in payloads:
+        if payload is None:
+            continue
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        try:
+            processed_data = decode_message(payload)
+        except ValueError as e:
+            print(f"Error: Skipping undecodable Code Team result ({e}).")
+            continue
+        if not isinstance(processed_data, dict):
+            print("Error: Skipping Code Team result that is not a JSON object.")
+            continue
+        newest_by_host[processed_data.get("source_host", "unknown")] = processed_data
+    return newest_by_host
+
+def load_host_state(output_file):
+    """
+    FT-003: Returns the newest result of every host summarized so far, as saved
+    in '<output_file>.hosts.json': {host: {"last_seen": epoch seconds, "result": result}}.
+    """
+    try:
+        with open(f"{output_file}.hosts.json", 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"Warning: Could not read the FT-001 host state of {output_file}: {e}")
+        return {}
+
+def save_host_state(host_state, output_file):
+    state_file = f"{output_file}.hosts.json"
+    temp_path = f"{state_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(host_state, f)
+    os.replace(temp_path, state_file)
+
+def summarize_hosts(newest_by_host, output_file):
+    """
+    FT-003: Merges the newest results read in this run (see newest_per_host)
+    into the host state saved next to the summary, and writes one summary of
+    every host in it, a row per host when several hosts reported. Hosts that
+    sent nothing new stay in the summary until they have been silent for
+    CT_FLEET_HOST_TTL_SECONDS (default 3600), like in the CR-011 fleet view.
+    Returns True if there was a new result to summarize (the file is left
+    untouched if the summary did not change).
+    """
+    if not newest_by_host:
+        return False
+    now = time.time()
+    max_age_seconds = float(os.environ.get("CT_FLEET_HOST_TTL_SECONDS", "3600"))
+    host_state = load_host_state(output_file)
+    for host, processed_data in newest_by_host.items():
+        host_state[host] = {"last_seen": now, "result": processed_data}
+    host_state = {host: entry for host, entry in host_state.items() if now - entry["last_seen"] <= max_age_seconds}
+
+    results = [host_state[host]["result"] for host in sorted(host_state)]
+    input_data = json.dumps(results, sort_keys=True).encode('utf-8')
+    write_cached_summary(input_data, lambda data: render_summary(results), output_file)
+    save_host_state(host_state, output_file)
+    return True
+
+def consume_results_from_segment_log(output_file):
+    """
+    FT-002: Summarizes the results published to the segmented log result topic
+    since the FT-001 consumer group's committed offset, then commits past them.
+    FT-003: The new range is read in batches of FT_SEGMENT_LOG_BATCH_SIZE
+    (default 500) and the newest result of every host is summarized (see summarize_hosts).
+    Concurrent runs return immediately.
+    Returns the number of new results consumed (0 if none of them could be decoded).
+    """
+    log = SegmentLog(get_result_topic())
+    try:
+        with log.group_lock(FT_CONSUMER_GROUP, blocking=False) as acquired:
+            if not acquired:
+                return 0
+            committed_offset = log.committed_offset(FT_CONSUMER_GROUP)
+            end_offset = log.end_offset()
+            if committed_offset >= end_offset:
+                return 0
+
+            batch_size = int(os.environ.get("FT_SEGMENT_LOG_BATCH_SIZE", "500"))
+            newest_by_host = {}
+            offset = committed_offset
+            while offset < end_offset:
+                records = log.read(offset, max(1, min(batch_size, end_offset - offset)))
+                if not records:
+                    break
+                # Corrupted records come back without a payload and are skipped
+                newest_per_host([payload for record_offset, payload in records], newest_by_host)
+                offset = records[-1][0] + 1
+            summarized = summarize_hosts(newest_by_host, output_file)
+            # Undecodable results can never be summarized, so they are committed past either way
+            log.commit(FT_CONSUMER_GROUP, end_offset)
+        log.delete_consumed_segments()
+    finally:
+        log.close()
+    if not summarized:
+        print(f"Error: None of the {end_offset - committed_offset} new Code Team results could be decoded.")
+        return 0
+    return end_offset - committed_offset
+
+def _read_result_entries(topic, stream_id, count):
+    response = REDIS_CLIENT.xreadgroup(FT_CONSUMER_GROUP, FT_CONSUMER_NAME, {topic: stream_id}, count=count)
+    return response[0][1] if response and response[0][1] else []
+
+def consume_results_from_redis(output_file, batch_size=None, max_entries=None):
+    """
+    FT-002: Summarizes the results published to the Redis result stream that the
+    FT-001 consumer group has not read yet, then acknowledges them.
+
+    Entries delivered by an earlier run that failed before acknowledging them
+    (FT-001's pending entries) are read first. The stream is read in rounds
+    of at most `max_entries` entries (FT_REDIS_MAX_ENTRIES, default 5000); each
+    round is summarized and only then acknowledged, so a failed write leaves
+    it pending for the next run. FT-003: The summary covers the newest result
+    of every host (see summarize_hosts).
+    Returns the number of new results consumed (rounds none of which could be decoded count as 0).
+    """
+    if not REDIS_AVAILABLE:
+        return 0
+    topic = get_result_topic()
+    if batch_size is None:
+        batch_size = int(os.environ.get("FT_REDIS_BATCH_SIZE", "500"))
+    if max_entries is None:
+        max_entries = int(os.environ.get("FT_REDIS_MAX_ENTRIES", "5000"))
+
+    try:
+        REDIS_CLIENT.xgroup_create(topic, FT_CONSUMER_GROUP, id='0', mkstream=True)
+    except redis.exceptions.ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+    consumed_count = 0
+    # Reading from an ID returns this consumer's pending entries after it; '>' returns new ones
+    stream_id = '0'
+    while True:
+        message_ids = []
+        round_by_host = {}
+        while len(message_ids) < max_entries:
+            entries = _read_result_entries(topic, stream_id, max(1, min(batch_size, max_entries - len(message_ids))))
+            if not entries:
+                if stream_id == '>':
+                    break
+                stream_id = '>'
+                continue
+            if stream_id != '>':
+                stream_id = entries[-1][0]
+            message_ids.extend(message_id for message_id, message_data in entries)
+            # Entries trimmed from the stream come back without fields
+            newest_per_host([message_data.get(b'data', message_data.get('data')) for message_id, message_data in entries if message_data], round_by_host)
+        if not message_ids:
+            return consumed_count
+
+        summarized = summarize_hosts(round_by_host, output_file)
+        # Undecodable results can never be summarized, so they are acknowledged either way
+        REDIS_CLIENT.xack(topic, FT_CONSUMER_GROUP, *message_ids)
+        if summarized:
+            consumed_count += len(message_ids)
+        else:
+            print(f"Error: None of the {len(message_ids)} Code Team results read from {topic} could be decoded.")
+        if len(message_ids) < max_entries:
+            return consumed_count
+
+def summarize_output_file(input_file, output_file):
+    """
+    FT_INPUT_MODE=FILE: Summarizes the Code Team's output file (CT_OUTPUT_FILE).
+    """
     # 1. Read the Code Team's processed data
     try:
-        with open(input_file, 'r') as f:
-            processed_data = json.load(f)
+        with open(input_file, 'rb') as f:
+            input_data = f.read()
     except FileNotFoundError:
         print(f"Features Team (FT-001) Subscriber: Code Team output file not found at {input_file}.")
-        return
+        return False
     except Exception as e:
         print(f"Error reading Code Team output: {e}")
+        return False
+
+    # 2. Generate the summary (AT-011: unless cached) and 3. write the final Markdown report
+    try:
+        write_cached_summary(input_data, lambda data: generate_executive_summary(json.loads(data)), output_file)
+    except ValueError as e:
+        print(f"Error reading Code Team output: {e}")
+        return False
+    return True
+
+def start_summary_listener():
+    """
+    Handles the MQ subscription logic for the Features Team.
+    It consumes the Code Team's output and generates the summary.
+    FT-002: The results are consumed from the Code Team's result topic with the
+    FT-001 consumer group's own offset, so a summary is only generated when a
+    new result was published: from the Redis result stream with
+    MQ_TYPE=REDIS_STREAMS (when Redis is available), otherwise from the
+    segmented log topic. FT-003: It covers the newest result of every host.
+    FT_INPUT_MODE=FILE reads CT_OUTPUT_FILE instead.
+    """
+    output_file = os.environ.get("FT_OUTPUT_FILE")
+    if not output_file:
+        print("Error: FT_OUTPUT_FILE environment variable not set.")
         return
 
-    # 2. Generate the summary
-    summary_report = generate_executive_summary(processed_data)
+    if os.environ.get("FT_INPUT_MODE", "TOPIC") == "FILE":
+        input_file = os.environ.get("CT_OUTPUT_FILE")
+        if not input_file:
+            print("Error: CT_OUTPUT_FILE environment variable not set.")
+            return
+        if summarize_output_file(input_file, output_file):
+            print(f"Features Team (FT-001) successfully generated Executive Summary to {output_file}")
+        return
+
+    # The same choice as CT-002's publish_results, so one consumer writes the summary
+    if os.environ.get("MQ_TYPE", "FILE_SYSTEM") == "REDIS_STREAMS" and REDIS_AVAILABLE:
+        consumed_count = consume_results_from_redis(output_file)
+    else:
+        consumed_count = consume_results_from_segment_log(output_file)
 
-    # 3. Write the final Markdown report
-    with open(output_file, 'w') as f:
-        f.write(summary_report)
-        
-    print(f"Features Team (FT-001) successfully generated Executive Summary to {output_file}")
+    if not consumed_count:
+        print(f"Features Team (FT-001) Subscriber: No new Code Team results on {get_result_topic()}.")
+        return
+    print(f"Features Team (FT-001) successfully generated Executive Summary to {output_file} ({consumed_count} new results).")
 
 if __name__ == "__main__":
     start_summary_listener()
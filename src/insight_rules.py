@@ -0,0 +1,265 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+
+# AT-009: Declarative insight rules shared by CT-002, FT-001 and the monitoring agent.
+#
+# A rule compares one metric against a threshold and emits a severity and a
+# message when it matches:
+#
+#   {"id": "disk_critical", "metric": "disk_usage_percent", "op": ">=",
+#    "threshold": 80, "severity": "CRITICAL", "priority": 40,
+#    "message": "Disk usage is at or above 80% threshold. Immediate action required."}
+#
+# Rules are read from AT_INSIGHT_RULES_FILE (a JSON list, or {"rules": [...]})
+# and fall back to the built-in defaults below. Nested metrics are addressed by
+# dotted path (e.g. "filesystems./data.usage_percent") or, when a key itself
+# contains a dot such as a mount point, by a list of keys (e.g.
+# ["filesystems", "/mnt/v1.2", "usage_percent"]). Messages may use {value};
+# each template is formatted once when the rule is compiled, so a bad
+# template rejects the rule set instead of failing an evaluation. When
+# several rules match, the most severe one wins, then the highest priority,
+# then the one listed first.
+#
+# The rule set is compiled once: per metric and operator the thresholds are
+# kept sorted together with the best rule of every prefix (or suffix), so
+# evaluating a report costs one binary search per referenced metric, however
+# many rules share it.
+
+SEVERITY_OK = 0
+SEVERITY_WARNING = 1
+SEVERITY_CRITICAL = 2
+SEVERITY_NAMES = {SEVERITY_OK: "OK", SEVERITY_WARNING: "WARNING", SEVERITY_CRITICAL: "CRITICAL"}
+SEVERITY_CODES = {name: code for code, name in SEVERITY_NAMES.items()}
+
+OK_MESSAGE = "All primary resource metrics are within acceptable limits."
+OPERATORS = (">=", ">", "<=", "<")
+
+def default_rules():
+    """
+    Returns the built-in rules, equivalent to the original CT-002 thresholds.
+    """
+    return [
+        {"id": "disk_critical", "metric": "disk_usage_percent", "op": ">=", "threshold": 80, "severity": "CRITICAL", "priority": 40,
+         "message": "Disk usage is at or above 80% threshold. Immediate action required."},
+        {"id": "disk_full_projected", "metric": "disk_hours_to_full", "op": "<=", "threshold": float(os.environ.get("CT_DISK_FULL_HORIZON_HOURS", "24")),
+         "severity": "WARNING", "priority": 30, "message": "Disk usage is growing and is projected to reach 100% in {value:.1f} hours."},
+        {"id": "cpu_warning", "metric": "cpu_usage_percent", "op": ">=", "threshold": 90, "severity": "WARNING", "priority": 20,
+         "message": "CPU usage is at or above 90% threshold. Investigate process load."},
+        {"id": "mem_warning", "metric": "mem_usage_percent", "op": ">=", "threshold": 90, "severity": "WARNING", "priority": 10,
+         "message": "Memory usage is at or above 90% threshold. Investigate memory leaks."},
+    ]
+
+def _metric_path(metric):
+    """
+    Returns the key path of a rule metric: a dotted string or a list of keys.
+    """
+    if isinstance(metric, list):
+        path = tuple(metric)
+    elif isinstance(metric, str):
+        path = tuple(metric.split("."))
+    else:
+        raise TypeError(f"metric must be a dotted path or a list of keys, not {metric!r}")
+    if not path or not all(isinstance(key, str) and key for key in path):
+        raise ValueError(f"metric {metric!r} has an empty or non-string key")
+    return path
+
+class Rule:
+    """
+    AT-009: One validated rule. `rank` orders matching rules (higher wins).
+    """
+
+    __slots__ = ("rule_id", "metric", "path", "op", "threshold", "severity_code", "priority", "message", "rank")
+
+    def __init__(self, definition, position):
+        try:
+            self.rule_id = str(definition["id"])
+            self.path = _metric_path(definition["metric"])
+            self.op = definition.get("op", ">=")
+            self.threshold = float(definition["threshold"])
+            self.severity_code = SEVERITY_CODES[definition.get("severity", "WARNING")]
+            self.priority = int(definition.get("priority", 0))
+            self.message = str(definition["message"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid insight rule {definition!r}: {e}")
+        if self.op not in OPERATORS:
+            raise ValueError(f"Invalid insight rule '{self.rule_id}': unsupported operator '{self.op}'. Expected one of {OPERATORS}.")
+        if self.severity_code == SEVERITY_OK:
+            raise ValueError(f"Invalid insight rule '{self.rule_id}': a rule must emit WARNING or CRITICAL.")
+        self.metric = ".".join(self.path)
+        try:
+            self.message.format(value=self.threshold)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid insight rule '{self.rule_id}': message {self.message!r} cannot be formatted with {{value}} ({e!r}).")
+        self.rank = (self.severity_code, self.priority, -position)
+
+    def matches(self, value):
+        if self.op == ">=":
+            return value >= self.threshold
+        if self.op == ">":
+            return value > self.threshold
+        if self.op == "<=":
+            return value <= self.threshold
+        return value < self.threshold
+
+    def finding(self, value):
+        return {
+            "rule_id": self.rule_id,
+            "metric": self.metric,
+            "value": value,
+            "severity": SEVERITY_NAMES[self.severity_code],
+            "severity_code": self.severity_code,
+            "message": self.message.format(value=value)
+        }
+
+def _best(rule_a, rule_b):
+    if rule_a is None:
+        return rule_b
+    if rule_b is None:
+        return rule_a
+    return rule_a if rule_a.rank >= rule_b.rank else rule_b
+
+class _ThresholdIndex:
+    """
+    Rules of one metric and operator, sorted by threshold, with the best rule
+    of every prefix (for > and >=) or suffix (for < and <=) precomputed.
+    """
+
+    def __init__(self, op, rules):
+        self.op = op
+        rules = sorted(rules, key=lambda rule: rule.threshold)
+        self.thresholds = [rule.threshold for rule in rules]
+        self.best = [None] * len(rules)
+        if op in (">=", ">"):
+            best = None
+            for index, rule in enumerate(rules):
+                best = self.best[index] = _best(best, rule)
+        else:
+            best = None
+            for index in range(len(rules) - 1, -1, -1):
+                best = self.best[index] = _best(best, rules[index])
+
+    def match(self, value):
+        """
+        Returns the best rule matching `value`, or None.
+        """
+        if self.op == ">=":
+            index = bisect_right(self.thresholds, value) - 1
+        elif self.op == ">":
+            index = bisect_left(self.thresholds, value) - 1
+        elif self.op == "<=":
+            index = bisect_left(self.thresholds, value)
+        else:
+            index = bisect_right(self.thresholds, value)
+        if 0 <= index < len(self.best):
+            return self.best[index]
+        return None
+
+class Evaluation:
+    """
+    AT-009: Result of evaluating a rule set against one report's metrics.
+    `findings` holds the winning finding of each metric that matched a rule.
+    """
+
+    __slots__ = ("severity_code", "rule_id", "message", "findings")
+
+    def __init__(self, matches):
+        # `matches` is a list of (rule, value) pairs
+        self.findings = [rule.finding(value) for rule, value in matches]
+        if matches:
+            top_index = max(range(len(matches)), key=lambda index: matches[index][0].rank)
+            top = self.findings[top_index]
+            self.severity_code = top["severity_code"]
+            self.rule_id = top["rule_id"]
+            self.message = top["message"]
+        else:
+            self.severity_code = SEVERITY_OK
+            self.rule_id = None
+            self.message = OK_MESSAGE
+
+    @property
+    def severity(self):
+        return SEVERITY_NAMES[self.severity_code]
+
+    def insight(self):
+        """
+        Returns the insight sentence, e.g. 'CRITICAL: Disk usage is ...'.
+        """
+        return f"{self.severity}: {self.message}"
+
+class RuleSet:
+    """
+    AT-009: A compiled set of insight rules.
+    """
+
+    def __init__(self, definitions):
+        self.rules = [Rule(definition, position) for position, definition in enumerate(definitions)]
+        rule_ids = [rule.rule_id for rule in self.rules]
+        duplicates = sorted({rule_id for rule_id in rule_ids if rule_ids.count(rule_id) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate insight rule IDs: {duplicates}")
+
+        grouped = {}
+        for rule in self.rules:
+            grouped.setdefault((rule.path, rule.op), []).append(rule)
+        # Metric path -> [_ThresholdIndex, ...]
+        self._indexes = {}
+        for (path, op), rules in grouped.items():
+            self._indexes.setdefault(path, []).append(_ThresholdIndex(op, rules))
+
+    def metric_paths(self):
+        """
+        Returns the key paths of the metrics referenced by the rules.
+        """
+        return sorted({rule.path for rule in self.rules})
+
+    def evaluate(self, metrics):
+        """
+        Evaluates the rules against a metrics dictionary. Missing and
+        non-numeric metrics match no rule.
+        Returns an Evaluation.
+        """
+        matches = []
+        for path, indexes in self._indexes.items():
+            value = metrics
+            for key in path:
+                if not isinstance(value, dict) or key not in value:
+                    value = None
+                    break
+                value = value[key]
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+
+            best = None
+            for index in indexes:
+                best = _best(best, index.match(value))
+            if best is not None:
+                matches.append((best, value))
+        return Evaluation(matches)
+
+def load_rule_set(path=None):
+    """
+    AT-009: Loads and compiles the rules from `path` (default AT_INSIGHT_RULES_FILE),
+    or the built-in defaults if no file is configured.
+    Raises ValueError if the file holds invalid rules.
+    """
+    path = path or os.environ.get("AT_INSIGHT_RULES_FILE")
+    if not path:
+        return RuleSet(default_rules())
+    with open(path, 'r') as f:
+        definitions = json.load(f)
+    if isinstance(definitions, dict):
+        definitions = definitions.get("rules", [])
+    return RuleSet(definitions)
+
+_RULE_SET = None
+
+def get_rule_set():
+    """
+    AT-009: Returns the process-wide rule set, compiled on first use.
+    """
+    global _RULE_SET
+    if _RULE_SET is None:
+        _RULE_SET = load_rule_set()
+        print(f"Architecture (AT-009) compiled {len(_RULE_SET.rules)} insight rules.")
+    return _RULE_SET
@@ -0,0 +1,121 @@
+import math
+from array import array
+from bisect import bisect_left, insort
+
+# CR-009: Streaming windowed aggregation of report metrics for the Code Team processor (CT-002).
+#
+# Every (host, metric) pair keeps a rolling window of its last samples in
+# array-backed ring buffers. The moving average and rate of change are kept
+# incrementally in O(1) per sample. Percentiles come from a sorted copy of
+# the window updated by binary search, so no per-report sorting is needed.
+
+DEFAULT_WINDOW_METRICS = ("disk_usage_percent", "cpu_usage_percent", "mem_usage_percent")
+
+class MetricWindow:
+    """
+    CR-009: Rolling window of the last `capacity` (timestamp, value) samples of one metric.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = array('d', [0.0]) * capacity
+        self._times = array('d', [0.0]) * capacity
+        # The window's values in ascending order, for percentiles
+        self._sorted = array('d')
+        self._start = 0
+        self.count = 0
+        self._sum = 0.0
+        self._evictions = 0
+
+    def add(self, timestamp, value):
+        value = float(value)
+        if self.count == self.capacity:
+            oldest = self._values[self._start]
+            self._sum -= oldest
+            del self._sorted[bisect_left(self._sorted, oldest)]
+            self._values[self._start] = value
+            self._times[self._start] = timestamp
+            self._start = (self._start + 1) % self.capacity
+            self._evictions += 1
+            if self._evictions >= self.capacity:
+                # Re-sum once per window turnover so rounding errors never accumulate
+                self._sum = math.fsum(self._values) - value
+                self._evictions = 0
+        else:
+            position = (self._start + self.count) % self.capacity
+            self._values[position] = value
+            self._times[position] = timestamp
+            self.count += 1
+        self._sum += value
+        insort(self._sorted, value)
+
+    def latest(self):
+        return self._values[(self._start + self.count - 1) % self.capacity]
+
+    def latest_time(self):
+        return self._times[(self._start + self.count - 1) % self.capacity]
+
+    def mean(self):
+        return self._sum / self.count
+
+    def percentile(self, percent):
+        """
+        Returns the nearest-rank percentile of the window.
+        """
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        return self._sorted[rank - 1]
+
+    def rate_per_minute(self):
+        """
+        Returns the change per minute between the oldest and newest sample (0 with a single sample).
+        """
+        newest = (self._start + self.count - 1) % self.capacity
+        elapsed = self._times[newest] - self._times[self._start]
+        if elapsed <= 0:
+            return 0.0
+        return (self._values[newest] - self._values[self._start]) / elapsed * 60
+
+    def summary(self):
+        newest = (self._start + self.count - 1) % self.capacity
+        return {
+            "latest": self.latest(),
+            "mean": round(self.mean(), 3),
+            "p95": self.percentile(95),
+            "rate_per_minute": round(self.rate_per_minute(), 4),
+            "samples": self.count,
+            "window_seconds": round(self._times[newest] - self._times[self._start], 3)
+        }
+
+class WindowAggregator:
+    """
+    CR-009: Rolling windows per host and metric.
+    """
+
+    def __init__(self, capacity, metrics=DEFAULT_WINDOW_METRICS):
+        self.capacity = capacity
+        self.metrics = metrics
+        self._windows = {}
+
+    def observe(self, host, timestamp, metrics):
+        """
+        Adds one report's metrics (sampled at `timestamp`, epoch seconds) to the
+        host's windows and returns {metric: summary} for the updated windows.
+        A sample that is not newer than a window's newest one is not added: it
+        is a redelivered report (or arrived out of order), and counting it
+        again would skew the mean, percentile and rate.
+        """
+        aggregates = {}
+        for name in self.metrics:
+            value = metrics.get(name)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            window = self._windows.get((host, name))
+            if window is None:
+                window = self._windows[(host, name)] = MetricWindow(self.capacity)
+            if window.count == 0 or timestamp > window.latest_time():
+                window.add(timestamp, value)
+            aggregates[name] = window.summary()
+        return aggregates
+
+    def hosts(self):
+        return sorted({host for host, name in self._windows})
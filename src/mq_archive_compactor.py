@@ -0,0 +1,268 @@
+import json
+import os
+import sys
+import tarfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from scripts.load_env import load_env
+
+# AT-007: Compaction and retention for the file system MQ archive directory.
+#
+# Archived messages (including '.corrupted' ones) are rolled into compressed,
+# time-bucketed bundles under '<archive>/bundles/'. Each bundle has a small JSON
+# index next to it, so a message can be found by ID or timestamp without
+# opening every bundle:
+#
+#   bundles/archive_<bucket start>_<unique>.tar.gz
+#   bundles/archive_<bucket start>_<unique>.index.json
+#
+# A bundle only counts once its index exists; the index is written last.
+
+BUNDLES_DIR = "bundles"
+BUNDLE_PREFIX = "archive_"
+BUNDLE_SUFFIX = ".tar.gz"
+INDEX_SUFFIX = ".index.json"
+CORRUPTED_SUFFIX = ".corrupted"
+
+def _bucket_label(bucket_start):
+    return datetime.fromtimestamp(bucket_start).strftime("%Y%m%dT%H%M%S")
+
+def _message_id(file_name):
+    """
+    Returns the message ID of an archived file: its name without the codec and '.corrupted' extensions.
+    """
+    if file_name.endswith(CORRUPTED_SUFFIX):
+        file_name = file_name[:-len(CORRUPTED_SUFFIX)]
+    return os.path.splitext(file_name)[0]
+
+def _fsync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+def _load_indexes(bundles_dir):
+    """
+    Returns the indexes of all complete bundles, oldest bucket first.
+    """
+    indexes = []
+    if not os.path.isdir(bundles_dir):
+        return indexes
+    for name in sorted(os.listdir(bundles_dir)):
+        if not name.endswith(INDEX_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(bundles_dir, name), 'r') as f:
+                indexes.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping unreadable archive index {name}: {e}")
+    return indexes
+
+def _remove_incomplete_bundles(bundles_dir):
+    """
+    Removes temp files and bundles without an index, left by an interrupted compaction.
+    Their messages are still in the archive directory and are bundled again.
+    """
+    names = set(os.listdir(bundles_dir))
+    for name in names:
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(bundles_dir, name))
+        elif name.endswith(BUNDLE_SUFFIX) and name[:-len(BUNDLE_SUFFIX)] + INDEX_SUFFIX not in names:
+            os.remove(os.path.join(bundles_dir, name))
+
+def _write_bundle(archive_dir, bundles_dir, bucket_start, bucket_seconds, files):
+    """
+    Writes one bundle and its index for `files` (a list of (name, stat_result)).
+    Returns the bundle's index.
+    """
+    stem = f"{BUNDLE_PREFIX}{_bucket_label(bucket_start)}_{time.time_ns()}"
+    bundle_path = os.path.join(bundles_dir, stem + BUNDLE_SUFFIX)
+    index_path = os.path.join(bundles_dir, stem + INDEX_SUFFIX)
+
+    messages = []
+    with tarfile.open(bundle_path + ".tmp", "w:gz", compresslevel=6) as bundle:
+        for name, stat_result in files:
+            bundle.add(os.path.join(archive_dir, name), arcname=name, recursive=False)
+            messages.append({
+                "id": _message_id(name),
+                "file": name,
+                "timestamp": stat_result.st_mtime,
+                "size": stat_result.st_size,
+                "corrupted": name.endswith(CORRUPTED_SUFFIX)
+            })
+    _fsync_file(bundle_path + ".tmp")
+
+    index = {
+        "bundle": stem + BUNDLE_SUFFIX,
+        "bucket_start": bucket_start,
+        "bucket_end": bucket_start + bucket_seconds,
+        "message_count": len(messages),
+        "bundle_bytes": os.path.getsize(bundle_path + ".tmp"),
+        "messages": messages
+    }
+    with open(index_path + ".tmp", 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(bundle_path + ".tmp", bundle_path)
+    os.rename(index_path + ".tmp", index_path)
+    return index
+
+def compact_archive(archive_dir=None, bucket_seconds=None, now=None):
+    """
+    AT-007: Rolls archived messages into compressed bundles, one per time bucket
+    (MQ_ARCHIVE_BUCKET_SECONDS, default one hour) of their file mtime. Claiming
+    and archiving a message are renames, which keep the mtime, so this is when
+    the message was published rather than when it was archived.
+
+    Only buckets that have ended are compacted, since the current one may still
+    receive messages. The original files are deleted once their bundle and
+    index are durable; files already recorded in a bundle by an interrupted
+    earlier run are deleted without being bundled twice.
+    Returns the number of messages compacted.
+    """
+    archive_dir = archive_dir or os.environ.get("MQ_ARCHIVE_DIR")
+    if not archive_dir or not os.path.isdir(archive_dir):
+        print("Error: MQ_ARCHIVE_DIR is not set or does not exist. Cannot compact the archive.")
+        return 0
+    if bucket_seconds is None:
+        bucket_seconds = int(os.environ.get("MQ_ARCHIVE_BUCKET_SECONDS", "3600"))
+    now = time.time() if now is None else now
+
+    bundles_dir = os.path.join(archive_dir, BUNDLES_DIR)
+    os.makedirs(bundles_dir, exist_ok=True)
+    _remove_incomplete_bundles(bundles_dir)
+
+    buckets = {}
+    with os.scandir(archive_dir) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False) or entry.name.endswith(".tmp"):
+                continue
+            stat_result = entry.stat(follow_symlinks=False)
+            bucket_start = int(stat_result.st_mtime) - int(stat_result.st_mtime) % bucket_seconds
+            if bucket_start + bucket_seconds > now:
+                continue
+            buckets.setdefault(bucket_start, []).append((entry.name, stat_result))
+    if not buckets:
+        return 0
+
+    already_bundled = {
+        (index["bucket_start"], message["file"])
+        for index in _load_indexes(bundles_dir) if index["bucket_start"] in buckets
+        for message in index["messages"]
+    }
+
+    compacted_count = 0
+    for bucket_start in sorted(buckets):
+        files = []
+        for name, stat_result in sorted(buckets[bucket_start], key=lambda item: item[0]):
+            if (bucket_start, name) in already_bundled:
+                os.remove(os.path.join(archive_dir, name))
+            else:
+                files.append((name, stat_result))
+        if not files:
+            continue
+
+        index = _write_bundle(archive_dir, bundles_dir, bucket_start, bucket_seconds, files)
+        for name, stat_result in files:
+            os.remove(os.path.join(archive_dir, name))
+        compacted_count += len(files)
+        print(f"Architecture (AT-007) compacted {len(files)} archived messages into {index['bundle']}.")
+
+    return compacted_count
+
+def _delete_bundle(bundles_dir, index):
+    # The index goes first, so a half-deleted bundle is treated as incomplete
+    os.remove(os.path.join(bundles_dir, index["bundle"][:-len(BUNDLE_SUFFIX)] + INDEX_SUFFIX))
+    try:
+        os.remove(os.path.join(bundles_dir, index["bundle"]))
+    except FileNotFoundError:
+        pass
+
+def enforce_archive_retention(archive_dir=None, max_age_days=None, max_bytes=None, now=None):
+    """
+    AT-007: Deletes bundles whose bucket ended more than `max_age_days` ago
+    (MQ_ARCHIVE_RETENTION_DAYS, default 30), then the oldest bundles until all
+    bundles fit in `max_bytes` (MQ_ARCHIVE_MAX_BYTES, default 1 GiB).
+    A limit of 0 disables that check.
+    Returns the number of bundles deleted.
+    """
+    archive_dir = archive_dir or os.environ.get("MQ_ARCHIVE_DIR")
+    if not archive_dir:
+        return 0
+    if max_age_days is None:
+        max_age_days = float(os.environ.get("MQ_ARCHIVE_RETENTION_DAYS", "30"))
+    if max_bytes is None:
+        max_bytes = int(os.environ.get("MQ_ARCHIVE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    now = time.time() if now is None else now
+
+    bundles_dir = os.path.join(archive_dir, BUNDLES_DIR)
+    indexes = _load_indexes(bundles_dir)
+    deleted_count = 0
+
+    kept = []
+    for index in indexes:
+        if max_age_days and index["bucket_end"] < now - max_age_days * 86400:
+            _delete_bundle(bundles_dir, index)
+            deleted_count += 1
+        else:
+            kept.append(index)
+
+    total_bytes = sum(index["bundle_bytes"] for index in kept)
+    while max_bytes and kept and total_bytes > max_bytes:
+        index = kept.pop(0)
+        _delete_bundle(bundles_dir, index)
+        total_bytes -= index["bundle_bytes"]
+        deleted_count += 1
+
+    if deleted_count:
+        print(f"Architecture (AT-007) retention deleted {deleted_count} archive bundles ({total_bytes} bytes kept).")
+    return deleted_count
+
+def find_archived_messages(archive_dir=None, message_id=None, start=None, end=None):
+    """
+    AT-007: Looks up compacted messages by ID and/or publish timestamp range
+    (`start`/`end` as datetimes or epoch seconds, end exclusive).
+    Only the indexes are read; bundles outside the time range are skipped.
+    Returns a list of index entries, each with the name of its 'bundle'.
+    """
+    archive_dir = archive_dir or os.environ.get("MQ_ARCHIVE_DIR")
+    if not archive_dir:
+        return []
+    if isinstance(start, datetime):
+        start = start.timestamp()
+    if isinstance(end, datetime):
+        end = end.timestamp()
+
+    matches = []
+    for index in _load_indexes(os.path.join(archive_dir, BUNDLES_DIR)):
+        if (start is not None and index["bucket_end"] <= start) or (end is not None and index["bucket_start"] >= end):
+            continue
+        for message in index["messages"]:
+            if message_id is not None and message["id"] != message_id:
+                continue
+            if (start is not None and message["timestamp"] < start) or (end is not None and message["timestamp"] >= end):
+                continue
+            matches.append(dict(message, bundle=index["bundle"]))
+    return matches
+
+def read_archived_message(entry, archive_dir=None):
+    """
+    AT-007: Returns the raw payload (bytes) of a message found with find_archived_messages.
+    """
+    archive_dir = archive_dir or os.environ.get("MQ_ARCHIVE_DIR")
+    with tarfile.open(os.path.join(archive_dir, BUNDLES_DIR, entry["bundle"]), "r:gz") as bundle:
+        return bundle.extractfile(entry["file"]).read()
+
+def run_archive_maintenance():
+    """
+    AT-007: Compaction and retention job for the MQ archive, meant to run periodically (e.g. from cron).
+    """
+    load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
+    compacted_count = compact_archive()
+    deleted_count = enforce_archive_retention()
+    print(f"Architecture (AT-007) archive maintenance complete: {compacted_count} messages compacted, {deleted_count} bundles deleted.")
+
+if __name__ == "__main__":
+    run_archive_maintenance()
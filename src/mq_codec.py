@@ -0,0 +1,110 @@
+import json
+import os
+import zlib
+
+# AT-004: Pluggable message codecs shared by the MQ publishers (DT-001) and consumers (CT-002).
+#
+# JSON payloads are written as plain compact JSON, so existing consumers keep
+# reading them unchanged. Every other codec frames its payload with a small
+# header: the magic bytes below followed by a one-byte codec ID. Consumers
+# therefore negotiate the codec from the payload itself, and a publisher can
+# switch codecs (MQ_CODEC) without coordinating with its consumers.
+
+CODEC_HEADER_MAGIC = b"MQC"
+DEFAULT_CODEC = "json"
+
+# Codec name -> (codec_id, encode, decode, file_extension)
+_CODECS = {}
+_CODECS_BY_ID = {}
+
+def register_codec(name, codec_id, encode, decode, file_extension):
+    """
+    Registers a codec. `encode` turns a report dictionary into bytes and
+    `decode` turns those bytes back into a dictionary. JSON is the only
+    codec without an ID, since its payloads are written unframed.
+    """
+    _CODECS[name] = (codec_id, encode, decode, file_extension)
+    if codec_id is not None:
+        _CODECS_BY_ID[codec_id] = name
+
+def _encode_json(report_data):
+    return json.dumps(report_data, separators=(',', ':')).encode('utf-8')
+
+def _decode_json(payload):
+    return json.loads(payload)
+
+def _encode_zlib_json(report_data):
+    return zlib.compress(_encode_json(report_data))
+
+def _decode_zlib_json(payload):
+    return _decode_json(zlib.decompress(payload))
+
+def _encode_msgpack(report_data):
+    import msgpack
+    return msgpack.packb(report_data, use_bin_type=True)
+
+def _decode_msgpack(payload):
+    import msgpack
+    return msgpack.unpackb(payload, raw=False)
+
+register_codec("json", None, _encode_json, _decode_json, ".json")
+register_codec("zlib-json", 1, _encode_zlib_json, _decode_zlib_json, ".zjson")
+# Requires the optional 'msgpack' package (pip install meta_orchestration_core[msgpack])
+register_codec("msgpack", 2, _encode_msgpack, _decode_msgpack, ".msgpack")
+
+def get_codec_name(codec=None):
+    """
+    Returns the codec to publish with: `codec` if given, otherwise MQ_CODEC (default 'json').
+    Raises ValueError for unknown codecs.
+    """
+    name = codec or os.environ.get("MQ_CODEC", DEFAULT_CODEC)
+    if name not in _CODECS:
+        raise ValueError(f"Unknown MQ codec '{name}'. Available codecs: {sorted(_CODECS)}")
+    return name
+
+def encode_message(report_data, codec=None):
+    """
+    Encodes a report dictionary into an MQ payload (bytes) with the selected codec.
+    """
+    name = get_codec_name(codec)
+    codec_id, encode, decode, file_extension = _CODECS[name]
+    payload = encode(report_data)
+    if codec_id is None:
+        return payload
+    return CODEC_HEADER_MAGIC + bytes([codec_id]) + payload
+
+def decode_message(payload):
+    """
+    Decodes an MQ payload (bytes or str) produced by any registered codec.
+    Raises ValueError if the payload is malformed or uses an unknown codec.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+
+    if not payload.startswith(CODEC_HEADER_MAGIC):
+        return _decode_json(payload)
+
+    header_length = len(CODEC_HEADER_MAGIC) + 1
+    if len(payload) < header_length or payload[header_length - 1] not in _CODECS_BY_ID:
+        raise ValueError("MQ payload has an unknown codec header.")
+
+    codec_id, encode, decode, file_extension = _CODECS[_CODECS_BY_ID[payload[header_length - 1]]]
+    try:
+        return decode(payload[header_length:])
+    except ValueError:
+        raise
+    except Exception as e:
+        # Normalize codec-specific errors (zlib.error, msgpack exceptions, ...)
+        raise ValueError(f"MQ payload could not be decoded: {e}") from e
+
+def message_file_extension(codec=None):
+    """
+    Returns the file system MQ file extension for the selected codec.
+    """
+    return _CODECS[get_codec_name(codec)][3]
+
+def message_file_extensions():
+    """
+    Returns every file extension a file system MQ consumer should pick up.
+    """
+    return tuple(file_extension for codec_id, encode, decode, file_extension in _CODECS.values())
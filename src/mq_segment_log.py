@@ -0,0 +1,360 @@
+import bisect
+import contextlib
+import fcntl
+import mmap
+import os
+import struct
+import zlib
+
+# AT-005: Append-only segmented log engine for the file-backed MQ (MQ_TYPE=SEGMENT_LOG).
+#
+# Each topic is a directory of segment files instead of one file per message:
+#
+#   <base_dir>/<topic>/<base_offset>.log   records: length (u32) + CRC32 (u32) + payload
+#   <base_dir>/<topic>/<base_offset>.idx   one u64 byte position per record
+#   <base_dir>/<topic>/consumers/<group>.offset   next offset to read, per consumer group
+#
+# Offsets are contiguous, so the index of a segment maps offset -> position
+# with a single seek. A record is visible to readers once its index entry has
+# been written, which always happens after the record itself.
+
+RECORD_HEADER = struct.Struct(">II")
+INDEX_ENTRY = struct.Struct(">Q")
+LOG_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+CONSUMERS_DIR = "consumers"
+
+class SegmentLog:
+    """
+    AT-005: One topic of the segmented log.
+
+    Appends from several processes are serialized with a lock file. Segments
+    rotate once they reach `segment_bytes`. Readers map segments with mmap and
+    track their position per consumer group; segments consumed by every group
+    can be deleted with `delete_consumed_segments`.
+    """
+
+    def __init__(self, topic, base_dir=None, segment_bytes=None):
+        base_dir = base_dir or os.environ.get("MQ_SEGMENT_LOG_DIR", "parallel_orchestration/mq_log")
+        self.topic = topic
+        self.topic_dir = os.path.join(base_dir, topic)
+        self.segment_bytes = segment_bytes or int(os.environ.get("MQ_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+        os.makedirs(os.path.join(self.topic_dir, CONSUMERS_DIR), exist_ok=True)
+
+        # Segment name -> (mmap, mapped_size) for readers
+        self._maps = {}
+
+    # --- Segment helpers ---
+
+    def _segment_bases(self):
+        return sorted(
+            int(name[:-len(LOG_SUFFIX)]) for name in os.listdir(self.topic_dir)
+            if name.endswith(LOG_SUFFIX)
+        )
+
+    def _paths(self, base_offset):
+        stem = os.path.join(self.topic_dir, f"{base_offset:020d}")
+        return stem + LOG_SUFFIX, stem + INDEX_SUFFIX
+
+    def _record_count(self, base_offset):
+        log_path, index_path = self._paths(base_offset)
+        try:
+            return os.path.getsize(index_path) // INDEX_ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    @contextlib.contextmanager
+    def _locked(self, name, blocking=True):
+        """
+        Holds an exclusive lock on `<topic>/<name>`. Yields False if `blocking` is
+        False and another process holds the lock.
+        """
+        with open(os.path.join(self.topic_dir, name), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _recover_tail(self, log_path, index_path):
+        """
+        Truncates a record or index entry torn by a crashed writer.
+        Returns the end position of the last indexed record.
+        """
+        if not os.path.exists(index_path):
+            # The writer crashed while rotating, before the index existed: none
+            # of the segment's records was ever visible
+            open(index_path, 'ab').close()
+        index_size = os.path.getsize(index_path)
+        if index_size % INDEX_ENTRY.size:
+            index_size -= index_size % INDEX_ENTRY.size
+            os.truncate(index_path, index_size)
+
+        end_position = 0
+        if index_size:
+            with open(index_path, 'rb') as index_file:
+                index_file.seek(index_size - INDEX_ENTRY.size)
+                last_position, = INDEX_ENTRY.unpack(index_file.read(INDEX_ENTRY.size))
+            with open(log_path, 'rb') as log_file:
+                log_file.seek(last_position)
+                length, checksum = RECORD_HEADER.unpack(log_file.read(RECORD_HEADER.size))
+            end_position = last_position + RECORD_HEADER.size + length
+
+        if os.path.getsize(log_path) > end_position:
+            # Record written but never indexed: it was never visible, drop it
+            os.truncate(log_path, end_position)
+        return end_position
+
+    # --- Writer ---
+
+    def append(self, payloads, fsync=False):
+        """
+        Appends a batch of payloads (bytes) and returns their offsets.
+        With `fsync`, the segment is flushed to disk before returning.
+        """
+        if isinstance(payloads, bytes):
+            payloads = [payloads]
+        if not payloads:
+            return []
+
+        with self._locked("write.lock"):
+            bases = self._segment_bases()
+            if not bases:
+                base_offset = 0
+                self._create_segment(base_offset)
+            else:
+                base_offset = bases[-1]
+
+            log_path, index_path = self._paths(base_offset)
+            position = self._recover_tail(log_path, index_path)
+            next_offset = base_offset + self._record_count(base_offset)
+
+            if position >= self.segment_bytes:
+                # The closed segment is immutable from here on: make it durable once
+                self._fsync_segment(base_offset)
+                base_offset = next_offset
+                self._create_segment(base_offset)
+                log_path, index_path = self._paths(base_offset)
+                position = 0
+
+            records = []
+            index_entries = []
+            for payload in payloads:
+                records.append(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                records.append(payload)
+                index_entries.append(INDEX_ENTRY.pack(position))
+                position += RECORD_HEADER.size + len(payload)
+
+            # The record data goes first, so an indexed record is always complete
+            with open(log_path, 'ab') as log_file:
+                log_file.write(b"".join(records))
+                if fsync:
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+            with open(index_path, 'ab') as index_file:
+                index_file.write(b"".join(index_entries))
+                if fsync:
+                    index_file.flush()
+                    os.fsync(index_file.fileno())
+
+        return list(range(next_offset, next_offset + len(payloads)))
+
+    def _create_segment(self, base_offset):
+        """
+        Creates an empty segment. The index goes first: a segment is only listed
+        once its log exists, so it never lacks an index before records go in.
+        """
+        log_path, index_path = self._paths(base_offset)
+        open(index_path, 'ab').close()
+        open(log_path, 'ab').close()
+
+    def _fsync_segment(self, base_offset):
+        for path in self._paths(base_offset):
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+
+    def sync(self):
+        """
+        Flushes the newest segment to disk (appends made without `fsync`).
+        """
+        with self._locked("write.lock"):
+            bases = self._segment_bases()
+            if bases:
+                self._fsync_segment(bases[-1])
+
+    def end_offset(self):
+        """
+        Returns the offset the next appended record will get.
+        """
+        bases = self._segment_bases()
+        return bases[-1] + self._record_count(bases[-1]) if bases else 0
+
+    # --- Readers ---
+
+    def _mapped(self, base_offset, min_size):
+        """
+        Returns an mmap of a segment covering at least `min_size` bytes, remapping if it grew.
+        """
+        cached = self._maps.get(base_offset)
+        if cached is not None and cached[1] >= min_size:
+            return cached[0]
+        if cached is not None:
+            cached[0].close()
+
+        log_path = self._paths(base_offset)[0]
+        with open(log_path, 'rb') as log_file:
+            size = os.fstat(log_file.fileno()).st_size
+            mapped = mmap.mmap(log_file.fileno(), size, access=mmap.ACCESS_READ)
+        self._maps[base_offset] = (mapped, size)
+        return mapped
+
+    def read(self, offset, max_records):
+        """
+        Reads up to `max_records` records starting at `offset`.
+        Returns a list of (offset, payload). Offsets already deleted by retention
+        are skipped. A corrupted record (CRC mismatch or truncated) is returned
+        as (offset, None), so consumers can skip it and commit past it.
+        """
+        bases = self._segment_bases()
+        if not bases:
+            return []
+        offset = max(offset, bases[0])
+
+        records = []
+        segment_index = bisect.bisect_right(bases, offset) - 1
+        while segment_index < len(bases) and len(records) < max_records:
+            base_offset = bases[segment_index]
+            count = self._record_count(base_offset) - (offset - base_offset)
+            wanted = min(count, max_records - len(records))
+            if wanted <= 0:
+                segment_index += 1
+                if segment_index < len(bases):
+                    offset = bases[segment_index]
+                continue
+
+            log_path, index_path = self._paths(base_offset)
+            with open(index_path, 'rb') as index_file:
+                index_file.seek((offset - base_offset) * INDEX_ENTRY.size)
+                index_data = index_file.read(wanted * INDEX_ENTRY.size)
+            positions = [entry[0] for entry in INDEX_ENTRY.iter_unpack(index_data)]
+
+            # The last record's header tells how far the map has to reach
+            last_position = positions[-1]
+            with open(log_path, 'rb') as log_file:
+                log_file.seek(last_position)
+                header = log_file.read(RECORD_HEADER.size)
+            last_length = RECORD_HEADER.unpack(header)[0] if len(header) == RECORD_HEADER.size else 0
+            mapped = self._mapped(base_offset, last_position + RECORD_HEADER.size + last_length)
+
+            for position in positions:
+                payload = None
+                if position + RECORD_HEADER.size <= len(mapped):
+                    length, checksum = RECORD_HEADER.unpack_from(mapped, position)
+                    start = position + RECORD_HEADER.size
+                    payload = mapped[start:start + length]
+                    if len(payload) != length or zlib.crc32(payload) != checksum:
+                        payload = None
+                if payload is None:
+                    print(f"Error: Corrupted record at offset {offset} in topic {self.topic}.")
+                records.append((offset, payload))
+                offset += 1
+
+        return records
+
+    def close(self):
+        """
+        Releases the reader's memory maps.
+        """
+        for mapped, size in self._maps.values():
+            mapped.close()
+        self._maps = {}
+
+    # --- Consumer groups ---
+
+    def committed_offset(self, group):
+        """
+        Returns the next offset to read for a consumer group (0 for a new group).
+        """
+        try:
+            with open(os.path.join(self.topic_dir, CONSUMERS_DIR, f"{group}.offset"), 'r') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def commit(self, group, next_offset):
+        """
+        Atomically records `next_offset` as the consumer group's position.
+        """
+        offset_path = os.path.join(self.topic_dir, CONSUMERS_DIR, f"{group}.offset")
+        temp_path = f"{offset_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(str(next_offset))
+        os.replace(temp_path, offset_path)
+
+    def read_group(self, group, max_records):
+        """
+        Reads up to `max_records` records from the consumer group's committed position.
+        """
+        return self.read(self.committed_offset(group), max_records)
+
+    def group_lock(self, group, blocking=True):
+        """
+        Serializes read-process-commit cycles of the workers sharing a consumer group,
+        so no record is handed to two workers. Yields False if `blocking` is False
+        and another worker holds the lock.
+        """
+        return self._locked(f"{group}.lock", blocking)
+
+    def delete_consumed_segments(self):
+        """
+        Deletes segments (except the newest) that every consumer group has read past.
+        Returns the number of segments deleted.
+        """
+        groups = [
+            name[:-len(".offset")] for name in os.listdir(os.path.join(self.topic_dir, CONSUMERS_DIR))
+            if name.endswith(".offset")
+        ]
+        if not groups:
+            return 0
+        low_watermark = min(self.committed_offset(group) for group in groups)
+
+        deleted_count = 0
+        with self._locked("write.lock"):
+            bases = self._segment_bases()
+            for base_offset, next_base in zip(bases, bases[1:]):
+                if next_base > low_watermark:
+                    break
+                cached = self._maps.pop(base_offset, None)
+                if cached is not None:
+                    cached[0].close()
+                for path in self._paths(base_offset):
+                    os.remove(path)
+                deleted_count += 1
+        return deleted_count
+
+    def delete_segments_over(self, max_bytes):
+        """
+        Size-based retention for topics without consumer groups (e.g. dead-letter
+        topics): deletes the oldest segments (except the newest) while the
+        topic's segments exceed `max_bytes`.
+        Returns the number of segments deleted.
+        """
+        deleted_count = 0
+        with self._locked("write.lock"):
+            bases = self._segment_bases()
+            total_bytes = sum(os.path.getsize(path) for base_offset in bases for path in self._paths(base_offset))
+            for base_offset in bases[:-1]:
+                if total_bytes <= max_bytes:
+                    break
+                cached = self._maps.pop(base_offset, None)
+                if cached is not None:
+                    cached[0].close()
+                for path in self._paths(base_offset):
+                    total_bytes -= os.path.getsize(path)
+                    os.remove(path)
+                deleted_count += 1
+        return deleted_count
@@ -0,0 +1,374 @@
+import os
+import re
+import zlib
+from functools import lru_cache
+
+# RT-002: In-process Markdown to PDF renderer for the Reporting Team (RT-001).
+#
+# Renders the Markdown subset FT-001 produces (headings, paragraphs, **bold**,
+# bullet lists, block quotes and pipe tables) with the PDF base-14 fonts, so
+# no font files are embedded and no external tool is needed. Font metrics and
+# the font objects are built once per process, and wrapped lines are cached
+# across documents. Every page is written to disk as soon as it is laid out;
+# the file is written under a temporary name and renamed when complete.
+
+# AT-011: Bump whenever the rendered output changes, so PDFs cached by older code are not reused
+RENDERER_VERSION = 1
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 54
+BODY_SIZE = 10.5
+HEADING_SIZES = {1: 18, 2: 14, 3: 12}
+LINE_SPACING = 1.35
+
+# Font resource name -> base-14 font
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold", "F3": "Courier"}
+REGULAR, BOLD = "F1", "F2"
+
+# FT-001 status icons are drawn as filled circles (RGB)
+ICON_COLORS = {"🔴": (0.85, 0.16, 0.16), "🟡": (0.93, 0.73, 0.0), "🟢": (0.18, 0.65, 0.25)}
+
+# Glyph widths (1/1000 em) of the printable ASCII range, from the Adobe AFM files
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+)
+
+def _width_table(ascii_widths, default):
+    widths = [default] * 256
+    widths[32:127] = ascii_widths
+    return widths
+
+_WIDTHS = {
+    "F1": _width_table(_HELVETICA_WIDTHS, 556),
+    "F2": _width_table(_HELVETICA_BOLD_WIDTHS, 611),
+    "F3": [600] * 256
+}
+
+def _encode(text):
+    return text.encode("cp1252", errors="replace")
+
+def text_width(text, font, size):
+    """
+    Returns the width of `text` in points.
+    """
+    if text in ICON_COLORS:
+        return size * 0.8
+    widths = _WIDTHS[font]
+    return sum(widths[byte] for byte in _encode(text)) * size / 1000
+
+def _escape(data):
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+# --- Layout ---
+
+_ICON_PATTERN = "|".join(ICON_COLORS)
+_INLINE_PATTERN = re.compile(rf"(\*\*.+?\*\*|{_ICON_PATTERN})")
+
+def _runs(text, font=REGULAR):
+    """
+    Splits inline Markdown into (text, font) runs: **bold** spans and status icons.
+    """
+    runs = []
+    for part in _INLINE_PATTERN.split(text):
+        if not part:
+            continue
+        if part.startswith("**") and part.endswith("**") and len(part) > 4:
+            runs.append((part[2:-2], BOLD))
+        else:
+            runs.append((part, font))
+    return runs
+
+@lru_cache(maxsize=4096)
+def wrap(text, font, size, max_width):
+    """
+    Lays out one line of inline Markdown into lines of (x_offset, text, font) runs
+    no wider than `max_width`. Cached, since summaries repeat most of their text.
+    """
+    words = []
+    for run_text, run_font in _runs(text, font):
+        for word in re.split(r"(\s+)", run_text):
+            if word:
+                words.append((word, run_font))
+
+    lines = [[]]
+    x = 0.0
+    space = False
+    for word, word_font in words:
+        if word.isspace():
+            space = bool(lines[-1])
+            continue
+        space_width = text_width(" ", word_font, size) if space else 0.0
+        width = text_width(word, word_font, size)
+        if lines[-1] and x + space_width + width > max_width:
+            lines.append([])
+            x = space_width = 0.0
+        line = lines[-1]
+        if line and line[-1][2] == word_font and word not in ICON_COLORS and line[-1][1] not in ICON_COLORS:
+            # Same font: extend the previous run, so a line is drawn with as few text operators as possible
+            offset, text, font = line[-1]
+            line[-1] = (offset, text + (" " if space_width else "") + word, font)
+        else:
+            line.append((x + space_width, word, word_font))
+        x += space_width + width
+        space = False
+    return tuple(tuple(line) for line in lines)
+
+def _is_table_separator(line):
+    return bool(re.fullmatch(r"\|?(\s*:?-+:?\s*\|)+\s*:?-*:?\s*", line))
+
+def _table_cells(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+class _PageBuilder:
+    """
+    Accumulates the drawing operators of the current page and hands full pages to `emit`.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height):
+        if self.y - height < MARGIN and self.ops:
+            self.flush()
+
+    def flush(self):
+        if self.ops:
+            self.emit("\n".join(self.ops).encode("latin-1"))
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text_line(self, runs, x, size):
+        self.ensure(size * LINE_SPACING)
+        self.y -= size * LINE_SPACING
+        for offset, text, font in runs:
+            if text in ICON_COLORS:
+                self.circle(x + offset + size * 0.4, self.y + size * 0.33, size * 0.35, ICON_COLORS[text])
+                continue
+            self.ops.append(f"BT /{font} {size} Tf {x + offset:.2f} {self.y:.2f} Td ({_escape(_encode(text)).decode('latin-1')}) Tj ET")
+
+    def circle(self, cx, cy, r, color):
+        k = 0.5523 * r
+        self.ops.append(
+            f"q {color[0]} {color[1]} {color[2]} rg {cx + r:.2f} {cy:.2f} m "
+            f"{cx + r:.2f} {cy + k:.2f} {cx + k:.2f} {cy + r:.2f} {cx:.2f} {cy + r:.2f} c "
+            f"{cx - k:.2f} {cy + r:.2f} {cx - r:.2f} {cy + k:.2f} {cx - r:.2f} {cy:.2f} c "
+            f"{cx - r:.2f} {cy - k:.2f} {cx - k:.2f} {cy - r:.2f} {cx:.2f} {cy - r:.2f} c "
+            f"{cx + k:.2f} {cy - r:.2f} {cx + r:.2f} {cy - k:.2f} {cx + r:.2f} {cy:.2f} c f Q"
+        )
+
+    def rule(self, x1, y1, x2, y2, gray=0.6):
+        self.ops.append(f"q {gray} G 0.75 w {x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S Q")
+
+    def gap(self, height):
+        self.y -= height
+
+def _layout_paragraph(page, text, font=REGULAR, size=BODY_SIZE, indent=0.0):
+    for line in wrap(text, font, size, PAGE_WIDTH - 2 * MARGIN - indent):
+        page.text_line(line, MARGIN + indent, size)
+
+def _layout_table(page, rows):
+    """
+    Lays out a pipe table: column widths follow the widest cell, scaled down to the page width.
+    Cells that still do not fit are truncated.
+    """
+    column_count = max(len(row) for row in rows)
+    rows = [row + [""] * (column_count - len(row)) for row in rows]
+    padding = 6.0
+    fonts = [BOLD] + [REGULAR] * (len(rows) - 1)
+    widths = [
+        max(text_width(row[column].replace("**", ""), font, BODY_SIZE) for row, font in zip(rows, fonts)) + 2 * padding
+        for column in range(column_count)
+    ]
+    available = PAGE_WIDTH - 2 * MARGIN
+    scale = min(1.0, available / sum(widths))
+    widths = [width * scale for width in widths]
+
+    for index, (row, font) in enumerate(zip(rows, fonts)):
+        x = MARGIN
+        line_runs = []
+        for cell, width in zip(row, widths):
+            cell_lines = wrap(cell, font, BODY_SIZE, 1e9)
+            cell_runs = [run for run in cell_lines[0] if run[0] + text_width(run[1], run[2], BODY_SIZE) <= width - 2 * padding + 0.01] if cell_lines else []
+            line_runs.extend((x - MARGIN + padding + offset, text, font) for offset, text, font in cell_runs)
+            x += width
+        page.text_line(line_runs, MARGIN, BODY_SIZE)
+        if index == 0:
+            page.rule(MARGIN, page.y - 3, MARGIN + sum(widths), page.y - 3)
+    page.gap(BODY_SIZE * 0.5)
+
+def layout_markdown(markdown_text, emit):
+    """
+    RT-002: Lays out a Markdown document, calling `emit(content_stream)` once per finished page.
+    Returns the number of pages.
+    """
+    page_count = [0]
+    def emit_page(content):
+        page_count[0] += 1
+        emit(content)
+
+    page = _PageBuilder(emit_page)
+    lines = markdown_text.splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index].rstrip()
+        stripped = line.strip()
+        if not stripped:
+            page.gap(BODY_SIZE * 0.5)
+            index += 1
+            continue
+
+        heading = re.match(r"(#{1,3})\s+(.*)", stripped)
+        if heading:
+            size = HEADING_SIZES[len(heading.group(1))]
+            page.ensure(size * LINE_SPACING * 3)
+            page.gap(size * 0.3)
+            _layout_paragraph(page, heading.group(2), BOLD, size)
+            if len(heading.group(1)) == 1:
+                page.rule(MARGIN, page.y - 4, PAGE_WIDTH - MARGIN, page.y - 4)
+                page.gap(6)
+            index += 1
+            continue
+
+        if stripped.startswith("|"):
+            rows = []
+            while index < len(lines) and lines[index].strip().startswith("|"):
+                if not _is_table_separator(lines[index].strip()):
+                    rows.append(_table_cells(lines[index]))
+                index += 1
+            _layout_table(page, rows)
+            continue
+
+        if stripped.startswith(">"):
+            top = page.y
+            _layout_paragraph(page, stripped.lstrip("> ").strip(), indent=14)
+            page.rule(MARGIN + 4, top - 2, MARGIN + 4, page.y - 2, gray=0.75)
+            index += 1
+            continue
+
+        bullet = re.match(r"[-*]\s+(.*)", stripped)
+        if bullet:
+            lines_out = wrap(bullet.group(1), REGULAR, BODY_SIZE, PAGE_WIDTH - 2 * MARGIN - 14)
+            for number, line_runs in enumerate(lines_out):
+                page.text_line(((-12.0, "•", REGULAR),) + line_runs if number == 0 else line_runs, MARGIN + 14, BODY_SIZE)
+            index += 1
+            continue
+
+        _layout_paragraph(page, stripped)
+        index += 1
+
+    page.flush()
+    if not page_count[0]:
+        # An empty document still needs one (blank) page
+        emit_page(b"")
+    return page_count[0]
+
+# --- PDF file ---
+
+@lru_cache(maxsize=1)
+def _font_objects():
+    """
+    The font dictionaries, built once per process.
+    """
+    return tuple(
+        (name, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>".encode("ascii"))
+        for name, base_font in FONTS.items()
+    )
+
+class PdfWriter:
+    """
+    RT-002: Streams a PDF to disk one page at a time.
+    Objects 1 (catalog) and 2 (page tree) are written last, once every page is known.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._temp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._temp_path, 'wb')
+        self._offsets = {}
+        self._next_id = 3
+        self._page_ids = []
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        font_refs = []
+        for name, font_object in _font_objects():
+            font_refs.append(f"/{name} {self._write_object(font_object)} 0 R")
+        self._resources = f"<< /Font << {' '.join(font_refs)} >> >>"
+
+    def _write_object(self, body, object_id=None):
+        if object_id is None:
+            object_id = self._next_id
+            self._next_id += 1
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        return object_id
+
+    def add_page(self, content):
+        stream = zlib.compress(content)
+        content_id = self._write_object(
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + stream + b"\nendstream"
+        )
+        page_id = self._write_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources {self._resources} /Contents {content_id} 0 R >>".encode("ascii")
+        )
+        self._page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"), 2)
+        self._write_object(b"<< /Type /Catalog /Pages 2 0 R >>", 1)
+
+        xref_offset = self._file.tell()
+        entries = [b"0000000000 65535 f \n"] + [f"{self._offsets[object_id]:010d} 00000 n \n".encode("ascii") for object_id in range(1, self._next_id)]
+        self._file.write(f"xref\n0 {self._next_id}\n".encode("ascii") + b"".join(entries))
+        self._file.write(f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._temp_path)
+
+def render_markdown_to_pdf(markdown_text, pdf_path):
+    """
+    RT-002: Renders Markdown text to a PDF file. Returns the number of pages.
+    """
+    writer = PdfWriter(pdf_path)
+    try:
+        page_count = layout_markdown(markdown_text, writer.add_page)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return page_count
+
+def render_markdown_files(jobs):
+    """
+    RT-002: Renders many (markdown_path, pdf_path) pairs in one call, sharing the
+    font and layout caches. A failed job does not stop the others.
+    Returns a list with the page count, or the exception, of each job.
+    """
+    results = []
+    for markdown_path, pdf_path in jobs:
+        try:
+            with open(markdown_path, 'r', encoding='utf-8') as f:
+                results.append(render_markdown_to_pdf(f.read(), pdf_path))
+        except (OSError, ValueError) as e:
+            results.append(e)
+    return results
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from scripts.load_env import load_env
+import scripts.dt_001_resource_reporter as dt001
+import src.ct_002_data_processor as ct002
+import src.ft_001_summary_generator as ft001
+import src.rt_001_pdf_generator as rt001
+
+# AT-008: In-process pipeline runner for DT-001 -> CT-002 -> FT-001 -> RT-001.
+#
+# All four stages run as coroutines in one event loop and hand their results
+# to the next stage through bounded asyncio queues. A full queue suspends the
+# stage that feeds it (backpressure), so a slow stage throttles sampling
+# instead of letting work pile up in memory. The file artifacts the stages
+# normally exchange (CT_OUTPUT_FILE, FT_OUTPUT_FILE, the PDF and the health
+# check) are only written when requested.
+
+# Passed down the queues to stop each stage after the work queued before it
+_END_OF_STREAM = object()
+
+class PipelineStats:
+    """
+    AT-008: Counters and end-to-end latency (sample taken -> summary generated) of a pipeline run.
+    """
+
+    def __init__(self):
+        self.reports_sampled = 0
+        self.reports_rejected = 0
+        self.summaries_generated = 0
+        self.stage_errors = 0
+        self.latencies_ms = []
+
+    def as_dict(self):
+        latencies = sorted(self.latencies_ms)
+        return {
+            "reports_sampled": self.reports_sampled,
+            "reports_rejected": self.reports_rejected,
+            "summaries_generated": self.summaries_generated,
+            "stage_errors": self.stage_errors,
+            "latency_ms_mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "latency_ms_max": round(latencies[-1], 3) if latencies else None
+        }
+
+async def _sample_stage(output_queue, stop_event, stats, sample_interval, max_reports):
+    """
+    DT-001 stage: collects a report every `sample_interval` seconds.
+    Collection reads /proc and runs in the default executor so it never stalls the loop.
+    """
+    loop = asyncio.get_running_loop()
+    next_sample_at = loop.time()
+    try:
+        while not stop_event.is_set() and (not max_reports or stats.reports_sampled < max_reports):
+            report = await loop.run_in_executor(None, dt001.generate_report)
+            stats.reports_sampled += 1
+            await output_queue.put((time.perf_counter(), report))
+
+            next_sample_at += sample_interval
+            delay = next_sample_at - loop.time()
+            if delay < 0:
+                # Behind schedule (e.g. held back by backpressure): don't burst to catch up
+                next_sample_at = loop.time()
+                continue
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await output_queue.put(_END_OF_STREAM)
+
+async def _process_stage(input_queue, output_queue, stats, write_artifacts):
+    """
+    CT-002 stage: validates a report and derives the actionable insight.
+    """
+    while True:
+        item = await input_queue.get()
+        if item is _END_OF_STREAM:
+            await output_queue.put(_END_OF_STREAM)
+            return
+        sampled_at, report = item
+        try:
+            result = ct002.process_resource_report(report)
+        except Exception as e:
+            print(f"Architecture (AT-008) Pipeline: CT-002 stage error: {e}")
+            stats.stage_errors += 1
+            continue
+        if "error" in result:
+            print(f"Architecture (AT-008) Pipeline: CT-002 rejected report: {result['error']}")
+            stats.reports_rejected += 1
+            continue
+        if write_artifacts:
+            ct002.write_processing_output(result)
+            ct002.update_health_check(result)
+        await output_queue.put((sampled_at, result))
+
+async def _summary_stage(input_queue, output_queue, stats):
+    """
+    FT-001 stage: renders the executive summary of a processed report.
+    """
+    while True:
+        item = await input_queue.get()
+        if item is _END_OF_STREAM:
+            await output_queue.put(_END_OF_STREAM)
+            return
+        sampled_at, result = item
+        try:
+            summary_report = ft001.generate_executive_summary(result)
+        except Exception as e:
+            print(f"Architecture (AT-008) Pipeline: FT-001 stage error: {e}")
+            stats.stage_errors += 1
+            continue
+        stats.summaries_generated += 1
+        stats.latencies_ms.append((time.perf_counter() - sampled_at) * 1000)
+        await output_queue.put((sampled_at, summary_report))
+
+async def _report_stage(input_queue, stats, write_artifacts):
+    """
+    RT-001 stage: writes the summary to FT_OUTPUT_FILE and converts it to PDF.
+    The conversion runs an external tool, so it runs in the default executor.
+    FT-003: Unchanged summaries are neither rewritten nor converted again.
+    Without artifacts the stage only drains the queue.
+    """
+    loop = asyncio.get_running_loop()
+    output_file = os.environ.get("FT_OUTPUT_FILE")
+    while True:
+        item = await input_queue.get()
+        if item is _END_OF_STREAM:
+            return
+        if not write_artifacts:
+            continue
+        sampled_at, summary_report = item
+        if not output_file:
+            print("Error: FT_OUTPUT_FILE environment variable not set. Cannot write the summary.")
+            continue
+        try:
+            if ft001.write_summary(summary_report, output_file):
+                await loop.run_in_executor(None, rt001.generate_pdf_report)
+        except Exception as e:
+            print(f"Architecture (AT-008) Pipeline: RT-001 stage error: {e}")
+            stats.stage_errors += 1
+
+async def run_pipeline_async(max_reports=None, sample_interval=None, queue_size=None, write_artifacts=None, stop_event=None):
+    """
+    AT-008: Runs the four stages until `max_reports` reports were sampled
+    (PIPELINE_MAX_REPORTS, 0 = unlimited) or `stop_event` is set, then lets the
+    reports already queued finish. Queues hold at most `queue_size` items
+    (PIPELINE_QUEUE_SIZE, default 16). Reports are sampled every
+    `sample_interval` seconds (PIPELINE_SAMPLE_INTERVAL_SECONDS, default 1).
+    File artifacts are written if `write_artifacts` (PIPELINE_WRITE_ARTIFACTS=1).
+    Returns the run's PipelineStats.
+    """
+    if max_reports is None:
+        max_reports = int(os.environ.get("PIPELINE_MAX_REPORTS", "0"))
+    if sample_interval is None:
+        sample_interval = float(os.environ.get("PIPELINE_SAMPLE_INTERVAL_SECONDS", "1"))
+    if queue_size is None:
+        queue_size = int(os.environ.get("PIPELINE_QUEUE_SIZE", "16"))
+    if write_artifacts is None:
+        write_artifacts = os.environ.get("PIPELINE_WRITE_ARTIFACTS", "0") == "1"
+    if stop_event is None:
+        stop_event = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop_event.set)
+
+    stats = PipelineStats()
+    reports = asyncio.Queue(maxsize=queue_size)
+    results = asyncio.Queue(maxsize=queue_size)
+    summaries = asyncio.Queue(maxsize=queue_size)
+
+    print(f"Architecture (AT-008) Pipeline: Starting DT-001 -> CT-002 -> FT-001 -> RT-001 (artifacts {'on' if write_artifacts else 'off'}).")
+    try:
+        await asyncio.gather(
+            _sample_stage(reports, stop_event, stats, sample_interval, max_reports),
+            _process_stage(reports, results, stats, write_artifacts),
+            _summary_stage(results, summaries, stats),
+            _report_stage(summaries, stats, write_artifacts)
+        )
+    finally:
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+
+    print(f"Architecture (AT-008) Pipeline: Stopped. {json.dumps(stats.as_dict())}")
+    return stats
+
+def run_pipeline():
+    """
+    AT-008: Entry point of the in-process pipeline runner.
+    """
+    load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
+    return asyncio.run(run_pipeline_async())
+
+if __name__ == "__main__":
+    run_pipeline()
@@ -0,0 +1,213 @@
+from collections import namedtuple
+
+# AT-010: Versioned schema of the DT-001 -> CT-002 report artifact (docs/artifact_contract.md).
+#
+# The schema is declared once, as nested nodes, and imported by both the
+# publisher (DT-003 validate_metrics) and the consumer (CT-002
+# process_resource_report). Each node is compiled once into a plain closure;
+# a compiled validator walks a report a single time and collects every
+# violation instead of stopping at the first. Objects are open: keys the
+# schema does not name are allowed, so producers can add fields without
+# breaking older consumers. For the same reason a report declaring a newer
+# schema_version than SCHEMA_VERSION is accepted as long as the fields this
+# version knows are valid: a version bump must only add keys, a change to an
+# existing key needs a new key name.
+#
+# Version history:
+#   1  original disk-only contract (size_gb, used_gb, available_gb, usage_percent)
+#   2  DT-002 system metrics (disk_/cpu_/mem_ prefixed keys), DT-006 filesystems,
+#      per-core CPU and disk I/O, CR-009 host
+
+SCHEMA_VERSION = 2
+
+REQUIRED_KEYS = ("team_id", "resource_type", "metrics")
+REQUIRED_METRICS = ("disk_usage_percent", "cpu_usage_percent", "mem_usage_percent")
+# Sanity checks only the publisher can make: it always knows the resource sizes
+PUBLISHER_REQUIRED_METRICS = ("disk_size_gb", "mem_total_mb")
+
+class Violation(namedtuple("Violation", ("path", "reason"))):
+    """
+    AT-010: One schema violation, e.g. 'report.metrics.cpu_usage_percent: must be <= 100 (got 120)'.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.path}: {self.reason}"
+
+# --- Schema nodes ---
+
+def number(minimum=None, maximum=None, exclusive_minimum=None, integer=False):
+    return {"type": "number", "minimum": minimum, "maximum": maximum, "exclusive_minimum": exclusive_minimum, "integer": integer}
+
+def string():
+    return {"type": "string"}
+
+def array(items):
+    return {"type": "array", "items": items}
+
+def mapping(values):
+    """
+    An object with arbitrary keys (e.g. mount points) whose values all share one schema.
+    """
+    return {"type": "mapping", "values": values}
+
+def obj(fields, required=()):
+    return {"type": "object", "fields": fields, "required": tuple(required)}
+
+def percent():
+    return number(minimum=0, maximum=100)
+
+def metrics_schema(required=REQUIRED_METRICS):
+    return obj({
+        "disk_filesystem": string(),
+        "disk_size_gb": number(exclusive_minimum=0),
+        "disk_used_gb": number(minimum=0),
+        "disk_available_gb": number(minimum=0),
+        "disk_usage_percent": percent(),
+        "cpu_usage_percent": percent(),
+        "cpu_per_core_percent": array(percent()),
+        "mem_total_mb": number(exclusive_minimum=0),
+        "mem_used_mb": number(minimum=0),
+        "mem_usage_percent": percent(),
+        "filesystems": mapping(obj({
+            "device": string(),
+            "size_gb": number(minimum=0),
+            "used_gb": number(minimum=0),
+            "available_gb": number(minimum=0),
+            "usage_percent": percent()
+        }, required=("usage_percent",))),
+        "disk_io": mapping(mapping(number(minimum=0)))
+    }, required=required)
+
+def report_schema():
+    return obj({
+        "schema_version": number(minimum=1, integer=True),
+        "timestamp": string(),
+        "team_id": string(),
+        "resource_type": string(),
+        "host": string(),
+        "metrics": metrics_schema()
+    }, required=REQUIRED_KEYS)
+
+# --- Compiler ---
+
+# A path is built as (parent, key) pairs and only formatted when a violation is reported
+def _format_path(path):
+    keys = []
+    while path:
+        path, key = path
+        keys.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "report" + "".join(reversed(keys)) if keys else "report"
+
+def _type_name(value):
+    return type(value).__name__
+
+def _compile(node):
+    kind = node["type"]
+
+    if kind == "number":
+        expected = (int,) if node["integer"] else (int, float)
+        expected_name = "an integer" if node["integer"] else "a number"
+        bounds = []
+        if node["minimum"] is not None:
+            minimum = node["minimum"]
+            bounds.append((lambda value: value >= minimum, f"must be >= {minimum}"))
+        if node["exclusive_minimum"] is not None:
+            exclusive_minimum = node["exclusive_minimum"]
+            bounds.append((lambda value: value > exclusive_minimum, f"must be > {exclusive_minimum}"))
+        if node["maximum"] is not None:
+            maximum = node["maximum"]
+            bounds.append((lambda value: value <= maximum, f"must be <= {maximum}"))
+
+        def check(value, path, violations):
+            if not isinstance(value, expected) or isinstance(value, bool):
+                violations.append(Violation(_format_path(path), f"expected {expected_name}, got {_type_name(value)}"))
+                return
+            for within, reason in bounds:
+                # NaN fails every comparison, so it is reported as out of range
+                if not within(value):
+                    violations.append(Violation(_format_path(path), f"{reason} (got {value})"))
+        return check
+
+    if kind == "string":
+        def check(value, path, violations):
+            if not isinstance(value, str):
+                violations.append(Violation(_format_path(path), f"expected a string, got {_type_name(value)}"))
+        return check
+
+    if kind == "array":
+        check_item = _compile(node["items"])
+        def check(value, path, violations):
+            if not isinstance(value, list):
+                violations.append(Violation(_format_path(path), f"expected a list, got {_type_name(value)}"))
+                return
+            for index, item in enumerate(value):
+                check_item(item, (path, index), violations)
+        return check
+
+    if kind == "mapping":
+        check_value = _compile(node["values"])
+        def check(value, path, violations):
+            if not isinstance(value, dict):
+                violations.append(Violation(_format_path(path), f"expected an object, got {_type_name(value)}"))
+                return
+            for key, item in value.items():
+                check_value(item, (path, key), violations)
+        return check
+
+    if kind == "object":
+        fields = tuple((key, _compile(child)) for key, child in node["fields"].items())
+        required = node["required"]
+        def check(value, path, violations):
+            if not isinstance(value, dict):
+                violations.append(Violation(_format_path(path), f"expected an object, got {_type_name(value)}"))
+                return
+            for key in required:
+                if key not in value:
+                    violations.append(Violation(_format_path((path, key)), "is required"))
+            for key, check_field in fields:
+                if key in value:
+                    check_field(value[key], (path, key), violations)
+        return check
+
+    raise ValueError(f"Unknown schema node type '{kind}'.")
+
+class Validator:
+    """
+    AT-010: A schema compiled into a single-pass validator.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._check = _compile(schema)
+
+    def violations(self, value):
+        """
+        Returns every Violation of the schema in `value` (an empty list if it is valid).
+        """
+        violations = []
+        self._check(value, None, violations)
+        return violations
+
+REPORT_VALIDATOR = Validator(report_schema())
+PUBLISHER_METRICS_VALIDATOR = Validator(metrics_schema(REQUIRED_METRICS + PUBLISHER_REQUIRED_METRICS))
+
+def contract_error(report_data):
+    """
+    AT-010: Validates a report against the artifact contract.
+    Returns None if it is valid, otherwise CT-002's error message listing every violation.
+    """
+    violations = REPORT_VALIDATOR.violations(report_data)
+    if not violations:
+        return None
+
+    missing = {violation.path for violation in violations if violation.reason == "is required"}
+    metrics = report_data.get("metrics") if isinstance(report_data, dict) else None
+    if not isinstance(report_data, dict) or any(f"report.{key}" in missing for key in REQUIRED_KEYS):
+        error = "JSON structure is missing required top-level keys."
+    elif any(f"report.metrics.{key}" in missing for key in REQUIRED_METRICS):
+        error = f"JSON metrics object is missing required keys. Expected: {list(REQUIRED_METRICS)}. Found: {list(metrics.keys())}"
+    else:
+        error = f"JSON report violates artifact contract v{SCHEMA_VERSION}."
+    return f"{error} Violations: {'; '.join(str(violation) for violation in violations)}"
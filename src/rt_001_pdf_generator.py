@@ -1,45 +1,126 @@
 import os
+import subprocess
 import sys
-from datetime import datetime
 
 # Add the project root to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.load_env import load_env
+from src.artifact_cache import ArtifactCache, get_artifact_cache
+from src.pdf_render import RENDERER_VERSION, render_markdown_files
 
 # Load environment variables
 load_env(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
-def generate_pdf_report():
+# AT-011: Artifact cache stage of the PDFs
+PDF_STAGE = "rt001_pdf"
+# FT-003: Next to each PDF, the artifact cache key it was built from
+PDF_KEY_SUFFIX = ".key"
+
+def _read_built_key(pdf_output_path):
+    """
+    Returns the key the PDF at `pdf_output_path` was built from, or None if it is unknown.
+    """
+    try:
+        with open(pdf_output_path + PDF_KEY_SUFFIX, 'r') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _write_built_key(pdf_output_path, key):
+    with open(pdf_output_path + PDF_KEY_SUFFIX, 'w') as f:
+        f.write(key)
+
+def _convert_with_external_tool(markdown_input_path, pdf_output_path):
+    """
+    RT_PDF_ENGINE=manus-md-to-pdf: Converts with the external utility, without a shell.
+    Returns True if the tool succeeded and created the PDF.
+    """
+    # AT-011: The PDF may be a hard link into the artifact cache, which the tool must not write into
+    if os.path.exists(pdf_output_path):
+        os.remove(pdf_output_path)
+    completed = subprocess.run(["manus-md-to-pdf", markdown_input_path, pdf_output_path], capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"Error: manus-md-to-pdf exited with status {completed.returncode}: {completed.stderr.strip()}")
+        return False
+    return os.path.exists(pdf_output_path)
+
+def generate_pdf_reports(jobs):
+    """
+    RT-002: Converts many (markdown_path, pdf_path) pairs in one invocation with
+    the in-process renderer, which keeps its font and layout caches across them.
+    Returns the number of PDFs generated.
+    """
+    generated_count = 0
+    for (markdown_path, pdf_path), result in zip(jobs, render_markdown_files(jobs)):
+        if isinstance(result, Exception):
+            print(f"Error: Could not convert {markdown_path} to PDF: {result}")
+            continue
+        generated_count += 1
+        print(f"Reporting Team (RT-001) generated PDF report {pdf_path} ({result} pages).")
+    return generated_count
+
+def generate_pdf_report(markdown_input_path=None, pdf_output_path=None):
     """
     RT-001: Consumes the Features Team's Markdown summary and converts it to a PDF.
+    RT-002: Renders in-process by default (RT_PDF_ENGINE=builtin). The PDF goes
+    to RT_PDF_OUTPUT_FILE (default parallel_orchestration/executive_summary.pdf).
+    AT-011: A summary converted before is served from the artifact cache.
+    Returns True if the PDF is in place (generated, restored from the cache or
+    already up to date), False if it could not be generated.
     """
     # Input and Output paths from .env
-    markdown_input_path = os.environ.get("FT_OUTPUT_FILE")
-    pdf_output_path = "parallel_orchestration/executive_summary.pdf"
+    markdown_input_path = markdown_input_path or os.environ.get("FT_OUTPUT_FILE")
+    pdf_output_path = pdf_output_path or os.environ.get("RT_PDF_OUTPUT_FILE", "parallel_orchestration/executive_summary.pdf")
     
     if not markdown_input_path:
         print("Error: FT_OUTPUT_FILE environment variable not set.")
-        return
+        return False
 
     if not os.path.exists(markdown_input_path):
         print(f"Error: Features Team output file not found at {markdown_input_path}. Cannot generate PDF.")
-        return
+        return False
+
+    engine = os.environ.get("RT_PDF_ENGINE", "builtin")
+    with open(markdown_input_path, 'rb') as f:
+        key = ArtifactCache.key(PDF_STAGE, f"{engine}:{RENDERER_VERSION}", f.read())
+
+    # FT-003: A PDF built from the same summary, engine and renderer version is up to date
+    if os.path.exists(pdf_output_path) and _read_built_key(pdf_output_path) == key:
+        print(f"Reporting Team (RT-001) PDF report {pdf_output_path} is up to date.")
+        return True
+    if os.path.exists(pdf_output_path + PDF_KEY_SUFFIX):
+        os.remove(pdf_output_path + PDF_KEY_SUFFIX)
+
+    cache = get_artifact_cache()
+    if cache is not None and cache.materialize(key, pdf_output_path):
+        _write_built_key(pdf_output_path, key)
+        print(f"Reporting Team (RT-001) PDF report {pdf_output_path} restored from the artifact cache (AT-011).")
+        return True
 
     print(f"Reporting Team (RT-001) converting {markdown_input_path} to PDF...")
     
-    # Use the pre-installed utility to convert Markdown to PDF
     try:
-        command = f"manus-md-to-pdf {markdown_input_path} {pdf_output_path}"
-        # Execute the command using the shell tool
-        os.system(command)
-        
-        if os.path.exists(pdf_output_path):
-            print(f"Reporting Team (RT-001) successfully generated PDF report to {pdf_output_path}")
+        if engine == "manus-md-to-pdf":
+            generated = _convert_with_external_tool(markdown_input_path, pdf_output_path)
         else:
-            print(f"Error: PDF file was not created at {pdf_output_path}. Check manus-md-to-pdf utility.")
-            
+            generated = generate_pdf_reports([(markdown_input_path, pdf_output_path)]) == 1
     except Exception as e:
         print(f"CRITICAL ERROR during PDF generation: {e}")
+        return False
+        
+    if generated:
+        print(f"Reporting Team (RT-001) successfully generated PDF report to {pdf_output_path}")
+        _write_built_key(pdf_output_path, key)
+        if cache is not None:
+            with open(pdf_output_path, 'rb') as f:
+                cache.put(key, f.read(), PDF_STAGE)
+    else:
+        print(f"Error: PDF file was not created at {pdf_output_path}.")
+    return generated
 
 if __name__ == "__main__":
-    generate_pdf_report()
+    # RT-002: Markdown files given on the command line are converted in one run, next to their source
+    if len(sys.argv) > 1:
+        generate_pdf_reports([(path, os.path.splitext(path)[0] + ".pdf") for path in sys.argv[1:]])
+    else:
+        generate_pdf_report()
@@ -38,3 +38,36 @@ def setup_test_environment():
     
     # Teardown (optional cleanup after all tests)
     print("\n[TEARDOWN] Test run complete.")
+
+@pytest.fixture(autouse=True)
+def isolate_segment_log(tmp_path, monkeypatch):
+    """
+    Keeps segmented log topics written as a side effect (e.g. the CT-002 result
+    topic, FT-002) out of the working tree unless a test chooses a directory.
+    """
+    if not os.environ.get("MQ_SEGMENT_LOG_DIR"):
+        monkeypatch.setenv("MQ_SEGMENT_LOG_DIR", str(tmp_path / "mq_log"))
+
+@pytest.fixture(autouse=True)
+def isolate_artifact_cache(tmp_path, monkeypatch):
+    """
+    Gives every test an empty artifact cache (AT-011) outside the working tree.
+    """
+    monkeypatch.setenv("AT_ARTIFACT_CACHE_DIR", str(tmp_path / "artifact_cache"))
+
+@pytest.fixture(autouse=True)
+def isolate_file_system_mq(tmp_path_factory, monkeypatch):
+    """
+    Gives every test its own empty file system MQ topic (CR-001) and output
+    files, so no test depends on the caller's environment or leaves files
+    behind in the working tree. They live outside tmp_path, which tests use
+    as a directory of their own.
+    """
+    base_dir = tmp_path_factory.mktemp("file_system_mq")
+    topic_dir = base_dir / "mq" / os.environ.get("MQ_TOPIC_DISK_USAGE", "disk_usage")
+    (topic_dir / "new").mkdir(parents=True)
+    (topic_dir / "archive").mkdir()
+    monkeypatch.setenv("MQ_NEW_DIR", str(topic_dir / "new"))
+    monkeypatch.setenv("MQ_ARCHIVE_DIR", str(topic_dir / "archive"))
+    monkeypatch.setenv("CT_OUTPUT_FILE", str(base_dir / "code_team_ct002_report_mq.json"))
+    monkeypatch.setenv("AT_HEALTH_CHECK_FILE", str(base_dir / "health_check.json"))
@@ -0,0 +1,82 @@
+import pytest
+import json
+import os
+from datetime import datetime
+
+import src.ft_001_summary_generator as ft001
+import src.rt_001_pdf_generator as rt001
+from src.artifact_cache import ArtifactCache
+
+RESULT = {
+    "source_host": "web-1",
+    "source_timestamp": "2025-11-17T10:00:00",
+    "metrics_processed": {"disk_usage_percent": 91, "cpu_usage_percent": 10.0, "mem_usage_percent": 20.0},
+    "actionable_insight": "CRITICAL: disk at 91%",
+    "insight_severity": "CRITICAL",
+    "insight_severity_code": 2,
+    "insight_findings": [{"metric": "disk_usage_percent", "severity_code": 2}]
+}
+
+# --- Unit Tests for the Artifact Cache (AT-011) ---
+
+def test_cache_evicts_least_recently_used_artifacts(tmp_path):
+    """Tests content addressing, the on-disk index and LRU eviction past the size limit."""
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=10)
+    keys = [ArtifactCache.key("stage", "1", bytes([index])) for index in range(3)]
+    assert len(set(keys)) == 3
+    assert ArtifactCache.key("stage", "2", bytes([0])) != keys[0]
+
+    cache.put(keys[0], b"aaaa", "stage")
+    cache.put(keys[1], b"bbbb", "stage")
+    # Make key 1 the least recently used one
+    os.utime(cache.object_path(keys[1]), (1, 1))
+    assert cache.read(keys[0]) == b"aaaa"
+    cache.put(keys[2], b"cccc", "stage")
+
+    assert cache.get(keys[1]) is None
+    assert cache.read(keys[0]) == b"aaaa" and cache.read(keys[2]) == b"cccc"
+    with open(tmp_path / "cache" / "index.json") as f:
+        assert set(json.load(f)) == {keys[0], keys[2]}
+
+def test_summary_of_an_unchanged_result_is_not_rendered_again(tmp_path, monkeypatch):
+    """Tests that FT-001 serves the summary of a result it already summarized from the cache."""
+    input_file = tmp_path / "ct_output.json"
+    input_file.write_text(json.dumps(RESULT))
+    output_file = str(tmp_path / "summary.md")
+    rendered = []
+    render = ft001.generate_executive_summary
+    monkeypatch.setattr(ft001, "generate_executive_summary", lambda data: rendered.append(data) or render(data))
+
+    class FixedClock:
+        now_value = datetime(2026, 1, 1, 8, 0, 0)
+
+        @classmethod
+        def now(cls):
+            return cls.now_value
+    monkeypatch.setattr(ft001, "datetime", FixedClock)
+
+    assert ft001.summarize_output_file(str(input_file), output_file)
+    summary = open(output_file).read()
+    os.remove(output_file)
+    FixedClock.now_value = datetime(2026, 1, 1, 9, 0, 0)
+    assert ft001.summarize_output_file(str(input_file), output_file)
+
+    assert len(rendered) == 1
+    # The cached summary gets the time it was written again, not the time of the first render
+    assert "**Generated At:** 2026-01-01T08:00:00\n" in summary
+    assert open(output_file).read() == summary.replace("2026-01-01T08:00:00", "2026-01-01T09:00:00")
+    assert "**Overall Status:** **RED**" in summary
+
+def test_pdf_of_an_unchanged_summary_is_restored_from_the_cache(tmp_path, monkeypatch):
+    """Tests that RT-001 places the cached PDF instead of rendering an unchanged summary again."""
+    markdown_path = tmp_path / "summary.md"
+    markdown_path.write_text("# Executive Summary\n\nAll systems nominal.\n")
+    pdf_path = str(tmp_path / "summary.pdf")
+
+    assert rt001.generate_pdf_report(str(markdown_path), pdf_path)
+    pdf_data = open(pdf_path, 'rb').read()
+    os.remove(pdf_path)
+    monkeypatch.setattr(rt001, "generate_pdf_reports", lambda jobs: pytest.fail("unchanged summary was rendered again"))
+
+    assert rt001.generate_pdf_report(str(markdown_path), pdf_path)
+    assert open(pdf_path, 'rb').read() == pdf_data
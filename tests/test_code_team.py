@@ -108,3 +108,478 @@ def test_mq_listener_integration(setup_test_environment):
     
     # 4. Clean up the output file for the next test run
     os.remove(output_file)
+
+# --- Integration Test for Drain Mode (CR-004) ---
+
+MOCK_DT002_REPORT = {
+    "timestamp": "2025-11-17T10:00:00.000000",
+    "team_id": "Data Team",
+    "resource_type": "System Resources",
+    "metrics": {
+        "disk_usage_percent": 42,
+        "cpu_usage_percent": 12.5,
+        "mem_usage_percent": 30.0
+    }
+}
+
+def test_drain_file_system_queue(setup_test_environment):
+    """
+    Tests that the drain mode processes the whole backlog oldest first,
+    archives every message and writes the output of the newest one.
+    """
+    from src.ct_002_data_processor import drain_file_system_queue
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    output_file = os.environ.get("CT_OUTPUT_FILE")
+
+    file_names = [f"resource_report_2025111710000{i}.json" for i in range(5)]
+    for i, file_name in enumerate(file_names):
+        report = dict(MOCK_DT002_REPORT, timestamp=f"2025-11-17T10:00:0{i}")
+        with open(os.path.join(mq_new_dir, file_name), 'w') as f:
+            json.dump(report, f)
+    with open(os.path.join(mq_new_dir, "resource_report_20251117100010.json"), 'w') as f:
+        f.write("{not json")
+
+    outcome = drain_file_system_queue(batch_size=2)
+
+    assert outcome == (5, 6)
+    assert not [f for f in os.listdir(mq_new_dir) if f.endswith('.json')]
+    for file_name in file_names:
+        assert os.path.exists(os.path.join(mq_archive_dir, file_name))
+    assert os.path.exists(os.path.join(mq_archive_dir, "resource_report_20251117100010.json.corrupted"))
+
+    with open(output_file, 'r') as f:
+        output_data = json.load(f)
+    assert output_data["source_timestamp"] == "2025-11-17T10:00:04"
+
+def test_listener_daemon_stops_at_message_cap(setup_test_environment):
+    """
+    Tests that the listener daemon processes the backlog and stops at CT_MAX_MESSAGES.
+    """
+    from src.ct_002_data_processor import run_listener_daemon
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    output_file = os.environ.get("CT_OUTPUT_FILE")
+
+    file_names = [f"resource_report_2025111711000{i}.json" for i in range(3)]
+    for file_name in file_names:
+        with open(os.path.join(mq_new_dir, file_name), 'w') as f:
+            json.dump(MOCK_DT002_REPORT, f)
+
+    processed_count = run_listener_daemon(max_messages=2, max_runtime_seconds=5)
+
+    assert processed_count == 2
+    assert os.path.exists(os.path.join(mq_new_dir, file_names[2]))
+
+def test_listener_daemon_continues_past_an_all_invalid_batch(setup_test_environment, monkeypatch):
+    """
+    Tests that a capped poll whose claimed files are all invalid does not put the daemon to sleep.
+    """
+    import time
+    from src.ct_002_data_processor import run_listener_daemon
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    # An idle daemon would sleep past the runtime limit
+    monkeypatch.setenv("CT_MQ_WATCH", "0")
+    monkeypatch.setenv("CT_IDLE_BACKOFF_MIN_SECONDS", "10")
+    invalid_names = [f"resource_report_2025111712000{i}.json" for i in range(2)]
+    valid_names = [f"resource_report_2025111712001{i}.json" for i in range(2)]
+    for file_name in invalid_names:
+        with open(os.path.join(mq_new_dir, file_name), 'w') as f:
+            f.write("{not json")
+    for file_name in valid_names:
+        with open(os.path.join(mq_new_dir, file_name), 'w') as f:
+            json.dump(MOCK_DT002_REPORT, f)
+
+    started_at = time.monotonic()
+    processed_count = run_listener_daemon(max_messages=2, max_runtime_seconds=5)
+
+    assert processed_count == 2
+    assert time.monotonic() - started_at < 2
+    for file_name in valid_names:
+        assert os.path.exists(os.path.join(mq_archive_dir, file_name))
+
+def test_listener_daemon_wakes_on_inotify(setup_test_environment, monkeypatch):
+    """
+    Tests that an idle daemon picks up a published message immediately instead of after its poll backoff.
+    """
+    import threading
+    import time
+    from src import ct_002_data_processor as ct002
+    from scripts.dt_001_resource_reporter import publish_to_file_system
+
+    watcher = ct002.open_mq_watcher("FILE_SYSTEM")
+    if watcher is None:
+        pytest.skip("inotify is not available")
+    watcher.close()
+
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    # With polling alone the message would wait for the 5 second backoff
+    monkeypatch.setenv("CT_IDLE_BACKOFF_MIN_SECONDS", "5")
+    monkeypatch.setenv("MQ_TYPE", "FILE_SYSTEM")
+
+    results = []
+    listener = threading.Thread(target=lambda: results.append(ct002.run_listener_daemon(max_messages=1, max_runtime_seconds=10)))
+    listener.start()
+    time.sleep(0.3)
+
+    published_at = time.monotonic()
+    publish_to_file_system(MOCK_DT002_REPORT)
+    listener.join(timeout=10)
+
+    assert results == [1]
+    assert time.monotonic() - published_at < 2
+
+# --- Unit Test for Batched Redis Consumption (CR-006) ---
+
+class FakeStreamClient:
+    """
+    Minimal stand-in for the Redis client that records the commands it receives.
+    """
+    def __init__(self, entries, pending=None, deliveries=None):
+        self.entries = entries
+        self.pending = pending or []
+        self.deliveries = deliveries or {}
+        self.commands = []
+        self.acked = []
+        self.dead_lettered = []
+
+    def xgroup_create(self, *args, **kwargs):
+        self.commands.append("XGROUP")
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        self.commands.append("XREADGROUP")
+        batch, self.entries = self.entries[:count], self.entries[count:]
+        return [(list(streams)[0], batch)] if batch else []
+
+    def xack(self, stream, group, *message_ids):
+        self.commands.append("XACK")
+        self.acked.extend(message_ids)
+        return len(message_ids)
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        self.commands.append("XAUTOCLAIM")
+        return ["0-0", self.pending, []]
+
+    def xpending_range(self, stream, group, min, max, count, consumername=None):
+        self.commands.append("XPENDING")
+        # The whole pending entries list, not only the claimed entries
+        stream_order = lambda message_id: tuple(int(part) for part in message_id.split("-"))
+        in_range = sorted((message_id for message_id in self.deliveries
+                           if stream_order(min) <= stream_order(message_id) <= stream_order(max)), key=stream_order)
+        return [{"message_id": message_id, "times_delivered": self.deliveries[message_id]} for message_id in in_range[:count]]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    """
+    Queues commands and forwards them to the fake client on execute.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def xadd(self, stream, fields, **kwargs):
+        self.queued.append(lambda: self.client.dead_lettered.append((stream, fields)))
+
+    def xack(self, stream, group, *message_ids):
+        self.queued.append(lambda: self.client.acked.extend(message_ids))
+
+    def xpending_range(self, *args, **kwargs):
+        self.queued.append(lambda: self.client.xpending_range(*args, **kwargs))
+
+    def execute(self):
+        self.client.commands.append("PIPELINE")
+        return [command() for command in self.queued]
+
+def test_consume_batch_from_redis_round_trips(monkeypatch):
+    """
+    Tests that a batch costs one XREADGROUP and one XACK, and the group is created once.
+    """
+    import src.ct_002_data_processor as ct002
+
+    entries = [(f"1-{i}", {"data": json.dumps(MOCK_DT002_REPORT)}) for i in range(50)]
+    entries.append(("1-50", {"data": "{not json"}))
+    client = FakeStreamClient(entries)
+    monkeypatch.setattr(ct002, "REDIS_CLIENT", client, raising=False)
+    monkeypatch.setattr(ct002, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(ct002, "_READY_CONSUMER_GROUPS", set())
+    monkeypatch.setenv("REDIS_STREAM_NAME", "test_stream")
+
+    assert ct002.consume_batch_from_redis(batch_size=30) == ct002.BatchOutcome(processed=30, consumed=30)
+    assert ct002.consume_batch_from_redis(batch_size=30) == ct002.BatchOutcome(processed=20, consumed=21)
+
+    assert client.commands == ["XGROUP", "XREADGROUP", "XACK", "XREADGROUP", "XACK", "PIPELINE"]
+    assert len(client.acked) == 51
+    assert client.dead_lettered[0][1]["source_id"] == "1-50"
+
+def test_redis_drain_continues_past_an_all_invalid_batch(monkeypatch):
+    """
+    Tests that DRAIN keeps reading the stream when a whole XREADGROUP batch is dead-lettered.
+    """
+    import src.ct_002_data_processor as ct002
+
+    entries = [(f"1-{i}", {"data": "{not json"}) for i in range(2)]
+    entries += [(f"1-{i}", {"data": json.dumps(MOCK_DT002_REPORT)}) for i in range(2, 5)]
+    client = FakeStreamClient(entries)
+    monkeypatch.setattr(ct002, "REDIS_CLIENT", client, raising=False)
+    monkeypatch.setattr(ct002, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(ct002, "_READY_CONSUMER_GROUPS", set())
+    monkeypatch.setenv("REDIS_STREAM_NAME", "test_stream")
+    monkeypatch.setenv("CT_REDIS_BATCH_SIZE", "2")
+    monkeypatch.setenv("MQ_TYPE", "REDIS_STREAMS")
+    monkeypatch.setenv("CT_LISTENER_MODE", "DRAIN")
+    monkeypatch.setenv("CT_PUBLISH_RESULTS", "0")
+
+    start_mq_listener()
+
+    assert client.entries == []
+    assert sorted(client.acked) == [f"1-{i}" for i in range(5)]
+    assert len(client.dead_lettered) == 2
+
+def test_reclaim_pending_messages_dead_letters_exhausted_entries(monkeypatch):
+    """
+    Tests that reclaimed entries over the retry limit go to the dead-letter stream
+    while the others are processed, even with unclaimed pending entries between them.
+    """
+    import src.ct_002_data_processor as ct002
+
+    pending = [("1-0", {"data": json.dumps(MOCK_DT002_REPORT)}), ("1-2", {"data": json.dumps(MOCK_DT002_REPORT)})]
+    # 1-1 is pending too, but not idle long enough to be claimed
+    client = FakeStreamClient([], pending=pending, deliveries={"1-0": 2, "1-1": 1, "1-2": 6})
+    monkeypatch.setattr(ct002, "REDIS_CLIENT", client, raising=False)
+    monkeypatch.setattr(ct002, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(ct002, "_READY_CONSUMER_GROUPS", set())
+    monkeypatch.setenv("REDIS_STREAM_NAME", "test_stream")
+    monkeypatch.setenv("CT_REDIS_MAX_DELIVERIES", "5")
+
+    assert ct002.reclaim_pending_messages() == ct002.BatchOutcome(processed=1, consumed=2)
+
+    assert [fields["source_id"] for _, fields in client.dead_lettered] == ["1-2"]
+    assert client.dead_lettered[0][0] == "test_stream:dead-letter"
+    assert sorted(client.acked) == ["1-0", "1-2"]
+
+def test_single_run_retries_and_dead_letters_redis_entries(monkeypatch):
+    """
+    Tests that a single listener run takes stalled entries through the reclaim
+    path, and dead-letters an invalid entry instead of acknowledging it.
+    """
+    import src.ct_002_data_processor as ct002
+
+    pending = [("1-0", {"data": json.dumps(MOCK_DT002_REPORT)})]
+    client = FakeStreamClient([("1-1", {"data": "{not json"})], pending=pending, deliveries={"1-0": 6})
+    monkeypatch.setattr(ct002, "REDIS_CLIENT", client, raising=False)
+    monkeypatch.setattr(ct002, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(ct002, "_READY_CONSUMER_GROUPS", set())
+    monkeypatch.setenv("REDIS_STREAM_NAME", "test_stream")
+    monkeypatch.setenv("MQ_TYPE", "REDIS_STREAMS")
+
+    start_mq_listener()
+    assert [fields["reason"] for _, fields in client.dead_lettered] == ["MAX_DELIVERIES_EXCEEDED"]
+    assert "XREADGROUP" not in client.commands
+
+    client.pending = []
+    start_mq_listener()
+    assert [fields["reason"] for _, fields in client.dead_lettered] == ["MAX_DELIVERIES_EXCEEDED", "INVALID_REPORT"]
+    assert sorted(client.acked) == ["1-0", "1-1"]
+
+# --- Integration Tests for the Worker Pool (CR-008) ---
+
+def test_worker_pool_processes_each_message_once(setup_test_environment, monkeypatch):
+    """
+    Tests that a pool of workers drains the queue with every message archived exactly once.
+    """
+    from src.ct_002_data_processor import run_worker_pool
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    monkeypatch.setenv("CT_IDLE_BACKOFF_MAX_SECONDS", "0.1")
+    monkeypatch.setenv("CT_DRAIN_BATCH_SIZE", "5")
+
+    file_names = [f"resource_report_20251117120{i:03d}.json" for i in range(40)]
+    for file_name in file_names:
+        with open(os.path.join(mq_new_dir, file_name), 'w') as f:
+            json.dump(MOCK_DT002_REPORT, f)
+
+    run_worker_pool(worker_count=2, max_runtime_seconds=4)
+
+    archived = sorted(f for f in os.listdir(mq_archive_dir) if f.startswith("resource_report_20251117120"))
+    assert archived == file_names
+    assert not [f for f in os.listdir(mq_new_dir) if f.endswith('.json')]
+
+def test_worker_pool_backs_off_restarting_a_crashing_worker(setup_test_environment, monkeypatch, capsys):
+    """
+    Tests that a worker crashing on startup is restarted after doubling delays instead of every second.
+    """
+    import re
+    from src.ct_002_data_processor import run_worker_pool
+
+    # The spawned worker fails to parse its configuration and exits at once
+    monkeypatch.setenv("CT_MAX_MESSAGES", "not a number")
+    monkeypatch.setenv("CT_WORKER_RESTART_BACKOFF_MIN_SECONDS", "0.2")
+    monkeypatch.setenv("CT_WORKER_RESTART_BACKOFF_MAX_SECONDS", "30")
+
+    run_worker_pool(worker_count=1, max_runtime_seconds=5)
+
+    delays = [float(delay) for delay in re.findall(r"Restarting in ([0-9.]+)s\.", capsys.readouterr().out)]
+    assert len(delays) >= 2
+    assert delays == [0.2 * 2 ** restart for restart in range(len(delays))]
+
+def test_reclaim_stale_file_claims(setup_test_environment, monkeypatch):
+    """
+    Tests that messages left in a dead worker's processing directory return to the queue.
+    """
+    from src.ct_002_data_processor import reclaim_stale_file_claims
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+    dead_worker_dir = os.path.join(os.path.dirname(os.path.normpath(mq_new_dir)), "processing", "ct002_dead_w0")
+    os.makedirs(dead_worker_dir, exist_ok=True)
+    with open(os.path.join(dead_worker_dir, "resource_report_20251117130000.json"), 'w') as f:
+        json.dump(MOCK_DT002_REPORT, f)
+    monkeypatch.setenv("CT_FILE_CLAIM_TIMEOUT_SECONDS", "-1")
+
+    assert reclaim_stale_file_claims() == 1
+    assert os.path.exists(os.path.join(mq_new_dir, "resource_report_20251117130000.json"))
+
+# --- Unit Tests for Windowed Aggregation (CR-009) ---
+
+def test_metric_window_matches_brute_force():
+    """Tests the incremental mean, percentile and rate against a direct computation over the window."""
+    import math
+    import random
+    from src.metric_windows import MetricWindow
+
+    window = MetricWindow(10)
+    samples = [(float(t), random.uniform(0, 100)) for t in range(0, 250, 5)]
+    for timestamp, value in samples:
+        window.add(timestamp, value)
+
+    recent = samples[-10:]
+    values = sorted(value for _, value in recent)
+    assert window.count == 10
+    assert math.isclose(window.mean(), sum(values) / 10)
+    assert window.percentile(95) == values[math.ceil(0.95 * 10) - 1]
+    assert math.isclose(window.rate_per_minute(), (recent[-1][1] - recent[0][1]) / (recent[-1][0] - recent[0][0]) * 60)
+
+def test_window_insight_ignores_spikes_and_detects_trends():
+    """Tests that one noisy sample does not raise CRITICAL while a steady disk fill-up raises a WARNING."""
+    from src.ct_002_data_processor import process_resource_report
+
+    def report(host, minute, disk, cpu=10.0):
+        return dict(MOCK_DT002_REPORT, host=host, timestamp=f"2025-11-17T10:{minute:02d}:00", metrics={
+            "disk_usage_percent": disk, "cpu_usage_percent": cpu, "mem_usage_percent": 30.0
+        })
+
+    for minute in range(9):
+        process_resource_report(report("spiky-host", minute, 40.0))
+    spike = process_resource_report(report("spiky-host", 9, 95.0))
+    assert "CRITICAL" not in spike["actionable_insight"]
+    assert spike["window_aggregates"]["disk_usage_percent"]["samples"] == 10
+
+    for minute in range(10):
+        result = process_resource_report(report("filling-host", minute, 50.0 + minute * 0.5))
+    assert "projected to reach 100%" in result["actionable_insight"]
+    assert result["source_host"] == "filling-host"
+
+    # A redelivered report is not counted again
+    redelivered = process_resource_report(report("filling-host", 9, 54.5))
+    assert redelivered["window_aggregates"] == result["window_aggregates"]
+    assert process_resource_report(report("filling-host", 10, 55.0))["window_aggregates"]["disk_usage_percent"]["latest"] == 55.0
+
+# --- Unit Tests for Bulk Rescoring (CR-010) ---
+
+def test_bulk_rescoring_matches_per_report_processing(monkeypatch):
+    """Tests that the vectorized rules return exactly what process_resource_report returns without windows."""
+    pytest.importorskip("numpy")
+    from src import ct_002_data_processor as ct002
+    from src.bulk_rescoring import rescore_reports
+
+    monkeypatch.setattr(ct002, "WINDOW_AGGREGATOR", None)
+    reports = [
+        dict(MOCK_DT002_REPORT, metrics={"disk_usage_percent": disk, "cpu_usage_percent": cpu, "mem_usage_percent": mem})
+        for disk, cpu, mem in [(10, 10.0, 10.0), (80, 95.0, 95.0), (79, 90.0, 10.0), (5, 5.5, 90.0), (79.9, 89.9, 89.9)]
+    ]
+    reports.append({"team_id": "Data Team"})
+    reports.append(dict(MOCK_DT002_REPORT, metrics={"disk_usage_percent": 10}))
+    # AT-010: Reports the fast path cannot clear go through the full contract validation
+    plain_metrics = {"disk_usage_percent": 10, "cpu_usage_percent": 10.0, "mem_usage_percent": 10.0}
+    reports.append(dict(MOCK_DT002_REPORT, metrics=dict(plain_metrics, cpu_usage_percent=120)))
+    reports.append(dict(MOCK_DT002_REPORT, metrics=dict(plain_metrics, mem_usage_percent=True)))
+    reports.append(dict(MOCK_DT002_REPORT, host=7, metrics=plain_metrics))
+    reports.append(dict(MOCK_DT002_REPORT, schema_version=3, metrics=dict(plain_metrics, cpu_per_core_percent=[95.0, 5.0])))
+    reports.append(dict(MOCK_DT002_REPORT, metrics=dict(plain_metrics, filesystems={"/data": {"device": "/dev/vdb"}})))
+
+    assert rescore_reports(reports) == [ct002.process_resource_report(report) for report in reports]
+
+def test_bulk_rescoring_reads_archive_and_bundles(tmp_path):
+    """Tests that archived messages are re-scored from loose files and compacted bundles alike."""
+    pytest.importorskip("numpy")
+    from src.bulk_rescoring import rescore_archive
+    from src.mq_archive_compactor import compact_archive
+
+    for index in range(5):
+        path = tmp_path / f"resource_report_{index}.json"
+        path.write_text(json.dumps(MOCK_DT002_REPORT))
+        if index < 3:
+            os.utime(path, (1_000_000, 1_000_000))
+    (tmp_path / "resource_report_5.json.corrupted").write_text("{not json")
+    compact_archive(str(tmp_path), bucket_seconds=3600)
+
+    batches = list(rescore_archive(str(tmp_path), batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert all(result["processing_status"] == "SUCCESS" for batch in batches for result in batch)
+
+# --- Unit Tests for the Fleet View (CR-011) ---
+
+def test_fleet_snapshot_ranks_hosts_and_counts_severities(tmp_path, monkeypatch):
+    """Tests that every host's latest result feeds the snapshot's severity counts and top-N hottest hosts."""
+    from src import ct_002_data_processor as ct002
+    from src.fleet_state import FleetState
+
+    fleet_file = tmp_path / "fleet.json"
+    monkeypatch.setenv("CT_FLEET_FILE", str(fleet_file))
+    monkeypatch.setenv("CT_FLEET_TOP_N", "2")
+    monkeypatch.setattr(ct002, "WINDOW_AGGREGATOR", None)
+    monkeypatch.setattr(ct002, "FLEET_STATE", FleetState())
+
+    for host, disk, cpu in [("a", 10, 10.0), ("b", 85, 10.0), ("c", 20, 95.0), ("d", 30, 50.0), ("b", 40, 10.0)]:
+        result = process_resource_report(dict(MOCK_DT002_REPORT, host=host, metrics={
+            "disk_usage_percent": disk, "cpu_usage_percent": cpu, "mem_usage_percent": 30.0
+        }))
+    ct002.write_processing_output(result)
+
+    snapshot = json.loads(fleet_file.read_text())
+    assert snapshot["host_count"] == 4
+    assert snapshot["severity_counts"] == {"OK": 3, "WARNING": 1, "CRITICAL": 0}
+    assert [entry["host"] for entry in snapshot["top_hosts"]] == ["c", "d"]
+    assert snapshot["hosts"]["b"]["disk_usage_percent"] == 40
+
+def test_fleet_snapshot_merges_other_workers(tmp_path):
+    """Tests that a worker keeps hosts another worker wrote to the snapshot, newest result first, and expires silent hosts."""
+    from src.fleet_state import FleetState, host_entry, write_fleet_snapshot
+
+    def result(host, disk):
+        return {"source_host": host, "insight_severity": "OK", "insight_severity_code": 0,
+                "metrics_processed": {"disk_usage_percent": disk, "cpu_usage_percent": 1.0, "mem_usage_percent": 1.0}}
+
+    fleet_file = str(tmp_path / "fleet.json")
+    worker_a, worker_b = FleetState(), FleetState()
+    worker_a.observe(result("web-1", 10), seen_at=100.0)
+    worker_a.observe(result("old", 10), seen_at=1.0)
+    write_fleet_snapshot(worker_a, fleet_file, top_count=5, max_age_seconds=1e12)
+
+    worker_b.update(host_entry(result("web-1", 5), seen_at=50.0))
+    worker_b.observe(result("web-2", 70), seen_at=200.0)
+    write_fleet_snapshot(worker_b, fleet_file, top_count=5, max_age_seconds=1e12)
+
+    with open(fleet_file) as f:
+        snapshot = json.load(f)
+    assert snapshot["hosts"]["web-1"]["disk_usage_percent"] == 10
+    assert [entry["host"] for entry in snapshot["top_hosts"]] == ["web-2", "web-1", "old"]
+    assert worker_b.expire(100, now=250.0) == 2
+    assert list(worker_b.hosts) == ["web-2"]
+    assert worker_b.severity_counts["OK"] == 1
@@ -0,0 +1,238 @@
+import pytest
+import json
+import os
+import time
+from scripts.dt_001_resource_reporter import (
+    get_cpu_usage,
+    get_memory_usage,
+    get_disk_usage,
+    generate_report,
+    validate_metrics,
+)
+
+# --- Unit Tests for Metric Collection (DT-004) ---
+
+def test_collectors_return_artifact_contract_keys():
+    """Tests that the native collectors produce the DT-002 metric keys with sane values."""
+    cpu = get_cpu_usage()
+    mem = get_memory_usage()
+    disk = get_disk_usage()
+
+    assert 0.0 <= cpu["cpu_usage_percent"] <= 100.0
+    assert mem["mem_total_mb"] > 0
+    assert 0.0 <= mem["mem_usage_percent"] <= 100.0
+    assert set(disk) == {"disk_filesystem", "disk_size_gb", "disk_used_gb", "disk_available_gb", "disk_usage_percent"}
+    assert 0 <= disk["disk_usage_percent"] <= 100
+
+def test_repeated_collection_is_fast():
+    """Tests that collection after the first sample needs no subprocesses or sleeps."""
+    generate_report()
+
+    started_at = time.perf_counter()
+    for _ in range(100):
+        report = generate_report()
+    elapsed = time.perf_counter() - started_at
+
+    assert "metrics" in report
+    assert elapsed < 1.0
+
+def test_validate_metrics_rejects_out_of_range_values():
+    """Tests the DT-003 range checks."""
+    metrics = {"disk_usage_percent": 120, "disk_size_gb": 10.0, "mem_total_mb": 100}
+    assert validate_metrics(metrics) is False
+
+# --- Unit Tests for the Resident Sampler (DT-005) ---
+
+def test_metric_ring_buffer_keeps_latest_samples():
+    """Tests that the ring buffer overwrites the oldest samples and summarizes the rest."""
+    from scripts.dt_001_resource_reporter import MetricRingBuffer
+
+    buffer = MetricRingBuffer(20)
+    for value in range(1, 31):
+        buffer.append(float(value))
+
+    assert buffer.values() == [float(value) for value in range(11, 31)]
+    assert buffer.summary() == {"min": 11.0, "max": 30.0, "mean": 20.5, "p95": 29.0}
+
+def test_resource_sampler_publishes_window_summaries(setup_test_environment):
+    """Tests that the sampler publishes one summarized report per window."""
+    from scripts.dt_001_resource_reporter import run_resource_sampler
+
+    mq_new_dir = os.environ.get("MQ_NEW_DIR")
+
+    published_count = run_resource_sampler(sample_interval=0.01, publish_interval=0.1, max_reports=2)
+
+    report_files = sorted(f for f in os.listdir(mq_new_dir) if f.startswith("resource_report_"))
+    assert published_count == 2
+    assert len(report_files) == 2
+    with open(os.path.join(mq_new_dir, report_files[0]), 'r') as f:
+        report = json.load(f)
+    assert report["sample_count"] > 1
+    assert set(report["metrics_summary"]["cpu_usage_percent"]) == {"min", "max", "mean", "p95"}
+    assert "disk_usage_percent" in report["metrics"]
+
+# --- Unit Tests for Multi-Filesystem and Per-Core Metrics (DT-006) ---
+
+def test_collect_metrics_includes_filesystems_cores_and_disk_io():
+    """Tests that one collection covers every filesystem, every core and disk I/O."""
+    from scripts.dt_001_resource_reporter import PROC_STAT_PATH, collect_metrics
+
+    metrics = collect_metrics()
+
+    # Offline cores are not listed in /proc/stat
+    with open(PROC_STAT_PATH) as f:
+        core_count = sum(1 for line in f if line.startswith("cpu") and line[3].isdigit())
+    assert "/" in metrics["filesystems"]
+    assert len(metrics["cpu_per_core_percent"]) == core_count
+    assert isinstance(metrics["disk_io"], dict)
+
+def test_per_core_usage_skips_offline_cores(tmp_path, monkeypatch):
+    """Tests that a gap in the core numbers (an offline core) does not add a zero entry."""
+    import scripts.dt_001_resource_reporter as dt001
+
+    stat_file = tmp_path / "stat"
+    monkeypatch.setattr(dt001, "PROC_STAT_PATH", str(stat_file))
+    monkeypatch.setattr(dt001, "_LAST_CPU_USAGE", {})
+    samples = [
+        "cpu  200 0 0 800 0 0 0 0 0 0\ncpu0 100 0 0 400 0 0 0 0 0 0\ncpu2 100 0 0 400 0 0 0 0 0 0\n",
+        "cpu  300 0 0 900 0 0 0 0 0 0\ncpu0 200 0 0 400 0 0 0 0 0 0\ncpu2 100 0 0 500 0 0 0 0 0 0\n"
+    ]
+    stat_file.write_text(samples[0])
+    monkeypatch.setattr(dt001, "_LAST_CPU_TIMES", dt001._read_cpu_times())
+    stat_file.write_text(samples[1])
+
+    assert dt001.get_cpu_usage() == {"cpu_usage_percent": 50.0, "cpu_per_core_percent": [100.0, 0.0]}
+
+def test_filesystem_include_filter(monkeypatch):
+    """Tests that DT_FS_INCLUDE restricts the reported mount points."""
+    from scripts.dt_001_resource_reporter import get_filesystem_usage
+
+    monkeypatch.setenv("DT_FS_INCLUDE", "/")
+
+    assert list(get_filesystem_usage()["filesystems"]) == ["/"]
+
+def test_flatten_numeric_metrics():
+    """Tests the dotted keys used for nested metrics in window summaries."""
+    from scripts.dt_001_resource_reporter import flatten_numeric_metrics
+
+    metrics = {"cpu_per_core_percent": [1.0, 2.0], "filesystems": {"/": {"device": "/dev/vda", "usage_percent": 40}}}
+
+    assert dict(flatten_numeric_metrics(metrics)) == {
+        "cpu_per_core_percent.0": 1.0,
+        "cpu_per_core_percent.1": 2.0,
+        "filesystems./.usage_percent": 40
+    }
+
+# --- Unit Test for Pipelined Batch Publishing (DT-007) ---
+
+class FakePipelineClient:
+    """
+    Minimal stand-in for the Redis client that records pipelined XADDs.
+    """
+    def __init__(self):
+        self.round_trips = 0
+        self.next_id = 0
+
+    def pipeline(self, transaction=True):
+        return FakeXaddPipeline(self)
+
+class FakeXaddPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def xadd(self, stream, fields, **kwargs):
+        self.queued.append(fields)
+
+    def execute(self, raise_on_error=True):
+        self.client.round_trips += 1
+        replies = []
+        for fields in self.queued:
+            self.client.next_id += 1
+            replies.append(f"1-{self.client.next_id}")
+        return replies
+
+def test_publish_batch_to_redis_pipelines_chunks(monkeypatch):
+    """Tests that reports are sent in pipelined chunks and results keep input order."""
+    import scripts.dt_001_resource_reporter as dt001
+
+    client = FakePipelineClient()
+    monkeypatch.setattr(dt001, "REDIS_CLIENT", client, raising=False)
+    monkeypatch.setattr(dt001, "REDIS_AVAILABLE", True)
+    monkeypatch.setenv("REDIS_STREAM_NAME", "test_stream")
+
+    reports = [{"team_id": "Data Team", "sequence": i} for i in range(250)]
+    reports.append({"unserializable": object()})
+
+    results = dt001.publish_batch_to_redis(iter(reports), chunk_size=100)
+
+    assert client.round_trips == 3
+    assert len(results) == 251
+    assert results[0] == ("1-1", None)
+    assert results[249] == ("1-250", None)
+    assert results[250][0] is None and "Encoding failed" in results[250][1]
+
+# --- Unit Tests for the Store-and-Forward Spool (DT-008) ---
+
+def test_report_spool_forwards_in_order_and_resumes(tmp_path):
+    """Tests that the spool replays reports in order, pauses on failure and resumes later."""
+    from scripts.dt_008_report_spool import ReportSpool
+
+    spool = ReportSpool(spool_dir=str(tmp_path), segment_bytes=512, fsync_batch=4)
+    for sequence in range(30):
+        spool.append({"sequence": sequence})
+
+    received = []
+
+    def flaky_publish(reports):
+        results = []
+        for report in reports:
+            if report["sequence"] == 17 and not received.count("failed"):
+                received.append("failed")
+                results.append((None, "connection lost"))
+                continue
+            received.append(report["sequence"])
+            results.append((f"1-{report['sequence']}", None))
+        return results
+
+    first_pass = spool.forward(flaky_publish, batch_size=5)
+    assert spool.has_pending()
+    second_pass = spool.forward(flaky_publish, batch_size=5)
+
+    delivered = [item for item in received if item != "failed"]
+    assert first_pass + second_pass == 30
+    assert sorted(set(delivered)) == list(range(30))
+    assert delivered[:17] == list(range(17))
+    assert not spool.has_pending()
+    # Forwarded segments are deleted; only the newest one is kept for appends
+    assert len([name for name in os.listdir(spool.log.topic_dir) if name.endswith(".log")]) == 1
+
+def test_report_spool_skips_corrupted_records(tmp_path):
+    """Tests that a report corrupted on disk is skipped instead of stalling the forwarder."""
+    from scripts.dt_008_report_spool import ReportSpool
+    from tests.test_mq import corrupt_record
+
+    spool = ReportSpool(spool_dir=str(tmp_path), fsync_batch=1)
+    for sequence in range(4):
+        spool.append({"sequence": sequence})
+    corrupt_record(spool.log, 1)
+
+    received = []
+    forwarded_count = spool.forward(lambda reports: [(received.append(report["sequence"]), None) for report in reports])
+
+    assert forwarded_count == 3
+    assert received == [0, 2, 3]
+    assert not spool.has_pending()
+
+def test_publish_report_spools_when_redis_is_down(tmp_path, monkeypatch):
+    """Tests that a failed Redis publish lands in the spool instead of the file system MQ."""
+    import scripts.dt_001_resource_reporter as dt001
+
+    monkeypatch.setenv("MQ_TYPE", "REDIS_STREAMS")
+    monkeypatch.setattr(dt001, "REDIS_AVAILABLE", False)
+    monkeypatch.setattr(dt001, "connect_redis", lambda: False)
+    monkeypatch.setattr(dt001, "_REPORT_SPOOL", dt001.ReportSpool(spool_dir=str(tmp_path)))
+
+    dt001.publish_report({"team_id": "Data Team", "sequence": 1})
+
+    assert dt001._REPORT_SPOOL.has_pending()
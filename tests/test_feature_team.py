@@ -0,0 +1,155 @@
+import pytest
+import os
+
+from src.ft_001_summary_generator import compile_template, generate_executive_summary, render_summary, write_summary
+
+def result(host, timestamp, disk, severity="OK", severity_code=0):
+    return {
+        "source_host": host,
+        "source_timestamp": timestamp,
+        "metrics_processed": {"disk_usage_percent": disk, "cpu_usage_percent": 10.0, "mem_usage_percent": "N/A"},
+        "actionable_insight": f"{severity}: disk at {disk}%",
+        "insight_severity": severity,
+        "insight_severity_code": severity_code,
+        "insight_findings": [{"metric": "disk_usage_percent", "severity_code": severity_code}] if severity_code else []
+    }
+
+# --- Unit Tests for the Summary Renderer (FT-003) ---
+
+def test_compiled_template_renders_fields():
+    """Tests that a precompiled template renders like str.format."""
+    render = compile_template("| {host} | {value}% |")
+    assert render(host="web-1", value="N/A") == "| web-1 | N/A% |"
+
+def test_render_summary_covers_several_hosts_in_one_document():
+    """Tests that several results render as one row each with the most severe overall status."""
+    summary = render_summary([
+        result("web-1", "2025-11-17T10:00:00", 20),
+        result("web-2", "2025-11-17T10:05:00", 85, "CRITICAL", 2),
+        result("web-1", "2025-11-17T10:01:00", "N/A")
+    ])
+
+    assert "covers 3 results from 2 hosts" in summary
+    assert "| web-2 | 2025-11-17T10:05:00 | 85% 🔴 | 10.0% 🟢 | N/A% 🟢 | RED |" in summary
+    assert "| web-1 | 2025-11-17T10:01:00 | N/A% 🟢 |" in summary
+    assert "- **web-2** (2025-11-17T10:05:00): CRITICAL: disk at 85%" in summary
+    assert "**Source Timestamp:** 2025-11-17T10:05:00" in summary
+    assert "**Overall Status:** **RED**" in summary
+    assert "| Disk Usage | N/A% | 🟢 |" in generate_executive_summary(result("web-1", "t", "N/A"))
+
+def test_unchanged_summary_is_not_rewritten(tmp_path):
+    """Tests that the output file is only rewritten when the summary content changes."""
+    output_file = str(tmp_path / "summary.md")
+
+    assert write_summary(generate_executive_summary(result("web-1", "t1", 20)), output_file) is True
+    os.utime(output_file, (1, 1))
+    # Only 'Generated At' differs
+    assert write_summary(generate_executive_summary(result("web-1", "t1", 20)), output_file) is False
+    assert os.path.getmtime(output_file) == 1
+    assert write_summary(generate_executive_summary(result("web-1", "t2", 20)), output_file) is True
+    assert "**Source Timestamp:** t2" in open(output_file).read()
+
+def test_listener_summarizes_the_newest_result_of_every_host(tmp_path, monkeypatch):
+    """Tests that the topic consumer renders one row per host that reported, with its newest result."""
+    import src.ft_001_summary_generator as ft001
+    from src.ct_002_data_processor import publish_results
+
+    summary_file = tmp_path / "summary.md"
+    monkeypatch.setenv("FT_OUTPUT_FILE", str(summary_file))
+    monkeypatch.setenv("FT_SEGMENT_LOG_BATCH_SIZE", "2")
+    publish_results([
+        result("web-1", "2025-11-17T10:00:00", 20),
+        result("web-2", "2025-11-17T10:00:30", 85, "CRITICAL", 2),
+        result("web-1", "2025-11-17T10:01:00", 30),
+        result("db-1", "2025-11-17T10:01:30", 40)
+    ])
+
+    ft001.start_summary_listener()
+
+    summary = summary_file.read_text()
+    assert "covers 3 results from 3 hosts" in summary
+    assert "| web-1 | 2025-11-17T10:01:00 | 30% 🟢 |" in summary
+    assert "2025-11-17T10:00:00" not in summary
+    assert summary.index("| db-1 |") < summary.index("| web-1 |") < summary.index("| web-2 |")
+    assert "**Overall Status:** **RED**" in summary
+
+    # Hosts that sent nothing new keep their newest result in the next summary
+    publish_results([result("web-1", "2025-11-17T10:02:00", 50)])
+    ft001.start_summary_listener()
+
+    summary = summary_file.read_text()
+    assert "covers 3 results from 3 hosts" in summary
+    assert "| web-1 | 2025-11-17T10:02:00 | 50% 🟢 |" in summary
+    assert "| web-2 | 2025-11-17T10:00:30 | 85% 🔴 |" in summary
+    assert "| db-1 | 2025-11-17T10:01:30 |" in summary
+
+# --- Unit Tests for the Redis Result Stream Consumer (FT-002) ---
+
+class FakeResultStream:
+    """
+    Minimal stand-in for a Redis stream with one consumer group and its pending entries.
+    """
+    def __init__(self, entries):
+        self.entries = entries
+        self.delivered = 0
+        self.pending = []
+        self.read_sizes = []
+
+    def xgroup_create(self, *args, **kwargs):
+        pass
+
+    def xreadgroup(self, group, consumer, streams, count=None):
+        topic, stream_id = list(streams.items())[0]
+        if stream_id == '>':
+            batch = self.entries[self.delivered:self.delivered + count]
+            self.delivered += len(batch)
+            self.pending.extend(batch)
+        else:
+            after = tuple(int(part) for part in stream_id.split('-'))
+            batch = [entry for entry in self.pending if tuple(int(part) for part in entry[0].split('-')) > after][:count]
+        self.read_sizes.append(len(batch))
+        return [(topic, batch)] if batch else []
+
+    def xack(self, topic, group, *message_ids):
+        self.pending = [entry for entry in self.pending if entry[0] not in message_ids]
+
+def test_redis_results_stay_pending_until_summarized(tmp_path, monkeypatch):
+    """Tests that a failed summary write leaves the read results pending, and the next run takes them over."""
+    import json
+    import src.ft_001_summary_generator as ft001
+
+    stream = FakeResultStream([(f"1-{index}", {b"data": json.dumps(result("web-1", f"2025-11-17T10:00:{index:02d}", index)).encode()}) for index in range(12)])
+    monkeypatch.setattr(ft001, "REDIS_CLIENT", stream, raising=False)
+    monkeypatch.setattr(ft001, "REDIS_AVAILABLE", True)
+    output_file = str(tmp_path / "summary.md")
+
+    def failing_write(summary_report, output_file):
+        raise OSError("disk full")
+    monkeypatch.setattr(ft001, "write_summary", failing_write)
+    with pytest.raises(OSError):
+        ft001.consume_results_from_redis(output_file, batch_size=2, max_entries=5)
+    assert len(stream.pending) == 5
+
+    monkeypatch.setattr(ft001, "write_summary", write_summary)
+    assert ft001.consume_results_from_redis(output_file, batch_size=2, max_entries=5) == 12
+
+    assert stream.pending == [] and stream.delivered == 12
+    assert max(stream.read_sizes) <= 2
+    assert "**Source Timestamp:** 2025-11-17T10:00:11" in open(output_file).read()
+
+def test_listener_reads_one_result_source_per_mq_type(tmp_path, monkeypatch):
+    """Tests that with Redis Streams only the Redis consumer writes the summary."""
+    import json
+    import src.ft_001_summary_generator as ft001
+
+    stream = FakeResultStream([("1-0", {b"data": json.dumps(result("web-1", "2025-11-17T10:00:00", 20)).encode()})])
+    monkeypatch.setattr(ft001, "REDIS_CLIENT", stream, raising=False)
+    monkeypatch.setattr(ft001, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(ft001, "consume_results_from_segment_log", lambda output_file: pytest.fail("segment log was read"))
+    monkeypatch.setenv("MQ_TYPE", "REDIS_STREAMS")
+    monkeypatch.setenv("FT_OUTPUT_FILE", str(tmp_path / "summary.md"))
+
+    ft001.start_summary_listener()
+
+    assert "**Source Timestamp:** 2025-11-17T10:00:00" in (tmp_path / "summary.md").read_text()
+    assert stream.pending == []
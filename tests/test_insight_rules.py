@@ -0,0 +1,110 @@
+import pytest
+import json
+import random
+
+from src.insight_rules import RuleSet, default_rules, load_rule_set, SEVERITY_CRITICAL, SEVERITY_OK, SEVERITY_WARNING
+
+# --- Unit Tests for the Insight Rule Engine (AT-009) ---
+
+def test_default_rules_keep_original_precedence():
+    """Tests that the built-in rules reproduce the original if/elif thresholds and their order."""
+    rule_set = RuleSet(default_rules())
+
+    evaluation = rule_set.evaluate({"disk_usage_percent": 85, "cpu_usage_percent": 95, "mem_usage_percent": 95})
+    assert (evaluation.severity_code, evaluation.rule_id) == (SEVERITY_CRITICAL, "disk_critical")
+    assert evaluation.insight() == "CRITICAL: Disk usage is at or above 80% threshold. Immediate action required."
+    assert sorted(finding["rule_id"] for finding in evaluation.findings) == ["cpu_warning", "disk_critical", "mem_warning"]
+
+    assert rule_set.evaluate({"disk_usage_percent": 10, "cpu_usage_percent": 95, "mem_usage_percent": 95}).rule_id == "cpu_warning"
+    assert rule_set.evaluate({"disk_usage_percent": 10, "cpu_usage_percent": 10, "mem_usage_percent": 90}).rule_id == "mem_warning"
+
+    ok = rule_set.evaluate({"disk_usage_percent": 79.9, "cpu_usage_percent": "N/A", "mem_usage_percent": 89.9})
+    assert (ok.severity_code, ok.findings) == (SEVERITY_OK, [])
+    assert ok.insight() == "OK: All primary resource metrics are within acceptable limits."
+
+def test_compiled_rules_match_linear_evaluation():
+    """Tests the compiled threshold indexes against a brute-force scan of hundreds of rules."""
+    generator = random.Random(7)
+    definitions = [
+        {
+            "id": f"rule_{index}",
+            "metric": generator.choice(["cpu_usage_percent", "filesystems./data.usage_percent"]),
+            "op": generator.choice([">=", ">", "<=", "<"]),
+            "threshold": generator.randint(0, 100),
+            "severity": generator.choice(["WARNING", "CRITICAL"]),
+            "priority": generator.randint(0, 5),
+            "message": "Value {value} crossed a threshold."
+        }
+        for index in range(300)
+    ]
+    rule_set = RuleSet(definitions)
+
+    for _ in range(200):
+        metrics = {"cpu_usage_percent": generator.randint(0, 100), "filesystems": {"/data": {"usage_percent": generator.randint(0, 100)}}}
+        matching = [
+            rule for rule in rule_set.rules
+            if rule.matches(metrics["cpu_usage_percent"] if rule.metric == "cpu_usage_percent" else metrics["filesystems"]["/data"]["usage_percent"])
+        ]
+        expected = max(matching, key=lambda rule: rule.rank).rule_id if matching else None
+        assert rule_set.evaluate(metrics).rule_id == expected
+
+def test_rules_load_from_config_file(tmp_path, monkeypatch):
+    """Tests loading rules from AT_INSIGHT_RULES_FILE and rejecting invalid definitions."""
+    rules_file = tmp_path / "insight_rules.json"
+    rules_file.write_text(json.dumps({"rules": [
+        {"id": "load_high", "metric": "load_average", "op": ">", "threshold": 4, "severity": "WARNING", "message": "Load is {value}."}
+    ]}))
+    monkeypatch.setenv("AT_INSIGHT_RULES_FILE", str(rules_file))
+
+    evaluation = load_rule_set().evaluate({"load_average": 6.5})
+    assert (evaluation.severity_code, evaluation.insight()) == (SEVERITY_WARNING, "WARNING: Load is 6.5.")
+
+    rules_file.write_text(json.dumps([{"id": "bad", "metric": "x", "op": "~", "threshold": 1, "message": "m"}]))
+    with pytest.raises(ValueError):
+        load_rule_set()
+
+def test_rules_address_keys_containing_dots_with_key_lists():
+    """Tests that a metric given as a list of keys reaches a mount point whose name contains a dot."""
+    rule_set = RuleSet([
+        {"id": "versioned_mount_full", "metric": ["filesystems", "/mnt/v1.2", "usage_percent"], "op": ">=", "threshold": 90,
+         "severity": "CRITICAL", "message": "/mnt/v1.2 is at {value}%."},
+        {"id": "data_full", "metric": "filesystems./data.usage_percent", "threshold": 90, "message": "/data is at {value}%."}
+    ])
+
+    evaluation = rule_set.evaluate({"filesystems": {"/mnt/v1.2": {"usage_percent": 95}, "/data": {"usage_percent": 91}}})
+    assert evaluation.insight() == "CRITICAL: /mnt/v1.2 is at 95%."
+    assert sorted(finding["rule_id"] for finding in evaluation.findings) == ["data_full", "versioned_mount_full"]
+    assert rule_set.metric_paths() == [("filesystems", "/data", "usage_percent"), ("filesystems", "/mnt/v1.2", "usage_percent")]
+
+@pytest.mark.parametrize("message", ["Disk at {usage}%.", "Disk at {}%.", "Disk at {value:d}%.", "Disk at {value%.", "Disk at {value.real.x}."])
+def test_rules_with_unformattable_messages_are_rejected_when_compiled(message):
+    """Tests that a message template that cannot be rendered with {value} rejects the rule set."""
+    with pytest.raises(ValueError, match="disk_full"):
+        RuleSet([{"id": "disk_full", "metric": "disk_usage_percent", "threshold": 90, "message": message}])
+
+def test_summary_and_monitoring_agent_use_severity_codes(tmp_path, monkeypatch, capsys):
+    """Tests that FT-001 and the monitoring agent read the structured severity instead of the insight text."""
+    from src.ft_001_summary_generator import generate_executive_summary
+    from scripts import monitoring_agent
+
+    processed = {
+        "metrics_processed": {"disk_usage_percent": 50, "cpu_usage_percent": 95.0, "mem_usage_percent": "N/A"},
+        "actionable_insight": "Free-form text without a severity keyword.",
+        "insight_severity": "WARNING",
+        "insight_severity_code": SEVERITY_WARNING,
+        "insight_findings": [{"rule_id": "cpu_warning", "metric": "cpu_usage_percent", "value": 95.0, "severity": "WARNING", "severity_code": SEVERITY_WARNING, "message": "m"}]
+    }
+    summary = generate_executive_summary(processed)
+    assert "**Overall Status:** **YELLOW**" in summary
+    assert "| CPU Usage | 95.0% | 🟡 |" in summary
+    assert "| Memory Usage | N/A% | 🟢 |" in summary
+
+    # A log written before the rule engine is evaluated against the rules
+    legacy = {"metrics_processed": {"disk_usage_percent": 90, "cpu_usage_percent": 1, "mem_usage_percent": 1}, "actionable_insight": "legacy"}
+    assert "**Overall Status:** **RED**" in generate_executive_summary(legacy)
+
+    log_file = tmp_path / "ct_output.json"
+    log_file.write_text(json.dumps(dict(processed, insight_severity="CRITICAL", insight_severity_code=SEVERITY_CRITICAL)))
+    monkeypatch.setattr(monitoring_agent, "LOG_FILE", str(log_file))
+    monitoring_agent.analyze_latest_log()
+    assert "CRITICAL ALERT: Free-form text without a severity keyword." in capsys.readouterr().out
@@ -0,0 +1,102 @@
+import pytest
+import itertools
+import json
+import os
+from datetime import datetime, timedelta
+
+from scripts.monitoring_agent import Check, MonitoringAgent, WatchedFile, _parse_health, _parse_log, evaluate_health, evaluate_log
+from src.insight_rules import SEVERITY_CRITICAL, SEVERITY_OK, SEVERITY_WARNING
+
+_MTIMES_NS = itertools.count(10 ** 18, 10 ** 9)
+
+def write_log(path, severity_code, insight):
+    path.write_text(json.dumps({"actionable_insight": insight, "insight_severity_code": severity_code}))
+    # Give every write a distinct mtime, as a later write would have
+    os.utime(path, ns=(0, next(_MTIMES_NS)))
+
+def checks_for(log_file, health_file):
+    return [
+        Check("health", WatchedFile(str(health_file), _parse_health), evaluate_health),
+        Check("log", WatchedFile(str(log_file), _parse_log), evaluate_log)
+    ]
+
+# --- Unit Tests for the Resident Monitoring Agent (AT-012) ---
+
+def test_agent_alerts_on_transitions_only_and_skips_unchanged_files(tmp_path):
+    """Tests that a steady condition alerts once and an unchanged file is not parsed again."""
+    log_file = tmp_path / "ct_output.json"
+    write_log(log_file, SEVERITY_CRITICAL, "Disk is full.")
+    watched_file = WatchedFile(str(log_file), _parse_log)
+    alerts = []
+    agent = MonitoringAgent([Check("log", watched_file, evaluate_log)], sink=alerts.append, confirm_polls=1)
+
+    for _ in range(5):
+        agent.poll_once()
+
+    assert [(alert.check, alert.previous_severity_code, alert.severity_code, alert.message) for alert in alerts] == [
+        ("log", SEVERITY_OK, SEVERITY_CRITICAL, "CRITICAL ALERT: Disk is full.")
+    ]
+    assert watched_file.read_count == 1
+
+    write_log(log_file, SEVERITY_OK, "All good.")
+    agent.poll_once()
+    agent.poll_once()
+
+    assert [alert.severity_code for alert in alerts] == [SEVERITY_CRITICAL, SEVERITY_OK]
+    assert watched_file.read_count == 2
+
+def test_agent_suppresses_flapping_and_reports_missing_health_file(tmp_path):
+    """Tests that a level must persist for the confirmation polls, and that a vanished health file is CRITICAL."""
+    log_file = tmp_path / "ct_output.json"
+    health_file = tmp_path / "health_check.json"
+    health_file.write_text(json.dumps({"status": "HEALTHY", "last_processed_time": datetime.now().isoformat()}))
+    alerts = []
+    agent = MonitoringAgent(checks_for(log_file, health_file), sink=alerts.append, confirm_polls=2)
+
+    for severity_code in (SEVERITY_WARNING, SEVERITY_OK, SEVERITY_WARNING, SEVERITY_OK):
+        write_log(log_file, severity_code, "Flapping.")
+        agent.poll_once()
+    assert alerts == []
+
+    write_log(log_file, SEVERITY_WARNING, "CPU is busy.")
+    agent.poll_once()
+    agent.poll_once()
+    os.remove(health_file)
+    agent.poll_once()
+    alerts_before = len(alerts)
+    agent.poll_once()
+
+    assert [(alert.check, alert.severity_code) for alert in alerts] == [("log", SEVERITY_WARNING), ("health", SEVERITY_CRITICAL)]
+    assert alerts_before == 1
+    assert alerts[1].message.startswith("CRITICAL: Health Check file not found")
+
+    # A health check that stops being updated goes stale without the file changing
+    health_file.write_text(json.dumps({"status": "HEALTHY", "last_processed_time": datetime.now().isoformat()}))
+    later = datetime.now() + timedelta(minutes=10)
+    agent.poll_once(later)
+    agent.poll_once(later)
+    assert (alerts[-1].check, alerts[-1].severity_code) == ("health", SEVERITY_WARNING)
+
+def test_agent_stops_between_polls_on_sigterm(tmp_path, monkeypatch):
+    """Tests that SIGTERM stops the agent before its next poll instead of killing it mid-poll."""
+    import signal
+    import threading
+    import time
+    from scripts import monitoring_agent
+
+    monkeypatch.setattr(monitoring_agent, "STOP_EVENT", threading.Event())
+    previous_handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    polls = []
+    agent = MonitoringAgent([], sink=print)
+    monkeypatch.setattr(agent, "poll_once", lambda: polls.append(time.monotonic()))
+
+    threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM)).start()
+    try:
+        started_at = time.monotonic()
+        agent.run(interval=30)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    assert len(polls) == 1
+    assert time.monotonic() - started_at < 5
@@ -0,0 +1,333 @@
+import pytest
+import os
+from src.mq_codec import decode_message, encode_message, message_file_extension
+
+# --- Mock Data for MQ Unit Testing ---
+MOCK_REPORT = {
+    "timestamp": "2025-11-17T10:00:00.000000",
+    "team_id": "Data Team",
+    "resource_type": "System Resources",
+    "metrics": {
+        "disk_usage_percent": 42,
+        "cpu_usage_percent": 12.5,
+        "mem_usage_percent": 30.0,
+        "cpu_per_core_percent": [10.0, 15.0]
+    }
+}
+
+# --- Unit Tests for Message Codecs (AT-004) ---
+
+def test_json_codec_is_plain_compact_json():
+    """Tests that the default codec stays readable by JSON-only consumers."""
+    payload = encode_message(MOCK_REPORT, "json")
+
+    assert payload.startswith(b'{"timestamp":')
+    assert b"\n" not in payload
+    assert decode_message(payload) == MOCK_REPORT
+    assert decode_message(payload.decode('utf-8')) == MOCK_REPORT
+
+def test_binary_codec_is_negotiated_from_header():
+    """Tests that consumers decode framed payloads without knowing the codec."""
+    payload = encode_message(MOCK_REPORT, "zlib-json")
+
+    assert payload.startswith(b"MQC")
+    assert decode_message(payload) == MOCK_REPORT
+    assert message_file_extension("zlib-json") == ".zjson"
+
+def test_msgpack_codec_round_trip():
+    """Tests the optional msgpack codec."""
+    pytest.importorskip("msgpack")
+
+    assert decode_message(encode_message(MOCK_REPORT, "msgpack")) == MOCK_REPORT
+
+def test_malformed_payloads_raise_value_error():
+    """Tests that corrupted payloads surface as ValueError for the consumers."""
+    with pytest.raises(ValueError):
+        decode_message(b"MQC\x01not zlib")
+    with pytest.raises(ValueError):
+        decode_message(b"MQC\x7fpayload")
+    with pytest.raises(ValueError):
+        encode_message(MOCK_REPORT, "xml")
+
+def test_file_system_round_trip_with_binary_codec(setup_test_environment, monkeypatch):
+    """Tests that DT-001 publishes and CT-002 drains messages encoded with a non-default codec."""
+    from scripts.dt_001_resource_reporter import publish_to_file_system
+    from src.ct_002_data_processor import drain_file_system_queue
+
+    mq_archive_dir = os.environ.get("MQ_ARCHIVE_DIR")
+    monkeypatch.setenv("MQ_CODEC", "zlib-json")
+
+    publish_to_file_system(MOCK_REPORT)
+
+    assert drain_file_system_queue() == (1, 1)
+    archived = [f for f in os.listdir(mq_archive_dir) if f.endswith(".zjson")]
+    assert len(archived) == 1
+
+# --- Unit Tests for the Segmented Log (AT-005) ---
+
+def test_segment_log_reads_across_rotated_segments(tmp_path):
+    """Tests that appends rotate segments and consumer groups read them in order."""
+    from src.mq_segment_log import SegmentLog
+
+    log = SegmentLog("disk_usage", base_dir=str(tmp_path), segment_bytes=256)
+    offsets = log.append([f"message-{i}".encode() for i in range(50)])
+    offsets += log.append([f"message-{i}".encode() for i in range(50, 100)])
+
+    assert offsets == list(range(100))
+    assert len([f for f in os.listdir(log.topic_dir) if f.endswith(".log")]) == 2
+
+    for i in range(30):
+        log.append(f"message-{100 + i}".encode())
+    assert len([f for f in os.listdir(log.topic_dir) if f.endswith(".log")]) > 2
+
+    records = log.read_group("ct002_group", 1000)
+    assert [offset for offset, _ in records] == list(range(130))
+    assert [payload for _, payload in records] == [f"message-{i}".encode() for i in range(130)]
+
+    log.commit("ct002_group", 120)
+    assert log.read_group("ct002_group", 5) == [(120 + i, f"message-{120 + i}".encode()) for i in range(5)]
+    # A second group keeps its own position
+    assert log.read_group("other_group", 1) == [(0, b"message-0")]
+    log.close()
+
+def test_segment_log_retention_and_torn_tail(tmp_path):
+    """Tests that consumed segments are deleted and an unindexed torn record is discarded."""
+    from src.mq_segment_log import SegmentLog
+
+    log = SegmentLog("disk_usage", base_dir=str(tmp_path), segment_bytes=64)
+    for i in range(20):
+        log.append(f"report-{i:02d}".encode())
+    log.commit("ct002_group", 20)
+
+    assert log.delete_consumed_segments() > 0
+    remaining = [f for f in os.listdir(log.topic_dir) if f.endswith(".log")]
+    assert len(remaining) == 1
+    # Reads from a deleted offset resume at the oldest retained record
+    assert log.read(0, 10)[0][0] > 0
+
+    # Simulate a writer that crashed after the record but before its index entry
+    with open(os.path.join(log.topic_dir, remaining[0]), 'ab') as f:
+        f.write(b"\x00\x00\x00\x09garbage")
+    assert log.append(b"report-20") == [20]
+    assert log.read(20, 10) == [(20, b"report-20")]
+    log.close()
+
+def test_segment_log_recovers_a_tail_segment_without_index(tmp_path):
+    """Tests that a segment whose index was never created (crash while rotating) does not block appends."""
+    from src.mq_segment_log import SegmentLog
+
+    log = SegmentLog("disk_usage", base_dir=str(tmp_path), segment_bytes=64)
+    for i in range(10):
+        log.append(f"report-{i:02d}".encode())
+    tail_base = log._segment_bases()[-1]
+    tail_count = log._record_count(tail_base)
+    log_path, index_path = log._paths(tail_base)
+    os.remove(index_path)
+
+    # The records of the unindexed segment were never visible and are dropped
+    assert log.append(b"report-10") == [tail_base]
+    assert log.read(tail_base, 10) == [(tail_base, b"report-10")]
+    assert log.read(tail_base - 1, 1)[0][1] == f"report-{tail_base - 1:02d}".encode()
+    assert tail_count > 0
+    log.close()
+
+def corrupt_record(log, offset):
+    """Flips the last payload byte of a record in place, as a disk error would."""
+    import struct
+    base_offset = max(base for base in log._segment_bases() if base <= offset)
+    log_path, index_path = log._paths(base_offset)
+    with open(index_path, 'rb') as f:
+        f.seek((offset - base_offset) * 8)
+        position, = struct.unpack(">Q", f.read(8))
+    with open(log_path, 'r+b') as f:
+        f.seek(position)
+        length, _ = struct.unpack(">II", f.read(8))
+        f.seek(position + 8 + length - 1)
+        last_byte = f.read(1)
+        f.seek(position + 8 + length - 1)
+        f.write(bytes([last_byte[0] ^ 0xFF]))
+
+def test_corrupted_records_are_surfaced_and_committed_past(tmp_path, monkeypatch):
+    """Tests that a CRC mismatch comes back as (offset, None) and CT-002 commits past it."""
+    from src import ct_002_data_processor as ct002
+    from src.mq_segment_log import SegmentLog
+
+    monkeypatch.setenv("MQ_SEGMENT_LOG_DIR", str(tmp_path))
+    log = SegmentLog("disk_usage")
+    log.append([encode_message(MOCK_REPORT) for _ in range(3)])
+    corrupt_record(log, 1)
+
+    records = log.read(0, 10)
+    assert [offset for offset, _ in records] == [0, 1, 2]
+    assert records[1][1] is None and records[2][1] is not None
+
+    assert ct002.consume_from_segment_log() == ct002.BatchOutcome(processed=2, consumed=3)
+    assert log.committed_offset(ct002.SEGMENT_LOG_CONSUMER_GROUP) == 3
+    log.close()
+
+def test_dead_letter_topic_keeps_its_retention(tmp_path):
+    """Tests that a topic without consumer groups is trimmed to its size limit, newest segment kept."""
+    from src.mq_segment_log import SegmentLog
+
+    log = SegmentLog("disk_usage.dead-letter", base_dir=str(tmp_path), segment_bytes=64)
+    for i in range(40):
+        log.append(f"dead-letter-{i:02d}".encode())
+
+    assert log.delete_consumed_segments() == 0
+    assert log.delete_segments_over(200) > 0
+    sizes = [os.path.getsize(os.path.join(log.topic_dir, name)) for name in os.listdir(log.topic_dir) if name.endswith((".log", ".idx"))]
+    assert sum(sizes) <= 200
+    assert log.read(0, 100)[-1] == (39, b"dead-letter-39")
+    log.close()
+
+def test_segment_log_round_trip(tmp_path, monkeypatch):
+    """Tests that DT-001 publishes to and CT-002 consumes from the segmented log MQ."""
+    import scripts.dt_001_resource_reporter as dt001
+    from src import ct_002_data_processor as ct002
+
+    monkeypatch.setenv("MQ_TYPE", "SEGMENT_LOG")
+    monkeypatch.setenv("MQ_SEGMENT_LOG_DIR", str(tmp_path))
+
+    for _ in range(3):
+        dt001.publish_report(MOCK_REPORT)
+    dt001.publish_report({"team_id": "Data Team"})
+    dt001.publish_report(MOCK_REPORT)
+
+    assert ct002.poll_mq_once("SEGMENT_LOG") == ct002.BatchOutcome(processed=4, consumed=5)
+    assert ct002.poll_mq_once("SEGMENT_LOG") == ct002.BatchOutcome(processed=0, consumed=0)
+
+    dead_letters = ct002.SegmentLog("disk_usage.dead-letter").read(0, 10)
+    assert [decode_message(payload) for _, payload in dead_letters] == [{"team_id": "Data Team"}]
+
+def test_segment_log_drain_continues_past_an_all_invalid_batch(tmp_path, monkeypatch, capsys):
+    """Tests that DRAIN keeps reading when a whole batch is dead-lettered and nothing in it succeeds."""
+    import scripts.dt_001_resource_reporter as dt001
+    from src import ct_002_data_processor as ct002
+
+    monkeypatch.setenv("MQ_TYPE", "SEGMENT_LOG")
+    monkeypatch.setenv("MQ_SEGMENT_LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("CT_LISTENER_MODE", "DRAIN")
+    monkeypatch.setenv("CT_DRAIN_BATCH_SIZE", "2")
+
+    for _ in range(2):
+        dt001.publish_report({"team_id": "Data Team"})
+    for _ in range(3):
+        dt001.publish_report(MOCK_REPORT)
+
+    ct002.start_mq_listener()
+
+    log = ct002.get_segment_log("disk_usage")
+    assert log.committed_offset(ct002.SEGMENT_LOG_CONSUMER_GROUP) == 5
+    assert "No new messages in queue" not in capsys.readouterr().out
+    assert len(ct002.SegmentLog("disk_usage.dead-letter").read(0, 10)) == 2
+
+def test_ft001_consumes_ct002_result_topic(tmp_path, monkeypatch):
+    """Tests that FT-001 summarizes each new CT-002 result batch once, from its own offset on the result topic."""
+    from src import ct_002_data_processor as ct002
+    from src import ft_001_summary_generator as ft001
+
+    summary_file = tmp_path / "summary.md"
+    monkeypatch.setenv("MQ_SEGMENT_LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("FT_OUTPUT_FILE", str(summary_file))
+    monkeypatch.setattr(ct002, "WINDOW_AGGREGATOR", None)
+
+    ct002.process_message_batch([("1", dict(MOCK_REPORT, timestamp="first")), ("2", {"team_id": "Data Team"}), ("3", dict(MOCK_REPORT, timestamp="second"))])
+    assert ct002.SegmentLog("ct_results").end_offset() == 2
+
+    ft001.start_summary_listener()
+    assert "**Source Timestamp:** second" in summary_file.read_text()
+    assert ct002.SegmentLog("ct_results").committed_offset(ft001.FT_CONSUMER_GROUP) == 2
+
+    # Nothing new: the summary is not generated again
+    summary_file.unlink()
+    ft001.start_summary_listener()
+    assert not summary_file.exists()
+
+    # The newest result is undecodable: the one before it is summarized
+    ct002.publish_results([dict(MOCK_REPORT, source_timestamp="third")])
+    ct002.get_segment_log("ct_results").append(b"{not json")
+    ft001.start_summary_listener()
+    assert "**Source Timestamp:** third" in summary_file.read_text()
+
+    # Nothing new decodes: no summary is reported, and the results are committed past
+    ct002.get_segment_log("ct_results").append(b"{not json")
+    assert ft001.consume_results_from_segment_log(str(summary_file)) == 0
+    assert ct002.SegmentLog("ct_results").committed_offset(ft001.FT_CONSUMER_GROUP) == ct002.SegmentLog("ct_results").end_offset()
+
+# --- Unit Tests for inotify Wakeups (AT-006) ---
+
+def test_directory_watcher_wakes_on_rename(tmp_path):
+    """Tests that the watcher wakes on an atomic rename into the directory and times out otherwise."""
+    import time
+    from src.fs_watch import open_directory_watcher
+
+    watcher = open_directory_watcher(str(tmp_path))
+    if watcher is None:
+        pytest.skip("inotify is not available")
+
+    assert watcher.wait(0.05) is False
+
+    temp_path = os.path.join(tmp_path, "message.json.tmp")
+    with open(temp_path, 'w') as f:
+        f.write("{}")
+    watcher.wait(0.05)
+    os.rename(temp_path, os.path.join(tmp_path, "message.json"))
+
+    started_at = time.monotonic()
+    assert watcher.wait(5) is True
+    assert time.monotonic() - started_at < 0.5
+
+    watcher.wake()
+    assert watcher.wait(5) is True
+    watcher.close()
+
+# --- Unit Tests for Archive Compaction and Retention (AT-007) ---
+
+def test_archive_compaction_bundles_and_looks_up_messages(tmp_path):
+    """Tests that ended hourly buckets are bundled, indexed and deleted, while the current bucket is kept."""
+    import time
+    from src.mq_archive_compactor import compact_archive, find_archived_messages, read_archived_message
+
+    now = (int(time.time()) // 3600) * 3600 + 1800
+    files = {
+        "resource_report_a.json": now - 2 * 3600,
+        "resource_report_b.json": now - 2 * 3600 + 60,
+        "resource_report_c.zjson.corrupted": now - 3600,
+        "resource_report_d.json": now,
+    }
+    for name, mtime in files.items():
+        path = os.path.join(tmp_path, name)
+        with open(path, 'w') as f:
+            f.write(f'{{"name": "{name}"}}')
+        os.utime(path, (mtime, mtime))
+
+    assert compact_archive(str(tmp_path), bucket_seconds=3600, now=now) == 3
+    assert sorted(f for f in os.listdir(tmp_path) if f != "bundles") == ["resource_report_d.json"]
+    assert len([f for f in os.listdir(os.path.join(tmp_path, "bundles")) if f.endswith(".tar.gz")]) == 2
+
+    entry, = find_archived_messages(str(tmp_path), message_id="resource_report_b")
+    assert read_archived_message(entry, str(tmp_path)) == b'{"name": "resource_report_b.json"}'
+
+    in_last_hour = find_archived_messages(str(tmp_path), start=now - 3600, end=now)
+    assert [(e["id"], e["corrupted"]) for e in in_last_hour] == [("resource_report_c", True)]
+
+    # Nothing left to compact on a second run
+    assert compact_archive(str(tmp_path), bucket_seconds=3600, now=now) == 0
+
+def test_archive_retention_by_age_and_size(tmp_path):
+    """Tests that bundles past the age limit, then the oldest over the size limit, are deleted."""
+    from src.mq_archive_compactor import compact_archive, enforce_archive_retention, find_archived_messages
+
+    now = 100 * 86400
+    for day in (40, 10, 5, 1):
+        path = os.path.join(tmp_path, f"resource_report_day{day}.json")
+        with open(path, 'w') as f:
+            f.write("{}")
+        os.utime(path, (now - day * 86400, now - day * 86400))
+    compact_archive(str(tmp_path), bucket_seconds=3600, now=now)
+
+    assert enforce_archive_retention(str(tmp_path), max_age_days=30, max_bytes=0, now=now) == 1
+    bundle_bytes = max(os.path.getsize(os.path.join(tmp_path, "bundles", f)) for f in os.listdir(os.path.join(tmp_path, "bundles")) if f.endswith(".tar.gz"))
+    assert enforce_archive_retention(str(tmp_path), max_age_days=30, max_bytes=2 * bundle_bytes, now=now) == 1
+
+    assert sorted(e["id"] for e in find_archived_messages(str(tmp_path))) == ["resource_report_day1", "resource_report_day5"]
@@ -0,0 +1,62 @@
+import pytest
+import asyncio
+import os
+import time
+
+# --- Mock Data for Pipeline Testing ---
+MOCK_REPORT = {
+    "timestamp": "2025-11-17T10:00:00.000000",
+    "team_id": "Data Team",
+    "resource_type": "System Resources",
+    "metrics": {
+        "disk_usage_percent": 42,
+        "cpu_usage_percent": 12.5,
+        "mem_usage_percent": 30.0
+    }
+}
+
+# --- Unit Tests for the Pipeline Runner (AT-008) ---
+
+def test_pipeline_runs_all_stages_in_process(monkeypatch):
+    """Tests that sampled reports reach the summary stage within milliseconds, without artifacts."""
+    import src.pipeline_runner as pipeline
+
+    monkeypatch.setattr(pipeline.dt001, "generate_report", lambda: dict(MOCK_REPORT))
+
+    stats = asyncio.run(pipeline.run_pipeline_async(max_reports=5, sample_interval=0.01, write_artifacts=False))
+    result = stats.as_dict()
+
+    assert result["reports_sampled"] == 5
+    assert result["summaries_generated"] == 5
+    assert result["latency_ms_max"] < 100
+
+def test_pipeline_applies_backpressure_and_writes_artifacts(tmp_path, monkeypatch):
+    """Tests that a slow reporting stage throttles sampling and that artifacts are written when requested."""
+    import src.pipeline_runner as pipeline
+
+    pdf_count = []
+    in_flight = []
+
+    def sample():
+        in_flight.append(len(in_flight) - len(pdf_count))
+        # A distinct timestamp per report, since unchanged summaries are not converted again (FT-003)
+        return dict(MOCK_REPORT, timestamp=f"2025-11-17T10:00:{len(in_flight):02d}.000000")
+
+    def slow_pdf():
+        time.sleep(0.01)
+        pdf_count.append(1)
+
+    monkeypatch.setattr(pipeline.dt001, "generate_report", sample)
+    monkeypatch.setattr(pipeline.rt001, "generate_pdf_report", slow_pdf)
+    monkeypatch.setenv("CT_OUTPUT_FILE", str(tmp_path / "ct_output.json"))
+    monkeypatch.setenv("FT_OUTPUT_FILE", str(tmp_path / "summary.md"))
+    monkeypatch.setenv("AT_HEALTH_CHECK_FILE", str(tmp_path / "health_check.json"))
+
+    stats = asyncio.run(pipeline.run_pipeline_async(max_reports=30, sample_interval=0, queue_size=1, write_artifacts=True))
+
+    assert stats.summaries_generated == 30
+    assert len(pdf_count) == 30
+    # Three one-slot queues plus one report held by each stage
+    assert max(in_flight) <= 7
+    assert "Executive Summary Report" in (tmp_path / "summary.md").read_text()
+    assert (tmp_path / "ct_output.json").exists()
@@ -0,0 +1,71 @@
+import pytest
+
+from scripts.dt_001_resource_reporter import generate_report, validate_metrics
+from src.ct_002_data_processor import process_resource_report
+from src.report_schema import REPORT_VALIDATOR, SCHEMA_VERSION, contract_error
+
+VALID_REPORT = {
+    "schema_version": SCHEMA_VERSION,
+    "timestamp": "2025-11-17T10:00:00",
+    "team_id": "Data Team",
+    "resource_type": "System Resources",
+    "host": "web-01",
+    "metrics": {
+        "disk_usage_percent": 42,
+        "cpu_usage_percent": 12.5,
+        "mem_usage_percent": 30.0,
+        "disk_size_gb": 40.0,
+        "mem_total_mb": 7962,
+        "cpu_per_core_percent": [10.0, 15.0],
+        "filesystems": {"/data": {"device": "/dev/vdb", "usage_percent": 40}},
+        "disk_io": {"vda": {"read_bytes_per_sec": 0.0, "write_bytes_per_sec": 512.0}}
+    }
+}
+
+# --- Unit Tests for the Artifact Contract Schema (AT-010) ---
+
+def test_validator_reports_every_violation_in_one_pass():
+    """Tests that one validation pass collects all violations with their paths."""
+    report = dict(VALID_REPORT, host=7, schema_version=SCHEMA_VERSION + 1, metrics=dict(
+        VALID_REPORT["metrics"],
+        cpu_usage_percent=120,
+        mem_usage_percent=True,
+        cpu_per_core_percent=[10.0, -1],
+        filesystems={"/data": {"device": "/dev/vdb"}}
+    ))
+    del report["metrics"]["disk_usage_percent"]
+
+    violations = {str(violation) for violation in REPORT_VALIDATOR.violations(report)}
+
+    assert violations == {
+        "report.host: expected a string, got int",
+        "report.metrics.disk_usage_percent: is required",
+        "report.metrics.cpu_usage_percent: must be <= 100 (got 120)",
+        "report.metrics.mem_usage_percent: expected a number, got bool",
+        "report.metrics.cpu_per_core_percent[1]: must be >= 0 (got -1)",
+        "report.metrics.filesystems./data.usage_percent: is required"
+    }
+    assert REPORT_VALIDATOR.violations(VALID_REPORT) == []
+    # Reports of a newer producer are accepted as long as the known fields are valid
+    assert REPORT_VALIDATOR.violations(dict(VALID_REPORT, schema_version=SCHEMA_VERSION + 1)) == []
+
+def test_consumer_rejects_contract_violations():
+    """Tests that CT-002 rejects out-of-range and mistyped reports with every violation listed."""
+    assert "error" not in process_resource_report(VALID_REPORT)
+
+    result = process_resource_report(dict(VALID_REPORT, team_id=None, metrics=dict(VALID_REPORT["metrics"], disk_usage_percent=float("nan"))))
+
+    assert result["error"].startswith(f"JSON report violates artifact contract v{SCHEMA_VERSION}.")
+    assert "report.team_id: expected a string, got NoneType" in result["error"]
+    assert "report.metrics.disk_usage_percent: must be >= 0 (got nan)" in result["error"]
+    assert contract_error({"metrics": {}}).startswith("JSON structure is missing required top-level keys.")
+
+def test_publisher_and_consumer_share_the_contract():
+    """Tests that DT-001 publishes versioned reports CT-002 accepts, and refuses metrics the contract rejects."""
+    report = generate_report()
+
+    assert report["schema_version"] == SCHEMA_VERSION
+    assert contract_error(report) is None
+    assert validate_metrics(VALID_REPORT["metrics"]) is True
+    assert validate_metrics(dict(VALID_REPORT["metrics"], mem_total_mb=0)) is False
+    assert validate_metrics({key: value for key, value in VALID_REPORT["metrics"].items() if key != "cpu_usage_percent"}) is False
@@ -0,0 +1,72 @@
+import pytest
+import os
+import re
+import zlib
+
+from src.pdf_render import render_markdown_to_pdf, text_width, wrap
+from src.rt_001_pdf_generator import generate_pdf_report, generate_pdf_reports
+
+def read_pdf(path):
+    """Checks the cross-reference table and returns (page count, decompressed page contents)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+    xref_offset = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+    lines = data[xref_offset:].split(b"\n")
+    for object_id in range(1, int(lines[1].split()[1])):
+        assert data[int(lines[2 + object_id][:10]):].startswith(f"{object_id} 0 obj".encode())
+    page_count = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+    contents = [zlib.decompress(stream).decode("latin-1") for stream in re.findall(rb"stream\n(.*?)\nendstream", data, re.S)]
+    return page_count, contents
+
+# --- Unit Tests for the In-Process PDF Renderer (RT-002) ---
+
+def test_markdown_renders_to_a_valid_multi_page_pdf(tmp_path):
+    """Tests headings, tables, icons and escaping, and that long documents break into pages."""
+    rows = "\n".join(f"| host-{index} | {index}% 🔴 |" for index in range(80))
+    markdown = f"# Report (v1)\n\n**Status:** RED\n\n| Host | Disk |\n| :--- | :--- |\n{rows}\n\n> Insight\n\n- item\n"
+    pdf_path = str(tmp_path / "report.pdf")
+
+    assert render_markdown_to_pdf(markdown, pdf_path) == 2
+    page_count, contents = read_pdf(pdf_path)
+
+    assert page_count == len(contents) == 2
+    assert "(Report \\(v1\\)) Tj" in contents[0]
+    assert "(Status:) Tj" in contents[0] and "/F2" in contents[0]
+    assert "(host-79) Tj" in contents[1]
+    assert " rg " in contents[0]
+    assert not os.path.exists(pdf_path + f".{os.getpid()}.tmp")
+
+def test_wrap_respects_width_and_merges_runs():
+    """Tests that wrapped lines stay within the width and that same-font words share one run."""
+    lines = wrap("one two three **four** five six", "F1", 10, 70)
+    assert [[(text, font) for _, text, font in line] for line in lines] == [[("one two three", "F1")], [("four", "F2"), ("five six", "F1")]]
+    assert all(offset + text_width(text, font, 10) <= 70 for line in lines for offset, text, font in line)
+
+def test_pdf_report_batch_and_up_to_date_skip(tmp_path, monkeypatch):
+    """Tests that several summaries convert in one call and that only an out-of-date PDF is regenerated."""
+    summaries = []
+    for index in range(3):
+        path = tmp_path / f"summary_{index}.md"
+        path.write_text(f"# Summary {index}\n")
+        summaries.append((str(path), str(tmp_path / f"summary_{index}.pdf")))
+    summaries.append((str(tmp_path / "missing.md"), str(tmp_path / "missing.pdf")))
+
+    assert generate_pdf_reports(summaries) == 3
+    assert read_pdf(summaries[2][1])[0] == 1
+
+    monkeypatch.setenv("FT_OUTPUT_FILE", summaries[0][0])
+    monkeypatch.setenv("RT_PDF_OUTPUT_FILE", str(tmp_path / "executive_summary.pdf"))
+    assert generate_pdf_report() is True
+
+    import src.rt_001_pdf_generator as rt001
+    rendered = []
+    render = rt001.generate_pdf_reports
+    monkeypatch.setattr(rt001, "generate_pdf_reports", lambda jobs: rendered.append(jobs) or render(jobs))
+    assert generate_pdf_report() is True
+    assert rendered == []
+
+    # A new renderer version makes the PDF out of date although the summary did not change
+    monkeypatch.setattr(rt001, "RENDERER_VERSION", rt001.RENDERER_VERSION + 1)
+    assert generate_pdf_report() is True
+    assert len(rendered) == 1